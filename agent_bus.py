@@ -0,0 +1,401 @@
+import fnmatch
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# --- Bus Settings ---
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sdlc_state')
+DEFAULT_LOG_DIR = os.path.join(STATE_DIR, 'agent_bus')
+DEFAULT_MAX_PENDING = 1000 # Undelivered events held before publishers are throttled
+DEFAULT_PUBLISH_TIMEOUT = 5.0 # Seconds a publisher waits for room before BusFullError
+DEFAULT_AGENT_WORKERS = 4 # Agents run concurrently by an AgentPipeline
+IDLE_RUN_TTL_SECONDS = 1800 # Pipeline runs with no agent running and no activity are forgotten after this long
+LOG_SEGMENT_BYTES = 16 * 1024 * 1024 # Size at which a topic's event log is rotated
+LOG_RETAINED_SEGMENTS = 4 # Rotated segments kept per topic; older events can no longer be replayed
+
+class BusFullError(Exception):
+    """Raised when a publisher cannot enqueue an event within its timeout (backpressure)."""
+
+# --- Topics ---
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+def agent_topic(agent_name, event='completed'):
+    """
+    Topic for an agent lifecycle event, e.g. 'agent.ba_agent.completed'.
+    """
+    return f"agent.{_slug(agent_name)}.{event}"
+
+def phase_topic(phase_id, event='completed'):
+    """
+    Topic for an SDLC phase lifecycle event, e.g. 'phase.req_planning.completed'.
+    """
+    return f"phase.{phase_id}.{event}"
+
+# --- Bus Interface ---
+class AgentBus:
+    """
+    Interface every bus implementation provides. Topic patterns passed to `subscribe`
+    may use shell-style wildcards ('agent.*.completed').
+    """
+
+    def publish(self, topic, payload, timeout=DEFAULT_PUBLISH_TIMEOUT):
+        raise NotImplementedError
+
+    def subscribe(self, topic_pattern, handler):
+        raise NotImplementedError
+
+    def replay(self, topic, handler, from_offset=0):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class _EventLog:
+    """
+    Append-only JSON-lines log per topic, used for durable replay after a restart. The active
+    file <topic>.jsonl is rotated to <topic>.jsonl.<first offset> once it reaches
+    LOG_SEGMENT_BYTES, and only the newest LOG_RETAINED_SEGMENTS rotated segments are kept, so
+    offsets stay stable while the oldest events age out.
+    """
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._offsets = {}
+        self._bases = {} # Offset of the first event in each topic's active file
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+    def _path(self, topic):
+        return os.path.join(self.log_dir, f"{topic}.jsonl")
+
+    def _segments(self, topic):
+        """
+        Rotated segments of `topic` as (first_offset, path), oldest first.
+        """
+        prefix = f"{topic}.jsonl."
+        return sorted((int(name[len(prefix):]), os.path.join(self.log_dir, name))
+                      for name in os.listdir(self.log_dir)
+                      if name.startswith(prefix) and name[len(prefix):].isdigit())
+
+    @staticmethod
+    def _count_lines(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def _load_offsets(self, topic):
+        if topic not in self._offsets:
+            segments = self._segments(topic)
+            base = segments[-1][0] + self._count_lines(segments[-1][1]) if segments else 0
+            self._bases[topic] = base
+            self._offsets[topic] = base + self._count_lines(self._path(topic))
+        return self._offsets[topic]
+
+    def _rotate(self, topic):
+        path = self._path(topic)
+        os.replace(path, f"{path}.{self._bases[topic]}")
+        self._bases[topic] = self._offsets[topic]
+        for _, old_path in self._segments(topic)[:-LOG_RETAINED_SEGMENTS]:
+            os.remove(old_path)
+
+    def append(self, topic, event):
+        with self._lock:
+            event['offset'] = self._load_offsets(topic) if self.log_dir else None
+            if self.log_dir:
+                with open(self._path(topic), 'a') as f:
+                    f.write(json.dumps(event) + "\n")
+                    size = f.tell()
+                self._offsets[topic] += 1
+                if size >= LOG_SEGMENT_BYTES:
+                    self._rotate(topic)
+        return event
+
+    def read(self, topic, from_offset=0):
+        """
+        Yields the retained events of `topic` from `from_offset` on; events already rotated out are skipped.
+        """
+        if not self.log_dir:
+            return
+        files = []
+        with self._lock: # Open every file up front, so a concurrent rotation cannot skip or repeat events
+            self._load_offsets(topic)
+            paths = self._segments(topic) + [(self._bases[topic], self._path(topic))]
+            for index, (first_offset, path) in enumerate(paths):
+                if index + 1 < len(paths) and paths[index + 1][0] <= from_offset:
+                    continue
+                if os.path.exists(path):
+                    files.append((first_offset, open(path)))
+        try:
+            for first_offset, f in files:
+                for offset, line in enumerate(f, start=first_offset):
+                    if offset >= from_offset:
+                        yield json.loads(line)
+        finally:
+            for _, f in files:
+                f.close()
+
+    def topics(self):
+        if not self.log_dir:
+            return []
+        return sorted({name[:name.index(".jsonl")] for name in os.listdir(self.log_dir) if ".jsonl" in name})
+
+class LocalEventBus(AgentBus):
+    """
+    In-process bus: events are queued on a bounded queue, persisted to a per-topic log and
+    delivered to subscribers by a dispatcher thread. A full queue blocks publishers for up to
+    `timeout` seconds and then raises BusFullError, so slow subscribers throttle producers
+    instead of growing memory without bound; a rejected event is never logged. Pass
+    `log_dir=None` for a non-durable bus (tests).
+    """
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, max_pending=DEFAULT_MAX_PENDING):
+        self._log = _EventLog(log_dir)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._slots = threading.BoundedSemaphore(max_pending) # Room in the queue, reserved before an event is logged
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="agent-bus-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def publish(self, topic, payload, timeout=DEFAULT_PUBLISH_TIMEOUT):
+        if not self._slots.acquire(timeout=timeout):
+            raise BusFullError(f"Agent bus is full ({self._queue.maxsize} pending events); could not publish to '{topic}'")
+        try:
+            event = self._log.append(topic, {'topic': topic, 'payload': payload, 'published_at': time.time()})
+        except BaseException:
+            self._slots.release()
+            raise
+        self._queue.put_nowait(event)
+        return event['offset']
+
+    def subscribe(self, topic_pattern, handler):
+        with self._subscribers_lock:
+            self._subscribers.append((topic_pattern, handler))
+
+    def replay(self, topic, handler, from_offset=0):
+        """
+        Re-delivers persisted events of `topic` synchronously to `handler`. Returns the count.
+        """
+        count = 0
+        for event in self._log.read(topic, from_offset):
+            handler(event)
+            count += 1
+        return count
+
+    def topics(self):
+        return self._log.topics()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _dispatch_loop(self):
+        while not self._closed.is_set():
+            try:
+                event = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            self._slots.release()
+            with self._subscribers_lock:
+                handlers = [handler for pattern, handler in self._subscribers if fnmatch.fnmatchcase(event['topic'], pattern)]
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception:
+                    logger.exception("Agent bus subscriber failed for topic %s", event['topic'])
+            self._queue.task_done()
+
+    def join(self):
+        """
+        Blocks until every queued event has been delivered.
+        """
+        self._queue.join()
+
+    def close(self):
+        self._closed.set()
+        self._dispatcher.join(timeout=1)
+
+class BrokerBus(AgentBus):
+    """
+    Adapter onto an external broker (Kafka, Pub/Sub, ...). `client` needs
+    `send(topic, data_bytes)`, `listen(topic_pattern, callback)` and
+    `history(topic, from_offset)` (the retained messages, for replay); persistence,
+    backpressure and retention are then the broker's responsibility.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def publish(self, topic, payload, timeout=DEFAULT_PUBLISH_TIMEOUT):
+        event = {'topic': topic, 'payload': payload, 'published_at': time.time()}
+        return self.client.send(topic, json.dumps(event).encode('utf-8'))
+
+    def subscribe(self, topic_pattern, handler):
+        self.client.listen(topic_pattern, lambda data: handler(json.loads(data)))
+
+    def replay(self, topic, handler, from_offset=0):
+        count = 0
+        for data in self.client.history(topic, from_offset):
+            handler(json.loads(data))
+            count += 1
+        return count
+
+class InMemoryBroker:
+    """
+    Local stand-in for an external broker client, for tests and single-process demos.
+    """
+
+    def __init__(self):
+        self._topics = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def send(self, topic, data):
+        with self._lock:
+            log = self._topics.setdefault(topic, [])
+            log.append(data)
+            offset = len(log) - 1
+            listeners = [callback for pattern, callback in self._listeners if fnmatch.fnmatchcase(topic, pattern)]
+        for callback in listeners:
+            callback(data)
+        return offset
+
+    def listen(self, topic_pattern, callback):
+        with self._lock:
+            self._listeners.append((topic_pattern, callback))
+
+    def history(self, topic, from_offset=0):
+        with self._lock:
+            return list(self._topics.get(topic, [])[from_offset:])
+
+# --- Subscriber Agents ---
+class AgentPipeline:
+    """
+    Subscribes every agent to the completion topics of the agents in its `receives_input_from`.
+    Once all of an agent's upstream agents have completed within a run, it is run on a worker
+    thread via `run_agent(agent, upstream_outputs)` and its own completion is published, so a
+    run flows through the graph without anyone clicking "Activate". The completion of a phase's
+    primary agent is also published as the phase's completion. Runs left idle for
+    IDLE_RUN_TTL_SECONDS are dropped from memory; `restore` rebuilds one from the event log.
+    """
+
+    def __init__(self, bus, agent_data, run_agent, max_workers=DEFAULT_AGENT_WORKERS, phases=()):
+        self.bus = bus
+        self.run_agent = run_agent
+        self._runs = {}
+        self._lock = threading.Lock()
+        self.set_plan(agent_data, phases)
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-pipeline")
+        bus.subscribe("agent.*.completed", self._on_completed)
+
+    def set_plan(self, agent_data, phases=()):
+        """
+        Swaps in a reloaded workflow graph. Runs keep their outputs, and completions from here on
+        activate agents by the new graph; the bus and worker pool stay the same.
+        """
+        phase_ids_by_agent = {}
+        for phase in phases:
+            phase_ids_by_agent.setdefault(phase['primary_agent_id'], []).append(phase['phase_id'])
+        with self._lock:
+            self.agent_data = agent_data
+            self._agents_by_topic = {agent_topic(agent['name']): agent for agent in agent_data.values()}
+            self._phase_ids_by_agent = phase_ids_by_agent
+
+    def _run_state(self, run_id):
+        now = time.monotonic()
+        state = self._runs.get(run_id)
+        if state is None:
+            self._forget_idle_runs(now) # Only new runs grow the table, so sweep it then
+            state = self._runs[run_id] = {'outputs': {}, 'running': set(), 'failed': {}, 'auto_run': False}
+        state['touched_at'] = now
+        return state
+
+    def _forget_idle_runs(self, now):
+        for run_id in [run_id for run_id, state in self._runs.items()
+                       if not state['running'] and now - state['touched_at'] > IDLE_RUN_TTL_SECONDS]:
+            del self._runs[run_id]
+
+    def start_run(self, run_id, auto_run=True):
+        """
+        Enables automatic downstream execution for `run_id`.
+        """
+        with self._lock:
+            self._run_state(run_id)['auto_run'] = auto_run
+
+    def publish_completion(self, run_id, agent, output):
+        """
+        Records an agent's finalized output (from the UI or a worker) and announces it on the bus,
+        along with the completion of every phase the agent is the primary agent of.
+        """
+        offset = self.bus.publish(agent_topic(agent['name']), {'run_id': run_id, 'agent_id': agent['id'],
+                                                               'agent_name': agent['name'], 'output': output})
+        with self._lock:
+            phase_ids = self._phase_ids_by_agent.get(agent['id'], [])
+        for phase_id in phase_ids:
+            self.bus.publish(phase_topic(phase_id), {'run_id': run_id, 'phase_id': phase_id, 'agent_id': agent['id']})
+        return offset
+
+    def _on_completed(self, event):
+        payload = event['payload']
+        ready = []
+        with self._lock:
+            state = self._run_state(payload['run_id'])
+            state['outputs'][payload['agent_name']] = payload['output']
+            state['running'].discard(payload['agent_name'])
+            if not state['auto_run']:
+                return
+            for agent in self.agent_data.values():
+                upstream = agent.get('receives_input_from', [])
+                if (payload['agent_name'] in upstream and agent['name'] not in state['outputs']
+                        and agent['name'] not in state['running']
+                        and all(name in state['outputs'] for name in upstream)):
+                    state['running'].add(agent['name'])
+                    ready.append((agent, {name: state['outputs'][name] for name in upstream}))
+        for agent, upstream_outputs in ready:
+            self._workers.submit(self._execute, payload['run_id'], agent, upstream_outputs)
+
+    def _execute(self, run_id, agent, upstream_outputs):
+        try:
+            output = self.run_agent(agent, upstream_outputs)
+        except Exception as e:
+            logger.exception("Agent %s failed in run %s", agent['name'], run_id)
+            with self._lock:
+                state = self._run_state(run_id)
+                state['running'].discard(agent['name'])
+                state['failed'][agent['name']] = str(e)
+            return
+        self.publish_completion(run_id, agent, output)
+
+    def restore(self, run_id):
+        """
+        Rebuilds a run's outputs from the durable event log (e.g. after a restart).
+        """
+        def collect(event):
+            payload = event['payload']
+            if payload.get('run_id') == run_id:
+                with self._lock:
+                    self._run_state(run_id)['outputs'][payload['agent_name']] = payload['output']
+        with self._lock:
+            topics = list(self._agents_by_topic)
+        for topic in topics:
+            self.bus.replay(topic, collect)
+        return self.status(run_id)
+
+    def status(self, run_id):
+        """
+        Snapshot of a run: completed outputs, agents currently running and failures.
+        """
+        with self._lock:
+            state = self._run_state(run_id)
+            return {'outputs': dict(state['outputs']), 'running': sorted(state['running']),
+                    'failed': dict(state['failed']), 'auto_run': state['auto_run']}
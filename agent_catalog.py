@@ -0,0 +1,65 @@
+import bisect
+import re
+from collections import defaultdict
+
+from auth_backend import mask_allows
+
+# --- Catalog Settings ---
+SEARCH_FIELDS = ('name', 'description', 'tech', 'llm_feature')
+CARD_PAGE_SIZES = (12, 24, 48) # Agent cards per overview page; multiples of the 3-column grid
+SIDEBAR_PAGE_SIZE = 15 # Agent buttons per sidebar page
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+") # 'trd_generation' indexes as 'trd' and 'generation'
+
+def tokenize(text):
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+def build_search_index(agents, display_order):
+    """
+    Inverted index over SEARCH_FIELDS, built once per plan: 'tokens' sorted for prefix lookups,
+    'postings' {token: agent ids} and 'rank' {agent id: position in display order}.
+    """
+    postings = defaultdict(set)
+    for agent_id in display_order:
+        for field in SEARCH_FIELDS:
+            for token in tokenize(agents[agent_id].get(field, "")):
+                postings[token].add(agent_id)
+    return {
+        'tokens': sorted(postings),
+        'postings': {token: frozenset(agent_ids) for token, agent_ids in postings.items()},
+        'rank': {agent_id: position for position, agent_id in enumerate(display_order)},
+    }
+
+def _prefix_matches(index, term):
+    tokens = index['tokens']
+    matches = set()
+    start = bisect.bisect_left(tokens, term)
+    for token in tokens[start:]:
+        if not token.startswith(term):
+            break
+        matches |= index['postings'][token]
+    return matches
+
+def search_agents(plan, role, query=""):
+    """
+    Agent ids the role may use whose indexed fields match every query term as a word prefix,
+    in display order. An empty query returns the role's precomputed list without scanning.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return plan['role_display_order'].get(role, [])
+    index = plan['agent_search_index']
+    matches = None
+    for term in sorted(terms, key=len, reverse=True): # Longer terms match fewer agents
+        matches = _prefix_matches(index, term) if matches is None else matches & _prefix_matches(index, term)
+        if not matches:
+            return []
+    mask = plan['role_agent_masks'].get(role, 0)
+    return sorted((agent_id for agent_id in matches if mask_allows(mask, agent_id)), key=index['rank'].get)
+
+def catalog_page(agent_ids, page, page_size):
+    """
+    Returns (agent ids on the 1-based `page`, page, page count), with out-of-range pages clamped.
+    """
+    page_count = max(1, -(-len(agent_ids) // page_size))
+    page = min(max(page, 1), page_count)
+    return agent_ids[(page - 1) * page_size:page * page_size], page, page_count
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+from shared_state import VersionConflictError, get_state_backend, state_key # Artifacts are readable from every replica
+
+# --- Artifact Store Settings ---
+ARTIFACT_NAMESPACE = 'artifact'
+ARTIFACT_MIN_CHARS = 256 # Shorter strings are cheaper to keep inline than to reference
+ARTIFACT_CACHE_SIZE = 512 # Distinct artifacts kept in memory, shared by every session and run
+MISSING_ARTIFACT_TEXT = "(This output is no longer available in the artifact store.)"
+
+logger = logging.getLogger(__name__)
+
+class ArtifactRef:
+    """
+    Placeholder for a large string stored once by content hash. Snapshots hold refs instead
+    of the text, so runs that produced the same artifact share a single stored copy.
+    """
+    __slots__ = ('digest',)
+
+    def __init__(self, digest):
+        self.digest = digest
+
+    def __reduce__(self):
+        return (ArtifactRef, (self.digest,))
+
+    def __repr__(self):
+        return f"ArtifactRef({self.digest[:12]})"
+
+_lock = threading.Lock()
+_cache = OrderedDict() # digest -> text, LRU
+_persisted = set() # Digests known to be in the shared store, to skip the round trip on repeat saves
+_stats = {'writes': 0, 'dedup_hits': 0}
+
+def artifact_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _remember(digest, text):
+    """
+    Returns the shared in-memory copy of an artifact, caching `text` if none is held yet.
+    """
+    with _lock:
+        shared = _cache.get(digest)
+        if shared is None:
+            _cache[digest] = shared = text
+            if len(_cache) > ARTIFACT_CACHE_SIZE:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(digest)
+        return shared
+
+# --- Store ---
+def intern_artifact(text):
+    """
+    Returns one shared string object for all equal large outputs, so sessions and runs that
+    generated the same artifact do not each hold their own copy in memory.
+    """
+    if not isinstance(text, str) or len(text) < ARTIFACT_MIN_CHARS:
+        return text
+    return _remember(artifact_digest(text), text)
+
+def put_artifact(text):
+    """
+    Stores `text` by content hash (once, however many runs reference it) and returns its digest.
+    """
+    digest = artifact_digest(text)
+    _remember(digest, text)
+    with _lock:
+        if digest in _persisted:
+            _stats['dedup_hits'] += 1
+            return digest
+    try:
+        # Create-only write: content addressing means an existing key already holds this text
+        get_state_backend().put(state_key(ARTIFACT_NAMESPACE, digest), zlib.compress(text.encode('utf-8'), 1), expected_version=0)
+        counter = 'writes'
+    except VersionConflictError:
+        counter = 'dedup_hits'
+    with _lock:
+        _persisted.add(digest)
+        _stats[counter] += 1
+    return digest
+
+def get_artifact(digest, missing_ok=False):
+    """
+    The text stored under `digest`. A missing artifact raises KeyError, or with missing_ok
+    returns MISSING_ARTIFACT_TEXT so pages listing old outputs still render.
+    """
+    with _lock:
+        text = _cache.get(digest)
+        if text is not None:
+            _cache.move_to_end(digest)
+            return text
+    blob, _ = get_state_backend().get(state_key(ARTIFACT_NAMESPACE, digest))
+    if blob is None:
+        if missing_ok:
+            logger.warning("Artifact %s is missing from the shared state store", digest[:12])
+            return MISSING_ARTIFACT_TEXT
+        raise KeyError(f"Artifact {digest[:12]} is not in the shared state store")
+    return _remember(digest, zlib.decompress(blob).decode('utf-8'))
+
+# --- Snapshot Helpers ---
+def externalize_artifacts(value):
+    """
+    Replaces large strings (including inside dicts) with ArtifactRefs, storing each once.
+    """
+    if isinstance(value, str) and len(value) >= ARTIFACT_MIN_CHARS:
+        return ArtifactRef(put_artifact(value))
+    if isinstance(value, dict):
+        return type(value)((key, externalize_artifacts(item)) for key, item in value.items())
+    return value
+
+def resolve_artifacts(value):
+    """
+    Inverse of externalize_artifacts; resolved strings are the shared in-memory copies.
+    """
+    if isinstance(value, ArtifactRef):
+        return get_artifact(value.digest, missing_ok=True)
+    if isinstance(value, dict):
+        return type(value)((key, resolve_artifacts(item)) for key, item in value.items())
+    return value
+
+def artifact_stats():
+    """
+    Stored artifact count and compressed size, plus this process's write/dedup counters.
+    """
+    stored = get_state_backend().stats(f"{ARTIFACT_NAMESPACE}/")
+    with _lock:
+        return {'artifacts': stored['keys'], 'stored_bytes': stored['bytes'], 'cached': len(_cache), **_stats}
@@ -0,0 +1,222 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from agent_bus import STATE_DIR
+from shared_state import VersionConflictError, get_state_backend, state_key # Replicas agree on one signing key
+
+# --- Auth Settings ---
+USER_DB_PATH = os.path.join(STATE_DIR, 'users.db')
+SESSION_SECRET_KEY = state_key('config', 'session_secret')
+PASSWORD_HASH_ITERATIONS = 120_000 # PBKDF2-SHA256; hashlib releases the GIL, so concurrent logins run in parallel
+SALT_BYTES = 16
+SESSION_TTL_SECONDS = 12 * 3600 # One shift
+REVOKED_SESSION_NAMESPACE = 'revoked_sessions' # Token ids revoked at logout, kept until the token would expire
+SESSION_TICKET_NAMESPACE = 'session_tickets' # One-time tickets a reconnecting browser exchanges for its session token
+SESSION_TICKET_TTL_SECONDS = 300
+
+# --- Role Permissions ---
+def build_access_masks(role_agent_access):
+    """
+    Precomputes {role: bitmask} from {role: [agent ids]}; bit N is set when the role may use agent N.
+    """
+    masks = {}
+    for role, agent_ids in role_agent_access.items():
+        mask = 0
+        for agent_id in agent_ids:
+            mask |= 1 << agent_id
+        masks[role] = mask
+    return masks
+
+def mask_allows(mask, agent_id):
+    return (mask >> agent_id) & 1 == 1
+
+# --- Password Hashing ---
+def hash_password(password, salt=None, iterations=PASSWORD_HASH_ITERATIONS):
+    """
+    Returns (salt, hash) for a password using PBKDF2-SHA256 with a random per-user salt.
+    """
+    salt = salt or os.urandom(SALT_BYTES)
+    return salt, hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+# --- Backends ---
+class AuthBackend:
+    """
+    Interface every credential store provides, so SSO/LDAP backends can replace the local one.
+    `authenticate` returns {'username', 'role'} or None.
+    """
+
+    def authenticate(self, username, password):
+        raise NotImplementedError
+
+    def get_user(self, username):
+        raise NotImplementedError
+
+class SQLiteAuthBackend(AuthBackend):
+    """
+    Local user store: one row per user with a salted PBKDF2 hash, looked up by primary key.
+    """
+
+    def __init__(self, db_path=USER_DB_PATH):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                role TEXT NOT NULL,
+                salt BLOB NOT NULL,
+                password_hash BLOB NOT NULL,
+                iterations INTEGER NOT NULL
+            )""")
+        self._connection.commit()
+
+    def set_password(self, username, password, role):
+        salt, password_hash = hash_password(password)
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO users (username, role, salt, password_hash, iterations) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET role = excluded.role, salt = excluded.salt, "
+                "password_hash = excluded.password_hash, iterations = excluded.iterations",
+                (username, role, salt, password_hash, PASSWORD_HASH_ITERATIONS))
+            self._connection.commit()
+
+    def seed_users(self, users):
+        """
+        Adds {username: (password, role)} entries that are not in the store yet.
+        """
+        with self._lock:
+            existing = {row[0] for row in self._connection.execute("SELECT username FROM users")}
+        for username, (password, role) in users.items():
+            if username not in existing:
+                self.set_password(username, password, role)
+
+    def _fetch(self, username):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT role, salt, password_hash, iterations FROM users WHERE username = ?", (username,)).fetchone()
+
+    def get_user(self, username):
+        row = self._fetch(username)
+        return {'username': username, 'role': row[0]} if row else None
+
+    def authenticate(self, username, password):
+        row = self._fetch(username)
+        if row is None:
+            hash_password(password) # Same work as a real check, so unknown usernames are not faster
+            return None
+        role, salt, password_hash, iterations = row
+        _, candidate = hash_password(password, salt, iterations)
+        if not hmac.compare_digest(candidate, password_hash):
+            return None
+        return {'username': username, 'role': role}
+
+# --- Session Tokens ---
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def load_session_secret(backend=None):
+    """
+    Signing key from SDLC_SESSION_SECRET, else a random key kept in the local shared state store.
+    The first process to start creates it; the others read the same key. A networked store is
+    never trusted with the key: deployments using one must set SDLC_SESSION_SECRET on every replica.
+    """
+    if os.environ.get('SDLC_SESSION_SECRET'):
+        return os.environ['SDLC_SESSION_SECRET'].encode('utf-8')
+    backend = backend or get_state_backend()
+    if backend.networked:
+        raise RuntimeError("SDLC_SESSION_SECRET must be set when SDLC_STATE_BACKEND points at a networked store")
+    secret, _ = backend.get(SESSION_SECRET_KEY)
+    if secret is None:
+        try:
+            backend.put(SESSION_SECRET_KEY, secrets.token_bytes(32), expected_version=0)
+        except VersionConflictError:
+            pass # Another process created it first
+        secret, _ = backend.get(SESSION_SECRET_KEY)
+    return secret
+
+def issue_session_token(user, secret, ttl=SESSION_TTL_SECONDS):
+    """
+    Returns '<payload>.<signature>' where payload is username:role:expiry, HMAC-SHA256 signed.
+    """
+    payload = _b64encode(f"{user['username']}:{user['role']}:{int(time.time() + ttl)}".encode('utf-8'))
+    signature = _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest())
+    return f"{payload}.{signature}"
+
+def _revoked_key(signature):
+    return state_key(REVOKED_SESSION_NAMESPACE, hashlib.sha256(signature.encode('ascii')).hexdigest())
+
+def verify_session_token(token, secret, backend=None):
+    """
+    Returns {'username', 'role', 'expires_at'} for a valid, unexpired and unrevoked token,
+    otherwise None. The role is the one the user had when the token was issued.
+    """
+    try:
+        payload, signature = token.split('.')
+        expected = _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            return None
+        username, role, expiry = _b64decode(payload).decode('utf-8').rsplit(':', 2)
+    except (ValueError, UnicodeError):
+        return None
+    if int(expiry) < time.time():
+        return None
+    revoked, _ = (backend or get_state_backend()).get(_revoked_key(signature))
+    if revoked is not None:
+        return None
+    return {'username': username, 'role': role, 'expires_at': int(expiry)}
+
+def _ticket_key(ticket):
+    return state_key(SESSION_TICKET_NAMESPACE, hashlib.sha256(ticket.encode('utf-8')).hexdigest())
+
+def issue_session_ticket(session_token, backend=None, ttl=SESSION_TICKET_TTL_SECONDS):
+    """
+    Returns a random ticket that `redeem_session_ticket` exchanges once for `session_token`
+    within `ttl` seconds. Only the ticket is put in the URL, so browser history, proxy logs and
+    Referer headers never carry the session token itself.
+    """
+    ticket = secrets.token_urlsafe(24)
+    (backend or get_state_backend()).put(_ticket_key(ticket), session_token.encode('ascii'), ttl=ttl)
+    return ticket
+
+def redeem_session_ticket(ticket, backend=None):
+    """
+    Returns the session token a ticket was issued for and invalidates the ticket, or None for an
+    unknown, expired or already redeemed ticket.
+    """
+    if not ticket:
+        return None
+    backend = backend or get_state_backend()
+    key = _ticket_key(ticket)
+    token, version = backend.get(key)
+    if token is None:
+        return None
+    try:
+        backend.delete(key, expected_version=version)
+    except VersionConflictError:
+        return None # Redeemed concurrently by another request
+    return token.decode('ascii')
+
+def discard_session_ticket(ticket, backend=None):
+    (backend or get_state_backend()).delete(_ticket_key(ticket))
+
+def revoke_session_token(token, secret, backend=None):
+    """
+    Revokes a token on every replica until it would have expired anyway. Returns False if the
+    token was not valid to begin with.
+    """
+    backend = backend or get_state_backend()
+    session = verify_session_token(token, secret, backend)
+    if session is None:
+        return False
+    backend.put(_revoked_key(token.split('.')[1]), b"1", ttl=max(session['expires_at'] - time.time(), 1))
+    return True
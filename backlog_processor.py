@@ -0,0 +1,311 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_bus import STATE_DIR
+from artifact_store import get_artifact, put_artifact # Content-addressed artifacts shared across runs
+from shared_state import get_state_backend, state_key # Prompt cache shared by every replica
+
+logger = logging.getLogger(__name__)
+
+# --- Bulk Settings ---
+BACKLOG_DB_PATH = os.path.join(STATE_DIR, 'backlog.db')
+DEFAULT_BULK_CONCURRENCY = 8 # LLM calls in flight per server process, across all bulk jobs
+SPRINT_SIZE = 20 # Backlog items the Planner Agent groups into one sprint summary
+MAX_BACKLOG_ITEMS = 10000
+TEXT_COLUMNS = ('requirement', 'description', 'text', 'story', 'summary', 'title', 'item') # First match holds the item text
+# Bulk prompts ask for the same output as the BA and Planner Agents' interactive steps
+BULK_TRD_PROMPT = "Write a concise Technical Requirements Document for this business requirement: {requirement}"
+BULK_SPRINT_PROMPT = "Propose a sprint goal and a brief summary for a sprint delivering these backlog items: {items}"
+
+class BacklogFormatError(ValueError):
+    """Raised when an uploaded backlog cannot be parsed into items."""
+
+# --- Parsing ---
+def normalize_text(text):
+    return " ".join(str(text).split())
+
+def backlog_item_key(text):
+    return hashlib.sha256(normalize_text(text).lower().encode('utf-8')).hexdigest()
+
+def _item_from_record(record):
+    if isinstance(record, str):
+        return {'title': normalize_text(record)[:80], 'text': normalize_text(record)}
+    fields = {str(name).strip().lower(): value for name, value in record.items() if value not in (None, "")}
+    text_column = next((column for column in TEXT_COLUMNS if column in fields), None)
+    if text_column is None:
+        return None
+    text = normalize_text(fields[text_column])
+    return {'title': normalize_text(fields.get('title', text))[:80], 'text': text}
+
+def parse_backlog(raw, filename):
+    """
+    Reads a CSV (a header row with a requirement/description/title column) or JSON (a list of
+    strings or objects) backlog. Returns (items, duplicates) where items are unique by
+    normalized text, in file order, as {'key', 'title', 'text'}.
+    """
+    try:
+        if filename.lower().endswith('.json'):
+            records = json.loads(raw)
+            if isinstance(records, dict):
+                records = records.get('items', [])
+        else:
+            records = list(csv.DictReader(io.StringIO(raw.decode('utf-8-sig'))))
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise BacklogFormatError(f"Could not read backlog {filename}: {e}")
+    if not isinstance(records, list):
+        raise BacklogFormatError("A JSON backlog must be a list of items")
+    items, seen, duplicates = [], set(), 0
+    for record in records:
+        item = _item_from_record(record) if isinstance(record, (str, dict)) else None
+        if not item or not item['text']:
+            continue
+        key = backlog_item_key(item['text'])
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        items.append(dict(item, key=key))
+    if not items:
+        raise BacklogFormatError(f"No backlog items found in {filename}; expected a column named one of {', '.join(TEXT_COLUMNS)}")
+    if len(items) > MAX_BACKLOG_ITEMS:
+        raise BacklogFormatError(f"Backlog has {len(items)} items; at most {MAX_BACKLOG_ITEMS} are processed at once")
+    return items, duplicates
+
+# --- Run Store ---
+_lock = threading.Lock()
+_connection = None
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(BACKLOG_DB_PATH), exist_ok=True)
+        _connection = sqlite3.connect(BACKLOG_DB_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS backlog_items (
+                run_id TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (run_id, item_key)
+            )""")
+        # One row per unit of work: a TRD per item, a sprint summary per SPRINT_SIZE items
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS backlog_results (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                unit_key TEXT NOT NULL,
+                prompt_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                digest TEXT,
+                cached INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, stage, unit_key)
+            )""")
+        # Finished prompts are reused across runs instead of calling the LLM again
+        _connection.execute("CREATE INDEX IF NOT EXISTS idx_backlog_prompt ON backlog_results (prompt_key, status)")
+        _connection.commit()
+    return _connection
+
+def store_backlog_items(run_id, items):
+    """
+    Adds items to a run's backlog after the ones already there; items already in it are kept.
+    """
+    with _lock:
+        connection = _get_connection()
+        start = connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM backlog_items WHERE run_id = ?", (run_id,)).fetchone()[0]
+        connection.executemany(
+            "INSERT OR IGNORE INTO backlog_items (run_id, item_key, position, title, text) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, item['key'], start + i, item['title'], item['text']) for i, item in enumerate(items)])
+        connection.commit()
+
+def load_backlog_items(run_id):
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT item_key, title, text FROM backlog_items WHERE run_id = ? ORDER BY position", (run_id,)).fetchall()
+    return [{'key': key, 'title': title, 'text': text} for key, title, text in rows]
+
+def _finished_units(run_id, stage):
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT unit_key, digest FROM backlog_results WHERE run_id = ? AND stage = ? AND status = 'done'",
+            (run_id, stage)).fetchall()
+    return dict(rows)
+
+def _cached_digest(prompt_key):
+    digest, _ = get_state_backend().get(state_key('llm_cache', prompt_key))
+    return digest.decode('ascii') if digest else None
+
+def _cache_digest(prompt_key, digest):
+    get_state_backend().put(state_key('llm_cache', prompt_key), digest.encode('ascii'))
+
+def _save_result(run_id, stage, unit_key, prompt_key, status, digest=None, cached=False, error=None):
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT INTO backlog_results (run_id, stage, unit_key, prompt_key, status, digest, cached, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(run_id, stage, unit_key) DO UPDATE SET "
+            "prompt_key = excluded.prompt_key, status = excluded.status, digest = excluded.digest, "
+            "cached = excluded.cached, error = excluded.error, updated_at = excluded.updated_at",
+            (run_id, stage, unit_key, prompt_key, status, digest, int(cached), error, time.time()))
+        connection.commit()
+
+def backlog_progress(run_id):
+    """
+    Persisted progress of a run's backlog: {'items', 'sprints', 'trd': {status: count}, 'sprint': {status: count}, 'cached'}.
+    """
+    with _lock:
+        connection = _get_connection()
+        items = connection.execute("SELECT COUNT(*) FROM backlog_items WHERE run_id = ?", (run_id,)).fetchone()[0]
+        rows = connection.execute("SELECT stage, status, COUNT(*), SUM(cached) FROM backlog_results WHERE run_id = ? "
+                                  "GROUP BY stage, status", (run_id,)).fetchall()
+    progress = {'items': items, 'sprints': -(-items // SPRINT_SIZE), 'trd': {}, 'sprint': {}, 'cached': 0}
+    for stage, status, count, cached in rows:
+        progress[stage][status] = count
+        progress['cached'] += cached or 0
+    return progress
+
+def backlog_results(run_id, offset=0, limit=100):
+    """
+    One page of a run's items in backlog order with their TRD: [{'title', 'text', 'status', 'cached', 'trd'}].
+    """
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT i.title, i.text, r.status, r.cached, r.digest, r.error FROM backlog_items i "
+            "LEFT JOIN backlog_results r ON r.run_id = i.run_id AND r.stage = 'trd' AND r.unit_key = i.item_key "
+            "WHERE i.run_id = ? ORDER BY i.position LIMIT ? OFFSET ?", (run_id, limit, offset)).fetchall()
+    return [{'title': title, 'text': text, 'status': status or 'pending', 'cached': bool(cached),
+             'trd': get_artifact(digest, missing_ok=True) if digest else (error or "")}
+            for title, text, status, cached, digest, error in rows]
+
+def sprint_summaries(run_id):
+    """
+    Finished sprint summaries of a run in sprint order: [(sprint number, summary)].
+    """
+    done = _finished_units(run_id, 'sprint')
+    return sorted((int(unit_key.split('-')[1]), get_artifact(digest, missing_ok=True)) for unit_key, digest in done.items())
+
+def export_backlog_csv(run_id):
+    """
+    All of a run's items with their TRD status and text as CSV.
+    """
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=['title', 'text', 'status', 'cached', 'trd'])
+    writer.writeheader()
+    writer.writerows(backlog_results(run_id, limit=-1))
+    return output.getvalue()
+
+# --- Processing ---
+def _prompt_key(stage, prompt):
+    return hashlib.sha256(f"{stage}\n{prompt}".encode('utf-8')).hexdigest()
+
+class BacklogProcessor:
+    """
+    Runs bulk backlogs through the BA Agent (a TRD per item) and then the Planner Agent (a sprint
+    summary per SPRINT_SIZE items) on a bounded worker pool shared by all jobs. Every finished unit
+    is written to this host's backlog store at once, so a stopped or crashed job resumes where it
+    left off on the same host, and a prompt finished before (in any run, on any replica, through the
+    shared prompt cache) is reused instead of calling the LLM again.
+
+    `trd_prompt(item)` and `sprint_prompt(items, trds)` build prompts; `call_llm(stage, prompt)`
+    answers them and may raise `stop_errors` (e.g. an exhausted budget) to pause the job.
+    """
+
+    def __init__(self, trd_prompt, sprint_prompt, max_workers=DEFAULT_BULK_CONCURRENCY):
+        self.trd_prompt = trd_prompt
+        self.sprint_prompt = sprint_prompt
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backlog")
+        self._lock = threading.Lock()
+        self._jobs = {} # run_id -> {'state', 'error', 'stop': Event}
+
+    def job_state(self, run_id):
+        with self._lock:
+            job = self._jobs.get(run_id)
+            return {'state': job['state'], 'error': job['error']} if job else None
+
+    def submit(self, run_id, call_llm, items=None, stop_errors=()):
+        """
+        Adds `items` to the run's backlog and starts (or resumes) processing it in the background.
+        Returns False if the run's job is already running.
+        """
+        if items:
+            store_backlog_items(run_id, items)
+        with self._lock:
+            job = self._jobs.get(run_id)
+            if job and job['state'] == 'running':
+                return False
+            self._jobs[run_id] = {'state': 'running', 'error': None, 'stop': threading.Event()}
+            stop = self._jobs[run_id]['stop']
+        threading.Thread(target=self._run_job, args=(run_id, call_llm, stop, stop_errors), name=f"backlog-{run_id[:8]}", daemon=True).start()
+        return True
+
+    def stop(self, run_id):
+        with self._lock:
+            job = self._jobs.get(run_id)
+            if job and job['state'] == 'running':
+                job['stop'].set()
+
+    def _process_unit(self, run_id, stage, unit_key, prompt, call_llm, stop, stop_errors):
+        if stop.is_set():
+            return
+        prompt_key = _prompt_key(stage, prompt)
+        digest = _cached_digest(prompt_key)
+        if digest:
+            _save_result(run_id, stage, unit_key, prompt_key, 'done', digest=digest, cached=True)
+            return
+        try:
+            response = call_llm(stage, prompt)
+        except stop_errors as e:
+            stop.set()
+            self._finish(run_id, 'paused', str(e))
+            return
+        except Exception as e:
+            logger.exception("Backlog %s unit %s failed in run %s", stage, unit_key, run_id)
+            _save_result(run_id, stage, unit_key, prompt_key, 'failed', error=str(e))
+            return
+        digest = put_artifact(response)
+        _cache_digest(prompt_key, digest)
+        _save_result(run_id, stage, unit_key, prompt_key, 'done', digest=digest)
+
+    def _run_stage(self, run_id, stage, units, call_llm, stop, stop_errors):
+        finished = _finished_units(run_id, stage)
+        futures = [self._executor.submit(self._process_unit, run_id, stage, unit_key, prompt, call_llm, stop, stop_errors)
+                   for unit_key, prompt in units if unit_key not in finished]
+        for future in futures:
+            future.result()
+
+    def _run_job(self, run_id, call_llm, stop, stop_errors):
+        try:
+            items = load_backlog_items(run_id)
+            self._run_stage(run_id, 'trd', ((item['key'], self.trd_prompt(item)) for item in items),
+                            call_llm, stop, stop_errors)
+            trds = _finished_units(run_id, 'trd')
+            sprints = []
+            for start in range(0, len(items), SPRINT_SIZE):
+                chunk = items[start:start + SPRINT_SIZE]
+                if all(item['key'] in trds for item in chunk): # A sprint with failed TRDs waits for a retry
+                    sprints.append((f"sprint-{start // SPRINT_SIZE + 1}",
+                                    self.sprint_prompt(chunk, [get_artifact(trds[item['key']]) for item in chunk])))
+            self._run_stage(run_id, 'sprint', sprints, call_llm, stop, stop_errors)
+        except Exception as e:
+            logger.exception("Backlog job failed in run %s", run_id)
+            self._finish(run_id, 'failed', str(e))
+            return
+        self._finish(run_id, 'stopped' if stop.is_set() else 'done', None)
+
+    def _finish(self, run_id, state, error):
+        with self._lock:
+            job = self._jobs[run_id]
+            if job['state'] == 'running':
+                job['state'], job['error'] = state, error
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import time
+import zlib
+
+from artifact_store import ArtifactRef, externalize_artifacts, resolve_artifacts
+from shared_state import get_state_backend, state_key # Any replica can resume any run
+
+# --- Checkpoint Settings ---
+CHECKPOINT_NAMESPACE = 'checkpoint'
+COMPRESSION_LEVEL = 1 # Fast zlib level: snapshots are small and written after every step
+
+# Session keys that make up an in-flight workflow. Authentication keys are deliberately
+# excluded so resuming a run never logs anyone in.
+WORKFLOW_STATE_KEYS = [
+    'run_id',
+    'current_phase_index',
+    'completed_phases_outputs',
+    'agent_detailed_view',
+    'current_agent_step_index',
+    'last_agent_output_for_phase_completion',
+    'current_view',
+    'agent_step_positions',
+    'batch_evaluation_results',
+    'sandbox_runs',
+    'log_anomaly_summary',
+    'finops_analysis',
+    'published_completions',
+    'scheduled_run_id',
+]
+# Per-agent keys are captured by prefix
+WORKFLOW_STATE_PREFIXES = ('llm_output_agent_', 'context_stats_agent_')
+
+_last_saved_digest = {} # run_id -> digest of the last snapshot written, to skip unchanged saves
+
+# --- Snapshots ---
+def snapshot_session_state(session_state):
+    """
+    Extracts the workflow portion of a Streamlit session state into a plain dict.
+    """
+    snapshot = {key: session_state[key] for key in WORKFLOW_STATE_KEYS if key in session_state}
+    for key in list(session_state.keys()):
+        if isinstance(key, str) and key.startswith(WORKFLOW_STATE_PREFIXES):
+            snapshot[key] = session_state[key]
+    return snapshot
+
+# Checkpoints are stored as tagged JSON, never pickles: a record read from a networked store
+# must not be able to run code on the replica that loads it
+def _to_json(value):
+    if isinstance(value, ArtifactRef):
+        return {'$artifact': value.digest}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith('$') for key in value):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {'$items': [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {'$tuple': [_to_json(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'$set': [_to_json(item) for item in value]}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, 'item'): # numpy/pandas scalars, e.g. in FinOps findings
+        return value.item()
+    return str(value)
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        tag, items = next(iter(value.items()))
+        if tag == '$artifact':
+            return ArtifactRef(items)
+        if tag == '$items':
+            return {_from_json(key): _from_json(item) for key, item in items}
+        if tag == '$tuple':
+            return tuple(_from_json(item) for item in items)
+        if tag == '$set':
+            return {_from_json(item) for item in items}
+    return {key: _from_json(item) for key, item in value.items()}
+
+def encode_snapshot(snapshot):
+    """
+    Large outputs go to the shared artifact store; the checkpoint only keeps their hashes.
+    """
+    return json.dumps(_to_json(externalize_artifacts(snapshot)), separators=(',', ':'), sort_keys=True)
+
+def decode_snapshot(encoded):
+    return resolve_artifacts(_from_json(json.loads(encoded)))
+
+def _encode_record(owner, updated_at, encoded_state):
+    return zlib.compress(json.dumps({'owner': owner, 'updated_at': updated_at, 'state': encoded_state}).encode('utf-8'), COMPRESSION_LEVEL)
+
+def _decode_record(record):
+    return json.loads(zlib.decompress(record).decode('utf-8'))
+
+# --- Store ---
+def save_checkpoint(run_id, snapshot, owner=None):
+    """
+    Writes the latest snapshot of a run. Returns False without touching the store when
+    the snapshot is identical to the last one saved by this process. The run keeps its first
+    owner even when replicas race to save it.
+    """
+    encoded_state = encode_snapshot(snapshot)
+    digest = hashlib.sha1(encoded_state.encode('utf-8')).digest()
+    if _last_saved_digest.get(run_id) == digest:
+        return False
+    def merge(previous):
+        previous_owner = _decode_record(previous)['owner'] if previous is not None else None
+        return _encode_record(previous_owner or owner, time.time(), encoded_state)
+    get_state_backend().update(state_key(CHECKPOINT_NAMESPACE, run_id), merge)
+    _last_saved_digest[run_id] = digest
+    return True
+
+def load_checkpoint(run_id):
+    """
+    Returns {'run_id', 'owner', 'updated_at', 'version', 'state'} for a run, or None if it was never checkpointed.
+    """
+    record, version = get_state_backend().get(state_key(CHECKPOINT_NAMESPACE, run_id))
+    if record is None:
+        return None
+    record = _decode_record(record)
+    return {'run_id': run_id, 'owner': record['owner'], 'updated_at': record['updated_at'], 'version': version,
+            'state': decode_snapshot(record['state'])}
+
+def delete_checkpoint(run_id):
+    get_state_backend().delete(state_key(CHECKPOINT_NAMESPACE, run_id))
+    _last_saved_digest.pop(run_id, None)
+
+def restore_session_state(session_state, checkpoint):
+    """
+    Applies a loaded checkpoint onto a Streamlit session state.
+    """
+    for key, value in checkpoint['state'].items():
+        session_state[key] = value
@@ -0,0 +1,230 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+from structured_outputs import readable_output # Upstream outputs are read in their parsed form
+
+# --- Token Budgets ---
+# Maximum number of upstream-context tokens each agent may receive in its prompt.
+# Agents fed by many upstream agents (the Evaluator takes input from seven) get a
+# larger total, but every upstream output is compacted to its share of the budget.
+DEFAULT_CONTEXT_BUDGET = 400
+AGENT_CONTEXT_BUDGETS = {
+    'BA Agent': 0, # Primary initiator, no upstream input
+    'Planner Agent': 400,
+    'Architect Agent': 400,
+    'Developer Agent': 500,
+    'Functional Tester Agent': 400,
+    'DevOps Agent': 300,
+    'Ops Engineer Agent': 300,
+    'Evaluator Agent': 700,
+    'Memory Agent': 0,
+    'FinOps Agent': 300,
+}
+
+# Smallest share an upstream output is compacted to while the budget lasts, even for agents with many inputs
+MIN_TOKENS_PER_INPUT = 40
+
+# --- Token Counting ---
+# Local approximation of a BPE tokenizer: words, short digit groups and punctuation
+# each count as one token, and long words are split into ~4 character pieces.
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+def count_tokens(text):
+    """
+    Approximates the number of model tokens in `text` without calling a tokenizer service.
+    """
+    if not text:
+        return 0
+    count = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece = match.group(0)
+        count += 1 + (len(piece) - 1) // 4 if piece[0].isalpha() else 1
+    return count
+
+# --- Compaction Cache ---
+# Compacted upstream outputs keyed by (content hash, budget). Lives at module level so it
+# survives Streamlit reruns and is shared by every session served by this process.
+_COMPACTION_CACHE_SIZE = 512
+_compaction_cache = OrderedDict()
+
+def _cache_key(text, budget):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest(), budget
+
+def _split_segments(text):
+    """
+    Splits an output into lines, keeping fenced code blocks as single segments so
+    extractive trimming never cuts a code snippet in half.
+    """
+    segments = []
+    in_code = False
+    code_lines = []
+    for line in text.splitlines():
+        if line.strip().startswith("```"):
+            code_lines.append(line)
+            if in_code:
+                segments.append("\n".join(code_lines))
+                code_lines = []
+            in_code = not in_code
+        elif in_code:
+            code_lines.append(line)
+        elif line.strip():
+            segments.append(line)
+    if code_lines:
+        segments.append("\n".join(code_lines))
+    return segments
+
+def _segment_score(segment, position):
+    """
+    Scores a segment for extractive trimming: labelled lines ("Sprint Goal: ..."),
+    numbered items and code signatures carry most of the meaning of agent outputs.
+    """
+    score = 1.0 / (1 + position) # Earlier lines usually summarize the rest
+    stripped = segment.lstrip()
+    if re.match(r"^[*\w][\w\s()*/-]{0,40}:", stripped):
+        score += 2.0
+    if re.match(r"^(\d+\.|[-*]\s)", stripped):
+        score += 1.0
+    if stripped.startswith("```") or stripped.startswith("def ") or stripped.startswith("class "):
+        score += 1.5
+    return score
+
+def _trim_code_block(segment, budget):
+    """
+    Keeps the fence and signature lines of a code block that does not fit the budget.
+    """
+    kept = [line for line in segment.splitlines()
+            if line.strip().startswith(("```", "def ", "class ", "async def "))]
+    trimmed = "\n".join(kept)
+    return trimmed if count_tokens(trimmed) <= budget else ""
+
+def extractive_trim(text, budget):
+    """
+    Returns the highest-scoring lines of `text` that fit within `budget` tokens,
+    in their original order. The first line is always kept when it fits.
+    """
+    segments = _split_segments(text)
+    costs = [count_tokens(segment) for segment in segments]
+    ranked = sorted(range(len(segments)), key=lambda i: _segment_score(segments[i], i), reverse=True)
+    if segments:
+        ranked.remove(0)
+        ranked.insert(0, 0)
+
+    selected = {}
+    remaining = budget
+    for i in ranked:
+        if costs[i] <= remaining:
+            selected[i] = segments[i]
+            remaining -= costs[i]
+        elif segments[i].lstrip().startswith("```"):
+            trimmed = _trim_code_block(segments[i], remaining)
+            if trimmed:
+                selected[i] = trimmed
+                remaining -= count_tokens(trimmed)
+    return "\n".join(selected[i] for i in sorted(selected))
+
+def compact_output(text, budget, summarizer=None):
+    """
+    Compacts a single upstream output to at most `budget` tokens.
+    Uses `summarizer(text, budget)` (e.g. an LLM summary call) when given, falling back to
+    extractive trimming. Results are cached by content hash so each output is compacted once.
+    """
+    text = str(text)
+    if count_tokens(text) <= budget:
+        return text
+
+    key = _cache_key(text, budget)
+    if key in _compaction_cache:
+        _compaction_cache.move_to_end(key)
+        return _compaction_cache[key]
+
+    compacted = None
+    if summarizer is not None:
+        try:
+            compacted = summarizer(text, budget)
+        except Exception:
+            compacted = None # Fall back to extractive trimming if the summary call fails
+        if compacted and count_tokens(compacted) > budget:
+            compacted = extractive_trim(compacted, budget)
+    if not compacted:
+        compacted = extractive_trim(text, budget)
+
+    _compaction_cache[key] = compacted
+    if len(_compaction_cache) > _COMPACTION_CACHE_SIZE:
+        _compaction_cache.popitem(last=False)
+    return compacted
+
+# --- Context Builder ---
+def collect_upstream_outputs(agent, agent_data, workflow_data, completed_phases_outputs):
+    """
+    Returns an OrderedDict of upstream agent name -> completed phase output for every agent
+    listed in `agent['receives_input_from']` whose phase has produced output. JSON-mode outputs
+    are read in their parsed form, rendered as labelled text.
+    """
+    phase_by_agent_name = {agent_data[p['primary_agent_id']]['name']: p['phase_id'] for p in workflow_data}
+    feature_by_agent_name = {upstream_agent['name']: upstream_agent['llm_feature'] for upstream_agent in agent_data.values()}
+    upstream = OrderedDict()
+    for input_agent_name in agent.get('receives_input_from', []):
+        source_phase_id = phase_by_agent_name.get(input_agent_name)
+        if source_phase_id and completed_phases_outputs.get(source_phase_id):
+            upstream[input_agent_name] = readable_output(feature_by_agent_name.get(input_agent_name),
+                                                         str(completed_phases_outputs[source_phase_id]))
+    return upstream
+
+def _allocate_budget(costs, budget):
+    """
+    Splits `budget` across inputs. Inputs smaller than an equal share keep their full size and
+    the unused remainder is redistributed to the larger inputs. The MIN_TOKENS_PER_INPUT floor
+    never lifts the total above `budget`; inputs left once it is spent get nothing.
+    """
+    allocation = {}
+    pending = sorted(costs, key=costs.get)
+    remaining = budget
+    while pending:
+        share = min(max(remaining // len(pending), MIN_TOKENS_PER_INPUT), remaining)
+        name = pending.pop(0)
+        allocation[name] = min(costs[name], share)
+        remaining -= allocation[name]
+    return allocation
+
+def build_agent_context(agent, upstream_outputs, budget=None, summarizer=None):
+    """
+    Compacts `upstream_outputs` (name -> text) to fit the agent's context budget.
+    Returns a dict with the compacted sections and the token accounting for this build.
+    """
+    if budget is None:
+        budget = AGENT_CONTEXT_BUDGETS.get(agent['name'], DEFAULT_CONTEXT_BUDGET)
+
+    costs = {name: count_tokens(text) for name, text in upstream_outputs.items()}
+    allocation = _allocate_budget(costs, budget) if costs else {}
+
+    sections = []
+    for name, text in upstream_outputs.items():
+        compacted = compact_output(text, allocation[name], summarizer=summarizer)
+        sections.append({'source': name, 'text': compacted,
+                         'original_tokens': costs[name], 'tokens': count_tokens(compacted)})
+
+    tokens_before = sum(costs.values())
+    tokens_after = sum(section['tokens'] for section in sections)
+    context = {
+        'agent': agent['name'],
+        'budget': budget,
+        'sections': sections,
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'tokens_saved': tokens_before - tokens_after,
+    }
+    return context
+
+def compose_prompt(context, user_input):
+    """
+    Prepends the compacted upstream context to the user's input for the LLM call.
+    Prompts for agents without upstream output are sent unchanged.
+    """
+    if not context['sections']:
+        return user_input
+    parts = ["Context from upstream agents:"]
+    for section in context['sections']:
+        parts.append(f"[{section['source']}]\n{section['text']}")
+    parts.append(f"Task:\n{user_input}")
+    return "\n\n".join(parts)
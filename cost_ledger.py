@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote, unquote
+
+from agent_bus import STATE_DIR
+from llm_client import DEFAULT_MODEL
+from shared_state import get_state_backend, state_key # Totals, and so role budgets, are shared by every replica
+
+# --- Ledger Settings ---
+# Each host appends its own calls to a local SQLite ledger; the running totals per dimension
+# (which the dashboards and role budgets read) live in the shared state store under
+# llm_totals/<dimension>/<key>, so every replica sees and enforces the same spend.
+LEDGER_DB_PATH = os.path.join(STATE_DIR, 'llm_ledger.db')
+TOTALS_NAMESPACE = 'llm_totals'
+# USD per million (prompt, response) tokens
+MODEL_PRICES_PER_MILLION = {
+    'gemini-2.0-flash-lite': (0.075, 0.30),
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+UNATTRIBUTED_ROLE = 'system' # Background runs (event bus, DAG scheduler) have no logged-in user
+AGGREGATE_DIMENSIONS = ('agent', 'phase', 'role', 'run', 'model', 'source', 'role_day')
+
+# Daily spend per role in USD; past the soft limit the user is warned, at the hard limit LLM calls are refused
+ROLE_DAILY_BUDGETS_USD = {
+    'ba_user': {'soft': 0.05, 'hard': 0.10},
+    'architect_user': {'soft': 0.05, 'hard': 0.10},
+    'planner_user': {'soft': 0.05, 'hard': 0.10},
+    'dev_user': {'soft': 0.10, 'hard': 0.20},
+    'qa_user': {'soft': 0.05, 'hard': 0.10},
+    'devops_user': {'soft': 0.05, 'hard': 0.10},
+    'ops_user': {'soft': 0.05, 'hard': 0.10},
+}
+
+_lock = threading.Lock()
+_connection = None
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(LEDGER_DB_PATH), exist_ok=True)
+        _connection = sqlite3.connect(LEDGER_DB_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        # Append-only: rows are never updated or deleted
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                call_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                run_id TEXT,
+                agent TEXT,
+                phase TEXT,
+                role TEXT NOT NULL,
+                model TEXT NOT NULL,
+                source TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                response_tokens INTEGER NOT NULL,
+                latency_ms INTEGER NOT NULL,
+                cost_usd REAL NOT NULL
+            )""")
+        _connection.commit()
+    return _connection
+
+def _utc_day(timestamp):
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+def _totals_key(dimension, key):
+    return state_key(TOTALS_NAMESPACE, dimension, quote(str(key), safe=''))
+
+def estimate_cost(model, prompt_tokens, response_tokens):
+    prompt_price, response_price = MODEL_PRICES_PER_MILLION.get(model, MODEL_PRICES_PER_MILLION[DEFAULT_MODEL])
+    return (prompt_tokens * prompt_price + response_tokens * response_price) / 1_000_000
+
+# --- Recording ---
+def record_llm_call(prompt_tokens, response_tokens, latency_ms, model=DEFAULT_MODEL, run_id=None, agent=None,
+                    phase=None, role=None, source='ui'):
+    """
+    Appends one LLM call to the ledger and folds it into the running totals per agent, phase,
+    role, run, model, source ('ui', 'headless', 'prefetch') and role/day. Returns the call's
+    estimated cost in USD.
+    """
+    now = time.time()
+    role = role or UNATTRIBUTED_ROLE
+    cost = estimate_cost(model, prompt_tokens, response_tokens)
+    keys = {'agent': agent, 'phase': phase, 'role': role, 'run': run_id, 'model': model, 'source': source,
+            'role_day': f"{role}:{_utc_day(now)}"}
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT INTO llm_calls (created_at, run_id, agent, phase, role, model, source, prompt_tokens, "
+            "response_tokens, latency_ms, cost_usd) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (now, run_id, agent, phase, role, model, source, prompt_tokens, response_tokens, latency_ms, cost))
+        connection.commit()
+
+    def add_call(value):
+        totals = json.loads(value) if value is not None else {'calls': 0, 'prompt_tokens': 0, 'response_tokens': 0,
+                                                              'latency_ms': 0, 'cost_usd': 0.0}
+        totals['calls'] += 1
+        totals['prompt_tokens'] += prompt_tokens
+        totals['response_tokens'] += response_tokens
+        totals['latency_ms'] += latency_ms
+        totals['cost_usd'] += cost
+        return json.dumps(totals).encode('utf-8')
+    backend = get_state_backend()
+    for dimension, key in keys.items():
+        if key is not None:
+            backend.update(_totals_key(dimension, key), add_call) # Optimistic, so concurrent replicas lose no call
+    return cost
+
+# --- Aggregates ---
+def usage_totals(dimension, limit=None):
+    """
+    Running totals for one of AGGREGATE_DIMENSIONS, most expensive first:
+    [{'key', 'calls', 'prompt_tokens', 'response_tokens', 'avg_latency_ms', 'cost_usd'}].
+    """
+    if dimension not in AGGREGATE_DIMENSIONS:
+        raise ValueError(f"Unknown ledger dimension '{dimension}'")
+    prefix = state_key(TOTALS_NAMESPACE, dimension) + "/"
+    totals = []
+    for key, value, _ in get_state_backend().scan(prefix):
+        row = json.loads(value)
+        totals.append({'key': unquote(key[len(prefix):]), 'calls': row['calls'], 'prompt_tokens': row['prompt_tokens'],
+                       'response_tokens': row['response_tokens'], 'avg_latency_ms': row['latency_ms'] // row['calls'],
+                       'cost_usd': row['cost_usd']})
+    totals.sort(key=lambda row: (-row['cost_usd'], row['key']))
+    return totals[:limit] if limit is not None else totals
+
+def role_spend_today(role):
+    value, _ = get_state_backend().get(_totals_key('role_day', f"{role}:{_utc_day(time.time())}"))
+    return json.loads(value)['cost_usd'] if value is not None else 0.0
+
+def check_budget(role):
+    """
+    Returns (status, spent_usd, budget) for a role's spend today, where status is 'ok', 'soft'
+    (past the soft limit) or 'hard' (at the hard limit; no further calls). Roles without a
+    budget are always 'ok' and get a budget of None.
+    """
+    budget = ROLE_DAILY_BUDGETS_USD.get(role)
+    if budget is None:
+        return 'ok', role_spend_today(role or UNATTRIBUTED_ROLE), None
+    spent = role_spend_today(role)
+    if spent >= budget['hard']:
+        return 'hard', spent, budget
+    if spent >= budget['soft']:
+        return 'soft', spent, budget
+    return 'ok', spent, budget
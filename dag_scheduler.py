@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_DURATION_ESTIMATE = 2.0 # Seconds assumed for an agent with no recorded runs
+DURATION_SMOOTHING = 0.3 # Weight of the newest observation in the moving duration estimate
+FINISHED_RUN_TTL_SECONDS = 600 # Finished runs (and their outputs) are forgotten after this long
+
+# --- DAG Construction ---
+def build_dag(agent_data, agent_ids=None):
+    """
+    Builds the dependency graph of a run from each agent's `receives_input_from`.
+    Returns {agent_id: {'deps': set(ids), 'children': set(ids)}}; upstream agents that are
+    not part of the run are ignored. Raises ValueError if the graph has a cycle.
+    """
+    agent_ids = set(agent_data) if agent_ids is None else set(agent_ids)
+    id_by_name = {agent['name']: agent_id for agent_id, agent in agent_data.items()}
+    dag = {agent_id: {'deps': set(), 'children': set()} for agent_id in agent_ids}
+    for agent_id in agent_ids:
+        for name in agent_data[agent_id].get('receives_input_from', []):
+            dep = id_by_name.get(name)
+            if dep in agent_ids:
+                dag[agent_id]['deps'].add(dep)
+                dag[dep]['children'].add(agent_id)
+    topological_order(dag) # Validates acyclicity
+    return dag
+
+def topological_order(dag):
+    """
+    Kahn's algorithm; returns agent ids in dependency order.
+    """
+    remaining = {node: len(info['deps']) for node, info in dag.items()}
+    ready = sorted(node for node, count in remaining.items() if count == 0)
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in dag[node]['children']:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if len(order) != len(dag):
+        raise ValueError("Agent workflow graph contains a cycle")
+    return order
+
+def critical_path_ranks(dag, durations):
+    """
+    Upward rank of every node: its own duration plus the longest chain of durations below it.
+    Nodes with the highest rank lie on the critical path and are scheduled first.
+    """
+    ranks = {}
+    for node in reversed(topological_order(dag)):
+        below = max((ranks[child] for child in dag[node]['children']), default=0.0)
+        ranks[node] = durations[node] + below
+    return ranks
+
+# --- Scheduler ---
+class DagScheduler:
+    """
+    Runs the agent DAGs of many concurrent SDLC runs on one shared pool of worker threads.
+    Ready nodes from all runs wait in a single priority queue ordered by critical-path rank,
+    so each run's longest dependency chain is never starved by independent side branches.
+    Finished runs are forgotten FINISHED_RUN_TTL_SECONDS after they finish.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self._ready = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._runs = {}
+        self._duration_estimates = {}
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker_loop, name=f"dag-worker-{i}", daemon=True) for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def estimate_duration(self, agent_id):
+        return self._duration_estimates.get(agent_id, DEFAULT_DURATION_ESTIMATE)
+
+    def submit_run(self, run_id, agent_data, run_agent, agent_ids=None, seed_outputs=None):
+        """
+        Schedules every agent of a run. `run_agent(agent, upstream_outputs)` produces an output;
+        agents named in `seed_outputs` ({agent_id: output}) are treated as already completed.
+        """
+        dag = build_dag(agent_data, agent_ids)
+        durations = {node: self.estimate_duration(node) for node in dag}
+        ranks = critical_path_ranks(dag, durations)
+        seed_outputs = {node: output for node, output in (seed_outputs or {}).items() if node in dag}
+        run = {
+            'run_id': run_id, 'agent_data': agent_data, 'run_agent': run_agent, 'dag': dag, 'ranks': ranks,
+            'pending_deps': {node: len(info['deps']) for node, info in dag.items()},
+            'outputs': {}, 'timings': {}, 'failed': {}, 'running': set(),
+            'submitted_at': time.time(), 'finished_at': None,
+            'critical_path_estimate': max(ranks.values(), default=0.0),
+            'done': threading.Event(),
+        }
+        with self._condition:
+            self._forget_finished_runs_locked(time.time()) # Only new runs grow the table, so sweep it then
+            self._runs[run_id] = run
+            for node, output in seed_outputs.items():
+                self._complete_locked(run, node, output, push=False)
+            for node, count in run['pending_deps'].items():
+                if count == 0 and node not in run['outputs']:
+                    self._push_locked(run, node)
+            self._check_done_locked(run)
+            self._condition.notify_all()
+        return run_id
+
+    def _forget_finished_runs_locked(self, now):
+        for run_id in [run_id for run_id, run in self._runs.items()
+                       if run['finished_at'] is not None and now - run['finished_at'] > FINISHED_RUN_TTL_SECONDS]:
+            del self._runs[run_id]
+
+    def _push_locked(self, run, node):
+        heapq.heappush(self._ready, (-run['ranks'][node], next(self._sequence), run['run_id'], node))
+
+    def _complete_locked(self, run, node, output, push=True):
+        run['outputs'][node] = output
+        for child in run['dag'][node]['children']:
+            run['pending_deps'][child] -= 1
+            if push and run['pending_deps'][child] == 0 and child not in run['outputs']:
+                self._push_locked(run, child)
+
+    def _fail_locked(self, run, node, error):
+        """
+        Marks a node and, transitively, everything downstream of it as failed.
+        """
+        run['failed'][node] = error
+        for child in run['dag'][node]['children']:
+            if child not in run['failed']:
+                self._fail_locked(run, child, f"Upstream agent {run['agent_data'][node]['name']} failed")
+
+    def _check_done_locked(self, run):
+        if not run['running'] and len(run['outputs']) + len(run['failed']) >= len(run['dag']) and not run['done'].is_set():
+            run['finished_at'] = time.time()
+            run['done'].set()
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._ready and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                _, _, run_id, node = heapq.heappop(self._ready)
+                run = self._runs[run_id]
+                run['running'].add(node)
+                agent_data = run['agent_data']
+                upstream = {agent_data[dep]['name']: run['outputs'][dep] for dep in run['dag'][node]['deps']}
+
+            started = time.time()
+            try:
+                output, error = run['run_agent'](agent_data[node], upstream), None
+            except Exception as e:
+                logger.exception("Agent %s failed in run %s", agent_data[node]['name'], run_id)
+                output, error = None, str(e)
+            finished = time.time()
+
+            with self._condition:
+                run['running'].discard(node)
+                run['timings'][node] = {'start': started - run['submitted_at'], 'end': finished - run['submitted_at']}
+                previous = self._duration_estimates.get(node)
+                elapsed = finished - started
+                self._duration_estimates[node] = elapsed if previous is None else \
+                    (1 - DURATION_SMOOTHING) * previous + DURATION_SMOOTHING * elapsed
+                if error is None:
+                    self._complete_locked(run, node, output)
+                else:
+                    self._fail_locked(run, node, error)
+                self._check_done_locked(run)
+                self._condition.notify_all()
+
+    def wait(self, run_id, timeout=None):
+        """
+        Waits for a run to finish; a run that has already been forgotten counts as finished.
+        """
+        with self._condition:
+            run = self._runs.get(run_id)
+        return True if run is None else run['done'].wait(timeout)
+
+    def status(self, run_id):
+        """
+        Snapshot of a run: outputs by agent name, progress, per-agent timings and makespan.
+        None for an unknown or forgotten run.
+        """
+        with self._condition:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            agent_data = run['agent_data']
+            finished_at = run['finished_at']
+            return {
+                'outputs': {agent_data[node]['name']: output for node, output in run['outputs'].items()},
+                'running': sorted(agent_data[node]['name'] for node in run['running']),
+                'failed': {agent_data[node]['name']: error for node, error in run['failed'].items()},
+                'total': len(run['dag']),
+                'done': run['done'].is_set(),
+                'timings': {agent_data[node]['name']: timing for node, timing in run['timings'].items()},
+                'critical_path_estimate': round(run['critical_path_estimate'], 2),
+                'makespan': round(finished_at - run['submitted_at'], 2) if finished_at else None,
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
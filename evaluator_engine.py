@@ -0,0 +1,224 @@
+import ast
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from context_budget import count_tokens
+from structured_outputs import extract_code_blocks, structured_output # Outputs parsed once into their feature's schema
+
+# --- Scoring Configuration ---
+# Deterministic checks produce 0-10 sub-scores which are combined with these weights.
+CHECK_WEIGHTS = {'length': 0.25, 'structure': 0.35, 'content': 0.4}
+
+# Expected token range per llm_feature; outputs outside the range lose length points.
+EXPECTED_TOKEN_RANGE = {
+    'trd_generation': (40, 1500),
+    'sprint_summary': (20, 600),
+    'arch_pattern_suggestion': (20, 800),
+    'code_generation': (10, 2000),
+    'test_case_generation': (30, 1200),
+    'deployment_suggestion': (20, 600),
+    'rca_assistant': (30, 900),
+    'eval_rationale': (20, 600),
+    'simulated_retrieval': (10, 800),
+    'finops_rationale': (20, 600),
+}
+DEFAULT_TOKEN_RANGE = (10, 1500)
+
+# Markers each feature's output is expected to contain (labelled lines, numbered items, fences);
+# only used for outputs without a parsed form, which is scored by its filled schema fields instead
+EXPECTED_MARKERS = {
+    'trd_generation': [r"Requirement", r"Process Flow|Flow"],
+    'sprint_summary': [r"Sprint Goal", r"Deliverables|Tasks"],
+    'arch_pattern_suggestion': [r"Pattern", r"Pros", r"Cons"],
+    'code_generation': [r"```"],
+    'test_case_generation': [r"^\s*\d+\.", r"Test Case"],
+    'deployment_suggestion': [r"Strategy", r"Pros", r"Cons"],
+    'rca_assistant': [r"Root Cause", r"Diagnostic"],
+    'eval_rationale': [r"Rationale", r"Score|score"],
+    'finops_rationale': [r"Rationale", r"cost|Cost"],
+}
+
+# Outputs scoring inside this band get an LLM rationale; clear passes/fails do not.
+BORDERLINE_RANGE = (5.0, 7.5)
+PASS_THRESHOLD = 6.0
+
+# Below this many items the process-pool start-up cost outweighs running checks inline
+PARALLEL_THRESHOLD = 16
+
+MAX_LINE_LENGTH = 79 # Enterprise Python standard served by the Memory Agent
+
+_FAILURE_MARKERS = ("Error calling LLM", "LLM Response to:", "Agent ran but no specific output was generated.")
+
+# --- Deterministic Checks ---
+def lint_python(code):
+    """
+    Parses `code` and applies a few cheap lint rules.
+    Returns (parses, list_of_issues).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return False, [f"Syntax error on line {e.lineno}: {e.msg}"]
+
+    issues = []
+    for lineno, line in enumerate(code.splitlines(), start=1):
+        if len(line) > MAX_LINE_LENGTH:
+            issues.append(f"Line {lineno} exceeds {MAX_LINE_LENGTH} characters")
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and ast.get_docstring(node) is None:
+            issues.append(f"'{node.name}' has no docstring")
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            issues.append(f"Bare 'except:' on line {node.lineno}")
+    return True, issues
+
+def _length_score(tokens, feature):
+    low, high = EXPECTED_TOKEN_RANGE.get(feature, DEFAULT_TOKEN_RANGE)
+    if tokens == 0:
+        return 0.0
+    if tokens < low:
+        return 10.0 * tokens / low
+    if tokens > high:
+        return max(0.0, 10.0 - 10.0 * (tokens - high) / high)
+    return 10.0
+
+def _structure_score(text, feature, structured=None):
+    if structured is not None:
+        return 10.0 * structured['filled'] / structured['required'] if structured['required'] else 10.0
+    markers = EXPECTED_MARKERS.get(feature)
+    if not markers:
+        lines = [line for line in text.splitlines() if line.strip()]
+        return 10.0 if len(lines) > 1 else 6.0
+    found = sum(1 for marker in markers if re.search(marker, text, re.MULTILINE))
+    return 10.0 * found / len(markers)
+
+def run_checks(item):
+    """
+    Runs every deterministic check for one output.
+    `item` is a (phase_id, agent_name, llm_feature, text, structured, sandbox) tuple so it can be shipped
+    to a worker process; `structured` is the output's parsed form (or None), so workers never re-parse it,
+    and `sandbox` is the `summarize_results` of the output's last sandbox run (or None).
+    """
+    phase_id, agent_name, feature, text, structured, sandbox = item
+    text = str(text or "")
+    notes = []
+    tokens = count_tokens(text)
+
+    content_score = 10.0
+    if not text.strip() or any(marker in text for marker in _FAILURE_MARKERS):
+        content_score = 0.0
+        notes.append("Output is empty, an error or a placeholder echo")
+
+    if feature == 'code_generation':
+        code_blocks = structured['fields']['code_blocks'] if structured else extract_code_blocks(text)
+        blocks = [code for lang, code in code_blocks if lang in ('python', 'py')]
+        if not blocks:
+            content_score = min(content_score, 3.0)
+            notes.append("No Python code block found")
+        for code in blocks:
+            parses, issues = lint_python(code)
+            if not parses:
+                content_score = 0.0
+            else:
+                content_score = max(0.0, content_score - 0.5 * len(issues))
+            notes.extend(issues)
+
+    if sandbox and sandbox['tests']:
+        content_score = min(content_score, 10.0 * sandbox['tests_passed'] / sandbox['tests'])
+        if sandbox['tests_passed'] < sandbox['tests']:
+            notes.append(f"Sandbox: {sandbox['tests_passed']}/{sandbox['tests']} tests passed "
+                         f"({sandbox['units_passed']}/{sandbox['units']} units)")
+
+    checks = {
+        'length': _length_score(tokens, feature),
+        'structure': _structure_score(text, feature, structured),
+        'content': content_score,
+    }
+    score = sum(CHECK_WEIGHTS[name] * value for name, value in checks.items())
+    return {
+        'phase_id': phase_id,
+        'agent': agent_name,
+        'llm_feature': feature,
+        'tokens': tokens,
+        'checks': checks,
+        'score': round(score, 2),
+        'notes': notes,
+    }
+
+# --- Batch Engine ---
+_process_pool = None
+
+def _get_process_pool():
+    """
+    Lazily creates the shared process pool used for large batches.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _process_pool
+
+def build_evaluation_items(completed_phases_outputs, agent_data, workflow_data, sandbox_summaries=None):
+    """
+    Maps every completed phase output to the (phase_id, agent_name, llm_feature, text, structured, sandbox)
+    tuple scored by `run_checks`, in workflow order. Parsed forms come from the structured output cache;
+    `sandbox_summaries` maps agent IDs to the summary of their last sandbox run.
+    """
+    items = []
+    for phase in workflow_data:
+        if phase['phase_id'] in completed_phases_outputs:
+            agent = agent_data[phase['primary_agent_id']]
+            text = completed_phases_outputs[phase['phase_id']]
+            items.append((phase['phase_id'], agent['name'], agent['llm_feature'], text,
+                          structured_output(agent['llm_feature'], str(text or "")),
+                          (sandbox_summaries or {}).get(agent['id'])))
+    return items
+
+def _rationale_prompt(result, text):
+    return (f"Provide a concise rationale for the confidence score of {result['score']}/10 given to the "
+            f"{result['agent']} output below. Deterministic check notes: {'; '.join(result['notes']) or 'none'}.\n\n{text}")
+
+def evaluate_batch(items, rationale_fn=None, borderline_range=BORDERLINE_RANGE, pass_threshold=PASS_THRESHOLD):
+    """
+    Scores all `items` in one pass. Deterministic checks run inline for small batches and
+    in a process pool for large ones; `rationale_fn(prompt)` (the LLM) is only called for
+    borderline scores. Returns a dict with per-item results and a batch summary.
+    """
+    if len(items) >= PARALLEL_THRESHOLD:
+        results = list(_get_process_pool().map(run_checks, items, chunksize=max(1, len(items) // 8)))
+    else:
+        results = [run_checks(item) for item in items]
+
+    llm_calls = 0
+    low, high = borderline_range
+    for result, item in zip(results, items):
+        result['passed'] = result['score'] >= pass_threshold
+        result['borderline'] = low <= result['score'] < high
+        if result['borderline'] and rationale_fn is not None:
+            result['rationale'] = rationale_fn(_rationale_prompt(result, item[3]))
+            llm_calls += 1
+        else:
+            verdict = "passes" if result['passed'] else "fails"
+            detail = "; ".join(result['notes']) if result['notes'] else "all deterministic checks satisfied"
+            result['rationale'] = f"Score {result['score']}/10 {verdict} the quality gate: {detail}."
+
+    scores = [result['score'] for result in results]
+    summary = {
+        'evaluated': len(results),
+        'passed': sum(1 for result in results if result['passed']),
+        'borderline': sum(1 for result in results if result['borderline']),
+        'llm_calls': llm_calls,
+        'mean_score': round(sum(scores) / len(scores), 2) if scores else None,
+    }
+    return {'results': results, 'summary': summary}
+
+def format_evaluation_report(evaluation):
+    """
+    Renders a batch evaluation as the Evaluator Agent's structured feedback text.
+    """
+    summary = evaluation['summary']
+    lines = [f"Batch Evaluation: {summary['passed']}/{summary['evaluated']} outputs passed "
+             f"(mean score {summary['mean_score']}/10, {summary['llm_calls']} LLM rationale calls)."]
+    for result in evaluation['results']:
+        status = "PASS" if result['passed'] else "FAIL"
+        lines.append(f"- {result['agent']}: {result['score']}/10 [{status}] {result['rationale']}")
+    return "\n".join(lines)
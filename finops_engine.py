@@ -0,0 +1,216 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# --- Billing Export Schema ---
+# Canonical column -> accepted source column names (generic exports, AWS CUR, Azure, GCP).
+COLUMN_ALIASES = {
+    'resource_id': ['resource_id', 'lineItem/ResourceId', 'line_item_resource_id', 'ResourceId', 'resource.name'],
+    'service': ['service', 'product/ProductName', 'product_product_name', 'ServiceName', 'service.description'],
+    'instance_type': ['instance_type', 'product/instanceType', 'product_instance_type', 'MeterName', 'sku.description'],
+    'pricing_model': ['pricing_model', 'pricing/term', 'pricing_term', 'PricingModel'],
+    'usage_hours': ['usage_hours', 'lineItem/UsageAmount', 'line_item_usage_amount', 'UsageQuantity', 'usage.amount'],
+    'cost': ['cost', 'lineItem/UnblendedCost', 'line_item_unblended_cost', 'CostInBillingCurrency', 'Cost'],
+    'cpu_utilization': ['cpu_utilization', 'avg_cpu_utilization', 'CPUUtilization'],
+    'usage_date': ['usage_date', 'lineItem/UsageStartDate', 'line_item_usage_start_date', 'Date', 'usage_start_time'],
+}
+REQUIRED_COLUMNS = ['resource_id', 'cost']
+
+CSV_CHUNK_ROWS = 500_000 # Rows per CSV chunk; keeps memory flat for multi-million-row exports
+BILLING_EXPORT_DIR = os.environ.get('SDLC_BILLING_DIR', '') # Only exports under this directory can be analyzed server-side; unset means upload only
+
+# --- Recommendation Thresholds ---
+IDLE_CPU_PERCENT = 2.0
+RIGHTSIZE_CPU_PERCENT = 20.0
+RIGHTSIZE_SAVINGS_SHARE = 0.5 # Dropping one instance size roughly halves the cost
+RESERVED_MIN_ON_DEMAND_SHARE = 0.7 # Share of the billing period a resource ran on demand
+RESERVED_DISCOUNT = 0.35 # Typical 1-year no-upfront discount over on-demand
+MIN_MONTHLY_COST = 10.0 # Ignore resources too cheap to be worth a recommendation
+DEFAULT_TOP_N = 10
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'finops')
+
+# --- Loading ---
+def _resolve_columns(available):
+    """
+    Maps canonical column names to the names used by this export.
+    """
+    resolved = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in available:
+                resolved[canonical] = alias
+                break
+    missing = [column for column in REQUIRED_COLUMNS if column not in resolved]
+    if missing:
+        raise ValueError(f"Billing export is missing required column(s): {', '.join(missing)}")
+    return resolved
+
+def _iter_chunks(path):
+    """
+    Yields DataFrames with canonical column names, reading only the columns needed.
+    CSV is read in row chunks; Parquet is read column-pruned, one row group at a time.
+    """
+    if path.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq # Optional dependency, only needed for Parquet exports
+        parquet_file = pq.ParquetFile(path)
+        resolved = _resolve_columns(set(parquet_file.schema_arrow.names))
+        rename = {source: canonical for canonical, source in resolved.items()}
+        for batch in parquet_file.iter_batches(columns=list(resolved.values())):
+            yield batch.to_pandas().rename(columns=rename)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        resolved = _resolve_columns(set(header))
+        rename = {source: canonical for canonical, source in resolved.items()}
+        for chunk in pd.read_csv(path, usecols=list(resolved.values()), chunksize=CSV_CHUNK_ROWS, low_memory=False):
+            yield chunk.rename(columns=rename)
+
+def _aggregate_chunk(chunk):
+    """
+    Reduces one chunk to per-resource partial sums that can be merged across chunks.
+    """
+    frame = pd.DataFrame({'resource_id': chunk['resource_id'].astype(str)})
+    frame['cost'] = pd.to_numeric(chunk['cost'], errors='coerce').fillna(0.0)
+    hours = pd.to_numeric(chunk['usage_hours'], errors='coerce').fillna(0.0) if 'usage_hours' in chunk else pd.Series(0.0, index=chunk.index)
+    frame['usage_hours'] = hours
+    if 'cpu_utilization' in chunk:
+        cpu = pd.to_numeric(chunk['cpu_utilization'], errors='coerce')
+        frame['cpu_hours'] = (cpu * hours).fillna(0.0) # Hour-weighted so it can be re-averaged after merging
+        frame['cpu_weight'] = hours.where(cpu.notna(), 0.0)
+    else:
+        frame['cpu_hours'] = 0.0
+        frame['cpu_weight'] = 0.0
+    if 'pricing_model' in chunk:
+        on_demand = chunk['pricing_model'].astype(str).str.lower().str.replace('-', '').str.contains('ondemand')
+    else:
+        on_demand = pd.Series(True, index=chunk.index)
+    frame['on_demand_hours'] = hours.where(on_demand, 0.0)
+    frame['on_demand_cost'] = frame['cost'].where(on_demand, 0.0)
+    if 'usage_date' in chunk:
+        dates = pd.to_datetime(chunk['usage_date'], errors='coerce', utc=True)
+        frame['first_seen'] = dates
+        frame['last_seen'] = dates
+    for column in ('service', 'instance_type'):
+        frame[column] = chunk[column].astype(str) if column in chunk else ''
+
+    sums = ['cost', 'usage_hours', 'cpu_hours', 'cpu_weight', 'on_demand_hours', 'on_demand_cost']
+    aggregations = {column: 'sum' for column in sums}
+    aggregations.update({'service': 'first', 'instance_type': 'first'})
+    if 'first_seen' in frame:
+        aggregations.update({'first_seen': 'min', 'last_seen': 'max'})
+    return frame.groupby('resource_id', sort=False).agg(aggregations)
+
+def _merge_partials(partials):
+    combined = pd.concat(partials)
+    aggregations = {column: 'sum' for column in ['cost', 'usage_hours', 'cpu_hours', 'cpu_weight', 'on_demand_hours', 'on_demand_cost']}
+    aggregations.update({'service': 'first', 'instance_type': 'first'})
+    if 'first_seen' in combined:
+        aggregations.update({'first_seen': 'min', 'last_seen': 'max'})
+    return combined.groupby(level=0, sort=False).agg(aggregations)
+
+def export_fingerprint(path):
+    """
+    Cheap content fingerprint of a billing export: size, mtime and hashes of the first and
+    last megabyte. Avoids hashing multi-GB files while still detecting replaced exports.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(1 << 20))
+        if stat.st_size > (2 << 20):
+            f.seek(-(1 << 20), os.SEEK_END)
+            digest.update(f.read(1 << 20))
+    return digest.hexdigest()
+
+def load_resource_aggregates(path, use_cache=True):
+    """
+    Returns per-resource cost and usage aggregates for a billing export, reading it in
+    chunks and caching the (small) aggregate table on disk by export fingerprint.
+    """
+    cache_path = os.path.join(CACHE_DIR, f"{export_fingerprint(path)}.pkl")
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+
+    partials = [_aggregate_chunk(chunk) for chunk in _iter_chunks(path)]
+    if not partials:
+        raise ValueError("Billing export contains no rows")
+    aggregates = _merge_partials(partials) if len(partials) > 1 else partials[0]
+
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return aggregates
+
+# --- Recommendations ---
+def compute_recommendations(aggregates):
+    """
+    Computes idle-resource, right-sizing and reserved-instance recommendations over the
+    aggregate table with column arithmetic. Returns a DataFrame sorted by estimated savings.
+    """
+    frame = aggregates[aggregates['cost'] >= MIN_MONTHLY_COST]
+    cpu_weight = frame['cpu_weight'].to_numpy()
+    has_cpu = cpu_weight > 0
+    avg_cpu = np.divide(frame['cpu_hours'].to_numpy(), cpu_weight, out=np.full(len(frame), np.nan), where=has_cpu)
+    cost = frame['cost'].to_numpy()
+
+    if 'first_seen' in frame:
+        period_hours = ((frame['last_seen'] - frame['first_seen']).dt.total_seconds().to_numpy() / 3600.0) + 24.0
+        period_hours = np.nan_to_num(period_hours, nan=float(frame['usage_hours'].max() or 1.0))
+    else:
+        period_hours = np.full(len(frame), float(frame['usage_hours'].max() or 1.0))
+    on_demand_share = frame['on_demand_hours'].to_numpy() / np.maximum(period_hours, 1.0)
+
+    idle = has_cpu & (avg_cpu < IDLE_CPU_PERCENT)
+    rightsize = has_cpu & ~idle & (avg_cpu < RIGHTSIZE_CPU_PERCENT)
+    reserved = ~idle & ~rightsize & (on_demand_share >= RESERVED_MIN_ON_DEMAND_SHARE)
+
+    recommendation = np.select([idle, rightsize, reserved], ['Idle Resource Cleanup', 'Right-sizing Instances', 'Reserved Instances'], default='')
+    savings = np.select([idle, rightsize, reserved],
+                        [cost, cost * RIGHTSIZE_SAVINGS_SHARE, frame['on_demand_cost'].to_numpy() * RESERVED_DISCOUNT], default=0.0)
+
+    findings = pd.DataFrame({
+        'resource_id': frame.index,
+        'service': frame['service'].to_numpy(),
+        'instance_type': frame['instance_type'].to_numpy(),
+        'recommendation': recommendation,
+        'avg_cpu_percent': np.round(avg_cpu, 1),
+        'cost': np.round(cost, 2),
+        'estimated_savings': np.round(savings, 2),
+    })
+    findings = findings[findings['recommendation'] != '']
+    return findings.sort_values('estimated_savings', ascending=False, ignore_index=True)
+
+def analyze_billing_export(path, top_n=DEFAULT_TOP_N):
+    """
+    Full pipeline: cached aggregates -> recommendations -> compact result for the UI and LLM.
+    """
+    aggregates = load_resource_aggregates(path)
+    findings = compute_recommendations(aggregates)
+    return {
+        'resources': int(len(aggregates)),
+        'total_cost': round(float(aggregates['cost'].sum()), 2),
+        'total_savings': round(float(findings['estimated_savings'].sum()), 2),
+        'savings_by_type': findings.groupby('recommendation')['estimated_savings'].sum().round(2).to_dict(),
+        'top_findings': findings.head(top_n).to_dict('records'),
+    }
+
+def format_findings_prompt(analysis, request_text=""):
+    """
+    Builds the finops_rationale prompt from only the top-N findings of an analysis.
+    """
+    lines = [f"Provide a detailed explanation and rationale for the following cloud cost optimization recommendation(s), "
+             f"derived from a billing export of {analysis['resources']} resources costing ${analysis['total_cost']:,.2f}:"]
+    for i, finding in enumerate(analysis['top_findings'], start=1):
+        cpu = f", avg CPU {finding['avg_cpu_percent']}%" if not pd.isna(finding['avg_cpu_percent']) else ""
+        lines.append(f"{i}. {finding['recommendation']}: {finding['resource_id']} ({finding['service']} {finding['instance_type']}{cpu}), "
+                     f"cost ${finding['cost']:,.2f}, estimated savings ${finding['estimated_savings']:,.2f}")
+    if request_text:
+        lines.append(f"Additional context: {request_text}")
+    return "\n".join(lines)
@@ -0,0 +1,205 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+# --- Cassette Settings ---
+LATENCY_MODES = ('original', 'distribution', 'none')
+DEFAULT_FAULTS = {
+    'timeout': 0.0, # Share of calls that hang for `timeout_seconds`, then raise LLMTimeoutError
+    'rate_limit': 0.0, # Share of calls rejected at once with RateLimitError (HTTP 429)
+    'slow_tail': 0.0, # Share of calls whose latency is multiplied by `slow_tail_factor`
+    'timeout_seconds': 30.0,
+    'slow_tail_factor': 10.0,
+}
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when a (possibly injected) LLM call exceeds its deadline."""
+
+class RateLimitError(Exception):
+    """Raised for an HTTP 429 from the LLM provider (or an injected one)."""
+    status_code = 429
+
+class CassetteMissError(KeyError):
+    """Raised in strict replay when a request was never recorded."""
+
+def interaction_key(prompt, model):
+    return hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+
+def prompt_key(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def load_cassette(path):
+    """
+    Reads a gzip-compressed JSON-lines cassette. Returns a list of
+    {'key', 'model', 'prompt', 'response', 'latency_s', 'recorded_at'} interactions.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_cassette(path, interactions):
+    """
+    Writes interactions to `path` atomically, so a crash never leaves a truncated cassette.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for interaction in interactions:
+            f.write(json.dumps(interaction) + "\n")
+    os.replace(tmp_path, path)
+
+def parse_faults(spec):
+    """
+    Parses 'timeout=0.02,rate_limit=0.05,slow_tail=0.1' into a fault dict over DEFAULT_FAULTS.
+    """
+    faults = dict(DEFAULT_FAULTS)
+    for part in filter(None, (piece.strip() for piece in (spec or "").split(','))):
+        name, _, value = part.partition('=')
+        if name not in DEFAULT_FAULTS:
+            raise ValueError(f"Unknown LLM fault '{name}'; expected one of {', '.join(DEFAULT_FAULTS)}")
+        faults[name] = float(value)
+    return faults
+
+# --- Transports ---
+class FaultInjector:
+    """
+    Decides per call whether to inject a timeout, a 429 or a slow tail. Seeded, so a benchmark
+    sees the same faults on the same call sequence every time.
+    """
+
+    def __init__(self, faults=None, seed=0):
+        self.faults = dict(DEFAULT_FAULTS, **(faults or {}))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {'timeout': 0, 'rate_limit': 0, 'slow_tail': 0}
+
+    def apply(self, latency_s):
+        """
+        Returns the latency to use for this call, or raises the injected failure.
+        """
+        with self._lock:
+            roll = self._random.random()
+            fault = None
+            threshold = 0.0
+            for name in ('timeout', 'rate_limit', 'slow_tail'):
+                threshold += self.faults[name]
+                if roll < threshold:
+                    fault = name
+                    break
+            if fault:
+                self.counts[fault] += 1
+        if fault == 'timeout':
+            time.sleep(self.faults['timeout_seconds'])
+            raise LLMTimeoutError(f"LLM call timed out after {self.faults['timeout_seconds']}s (injected)")
+        if fault == 'rate_limit':
+            raise RateLimitError("429 Too Many Requests (injected)")
+        if fault == 'slow_tail':
+            return latency_s * self.faults['slow_tail_factor']
+        return latency_s
+
+class RecordingTransport:
+    """
+    Wraps a live `backend(prompt, model)` and records every request/response pair with its
+    wall-clock latency. The cassette is written on `save()` and when the process exits.
+    """
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions = load_cassette(path) if os.path.exists(path) else []
+        atexit.register(self.save)
+
+    def __call__(self, prompt, model):
+        started = time.perf_counter()
+        response = self.backend(prompt, model)
+        with self._lock:
+            self._interactions.append({'key': interaction_key(prompt, model), 'model': model, 'prompt': prompt,
+                                       'response': response, 'latency_s': round(time.perf_counter() - started, 4),
+                                       'recorded_at': time.time()})
+        return response
+
+    def save(self):
+        with self._lock:
+            interactions = list(self._interactions)
+        save_cassette(self.path, interactions)
+
+class ReplayTransport:
+    """
+    Answers requests from a cassette instead of the network. Latency is the recorded one
+    ('original'), a draw from all latencies recorded for the model ('distribution') or none,
+    multiplied by `latency_scale`, with faults injected on top. Repeated recordings of one
+    request are replayed in turn. A prompt recorded only for another model (the router may pick
+    differently than when recording) is answered with that recording. Unrecorded prompts go to
+    `fallback(prompt, model)`, or raise CassetteMissError when there is none.
+    """
+
+    def __init__(self, path, latency='original', latency_scale=1.0, faults=None, seed=0, fallback=None):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown replay latency mode '{latency}'; expected one of {LATENCY_MODES}")
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.fallback = fallback
+        self.injector = FaultInjector(faults, seed)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(list)
+        self._by_prompt = defaultdict(list)
+        self._latencies_by_model = defaultdict(list)
+        for interaction in load_cassette(path):
+            self._by_key[interaction['key']].append(interaction)
+            self._by_prompt[prompt_key(interaction['prompt'])].append(interaction)
+            self._latencies_by_model[interaction['model']].append(interaction['latency_s'])
+        self._next_index = defaultdict(int)
+        self.stats = {'hits': 0, 'model_substitutions': 0, 'misses': 0}
+
+    def _latency_for(self, interaction, model):
+        if self.latency == 'none':
+            return 0.0
+        if self.latency == 'distribution' and self._latencies_by_model.get(model):
+            with self._lock:
+                return self._random.choice(self._latencies_by_model[model]) * self.latency_scale
+        return interaction['latency_s'] * self.latency_scale
+
+    def __call__(self, prompt, model):
+        key = interaction_key(prompt, model)
+        with self._lock:
+            recorded = self._by_key.get(key)
+            if recorded:
+                self.stats['hits'] += 1
+            else:
+                key = prompt_key(prompt)
+                recorded = self._by_prompt.get(key)
+                self.stats['model_substitutions' if recorded else 'misses'] += 1
+            interaction = None
+            if recorded:
+                interaction = recorded[self._next_index[key] % len(recorded)]
+                self._next_index[key] += 1
+        if interaction is None:
+            if self.fallback is None:
+                raise CassetteMissError(f"No recorded response for prompt {key[:12]}")
+            return self.fallback(prompt, model)
+        time.sleep(self.injector.apply(self._latency_for(interaction, model)))
+        return interaction['response']
+
+def transport_from_env(backend):
+    """
+    Builds the transport selected by SDLC_LLM_RECORD=<cassette> or SDLC_LLM_REPLAY=<cassette>
+    (with SDLC_LLM_REPLAY_LATENCY, SDLC_LLM_LATENCY_SCALE, SDLC_LLM_FAULTS, SDLC_LLM_FAULT_SEED
+    and SDLC_LLM_REPLAY_STRICT), or returns None to call `backend` directly.
+    """
+    if os.environ.get('SDLC_LLM_REPLAY'):
+        return ReplayTransport(os.environ['SDLC_LLM_REPLAY'],
+                               latency=os.environ.get('SDLC_LLM_REPLAY_LATENCY', 'original'),
+                               latency_scale=float(os.environ.get('SDLC_LLM_LATENCY_SCALE', '1.0')),
+                               faults=parse_faults(os.environ.get('SDLC_LLM_FAULTS')),
+                               seed=int(os.environ.get('SDLC_LLM_FAULT_SEED', '0')),
+                               fallback=None if os.environ.get('SDLC_LLM_REPLAY_STRICT') else backend)
+    if os.environ.get('SDLC_LLM_RECORD'):
+        return RecordingTransport(backend, os.environ['SDLC_LLM_RECORD'])
+    return None
@@ -0,0 +1,205 @@
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# --- Job Settings ---
+JOB_STATES = ('queued', 'running', 'streaming', 'done', 'failed', 'cancelled')
+FINAL_JOB_STATES = ('done', 'failed', 'cancelled')
+DEFAULT_JOB_WORKERS = 4 # Interactive LLM calls in flight per server process
+JOB_POLL_INTERVAL = "1s" # UI refresh rate while a job is active
+ABANDON_AFTER_SECONDS = 30 # Jobs nobody has polled for this long are cancelled
+FINISHED_JOB_TTL_SECONDS = 600 # Finished jobs are forgotten after this long
+MAX_JOB_EVENTS = 50
+
+class JobCancelledError(Exception):
+    """Raised inside a job's worker once the job has been cancelled."""
+
+class LLMJob:
+    """
+    Handle for one background LLM call: its state, progress events, partial (streamed) text,
+    result or error. Fields are updated by the worker and read by pollers under the job's lock.
+    """
+
+    def __init__(self, label):
+        self.job_id = uuid.uuid4().hex
+        self.label = label
+        self.state = 'queued'
+        self.events = deque(maxlen=MAX_JOB_EVENTS) # (seconds since submit, message)
+        self.partial = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.finished_at = None
+        self.last_polled = self.submitted_at
+        self.cancel_requested = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+        self.add_event("Queued")
+
+    def add_event(self, message):
+        with self._lock:
+            self.events.append((round(time.monotonic() - self.submitted_at, 2), message))
+
+    def _set_state(self, state, result=None, error=None):
+        with self._lock:
+            if self.state in FINAL_JOB_STATES:
+                return False
+            self.state, self.result, self.error = state, result, error
+            if state in FINAL_JOB_STATES:
+                self.finished_at = time.monotonic()
+        self.add_event(error if state == 'failed' and error else state.title())
+        return True
+
+    def snapshot(self):
+        """
+        A consistent copy of the job for rendering: {'job_id', 'label', 'state', 'events', 'partial', 'result', 'error', 'elapsed'}.
+        """
+        with self._lock:
+            return {'job_id': self.job_id, 'label': self.label, 'state': self.state, 'events': list(self.events),
+                    'partial': self.partial, 'result': self.result, 'error': self.error,
+                    'elapsed': round((self.finished_at or time.monotonic()) - self.submitted_at, 1)}
+
+# --- Worker Context ---
+# The job a worker thread is running, so code deep in the LLM call can report progress and stop early
+_context = threading.local()
+
+def current_job():
+    return getattr(_context, 'job', None)
+
+def check_cancelled():
+    """
+    Raises JobCancelledError if the calling worker's job was cancelled; a no-op outside jobs.
+    """
+    job = current_job()
+    if job is not None and job.cancel_requested.is_set():
+        raise JobCancelledError(f"Job {job.job_id[:8]} was cancelled")
+
+def cancellable_sleep(seconds):
+    """
+    time.sleep() that returns early with JobCancelledError when the calling job is cancelled.
+    """
+    job = current_job()
+    if job is None:
+        time.sleep(seconds)
+    elif job.cancel_requested.wait(seconds):
+        check_cancelled()
+
+def report_progress(message):
+    job = current_job()
+    if job is not None:
+        job.add_event(message)
+
+def report_partial(text):
+    """
+    Publishes the text streamed so far; the first call moves the job to 'streaming'.
+    """
+    job = current_job()
+    if job is None:
+        return
+    with job._lock:
+        job.partial = text
+        first_chunk = job.state == 'running'
+        if first_chunk:
+            job.state = 'streaming'
+    if first_chunk:
+        job.add_event("Streaming")
+
+# --- Job Runner ---
+class LLMJobRunner:
+    """
+    Runs LLM calls on a bounded worker pool and hands out job handles to poll. Cancelling a queued
+    job drops it before it starts; cancelling a running one makes its next cancellation check raise,
+    so the backend call stops instead of finishing for nobody. Jobs not polled for ABANDON_AFTER_SECONDS
+    (a closed tab, a navigated-away session) are cancelled the same way.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, abandon_after=ABANDON_AFTER_SECONDS):
+        self.abandon_after = abandon_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._reaper = threading.Thread(target=self._reap_loop, name="llm-job-reaper", daemon=True)
+        self._reaper.start()
+
+    def submit(self, label, fn, *args, **kwargs):
+        """
+        Queues `fn(*args, **kwargs)` and returns the job id.
+        """
+        job = LLMJob(label)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.job_id
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_requested.is_set():
+            job._set_state('cancelled') # Cancelled after a worker picked it up but before it started
+            return
+        if not job._set_state('running'):
+            return
+        _context.job = job
+        try:
+            result = fn(*args, **kwargs)
+        except JobCancelledError:
+            job._set_state('cancelled')
+        except Exception as e:
+            logger.info("LLM job %s (%s) failed: %s", job.job_id, job.label, e)
+            job._set_state('failed', error=str(e))
+        else:
+            if job.cancel_requested.is_set():
+                job._set_state('cancelled') # Finished after all; the caller no longer wants the result
+            else:
+                job._set_state('done', result=result)
+        finally:
+            _context.job = None
+
+    def poll(self, job_id):
+        """
+        Snapshot of a job, or None if unknown; polling also keeps the job from being treated as abandoned.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.last_polled = time.monotonic()
+        return job.snapshot()
+
+    def cancel(self, job_id, reason="Cancel requested"):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.state in FINAL_JOB_STATES:
+            return False
+        job.add_event(reason)
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel(): # Never started; no worker will mark it
+            job._set_state('cancelled')
+        return True
+
+    def active_jobs(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values() if job.state not in FINAL_JOB_STATES]
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(1.0)
+            self.reap()
+
+    def reap(self):
+        """
+        Cancels abandoned jobs and forgets finished ones past FINISHED_JOB_TTL_SECONDS.
+        """
+        now = time.monotonic()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.state not in FINAL_JOB_STATES and now - job.last_polled > self.abandon_after:
+                self.cancel(job.job_id, reason=f"Abandoned (not polled for {self.abandon_after}s)")
+        with self._lock:
+            for job in jobs:
+                if job.finished_at is not None and now - job.finished_at > FINISHED_JOB_TTL_SECONDS:
+                    self._jobs.pop(job.job_id, None)
@@ -0,0 +1,295 @@
+import mmap
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+# --- Ingestion Settings ---
+CHUNK_BYTES = 16 * 1024 * 1024 # Bytes mapped and parsed per chunk; bounds peak memory for multi-GB logs
+TIMESTAMP_WIDTH = 19 # "YYYY-MM-DD HH:MM:SS" (or with a 'T' separator) at the start of each line
+LOG_DIR = os.environ.get('SDLC_LOG_DIR', '') # Only files under this directory can be analyzed server-side; unset means upload only
+
+_ERROR_PATTERN = re.compile(rb"\b(?:ERROR|FATAL|CRITICAL|Exception)\b")
+_WARN_PATTERN = re.compile(rb"\bWARN(?:ING)?\b")
+# Matched against the lowercased chunk: a case-sensitive scan is several times faster than re.IGNORECASE
+_LATENCY_PATTERN = re.compile(rb"(?:latency|duration|took|elapsed|response_time)[=:\s]+(\d+(?:\.\d+)?)\s*(ms|s)\b")
+
+# --- Detection Settings ---
+WINDOW_SECONDS = 60 # Bucket width for rate and error series
+BASELINE_WINDOWS = 15 # Trailing buckets used as the baseline for each bucket
+SPIKE_Z_SCORE = 3.0
+MIN_SPIKE_LINES = 20
+ERROR_BURST_RATE = 0.05 # Minimum share of error lines in a bucket to call it a burst
+MIN_BURST_ERRORS = 5
+LATENCY_SPIKE_FACTOR = 2.0 # Bucket p95 above this multiple of the overall p95
+MAX_FINDINGS = 5 # Findings per category passed on to the LLM
+
+# Reports keyed by (path, size, mtime) so re-analyzing an unchanged file is free
+_report_cache = {}
+
+# --- Columnar Parsing ---
+def _days_from_civil(year, month, day):
+    """
+    Vectorized days since 1970-01-01 for proleptic Gregorian dates (Howard Hinnant's algorithm).
+    """
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    mp = (month + 9) % 12
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def _parse_timestamps(chunk, line_starts):
+    """
+    Parses the fixed-width timestamp at the start of every line without a Python-level loop.
+    Reads one uint8 byte column at a time, so the working set is a few arrays of one value per line.
+    Returns (epoch_seconds, valid_mask); lines without a timestamp (e.g. stack traces) are invalid.
+    """
+    last = len(chunk) - 1
+    valid = line_starts + (TIMESTAMP_WIDTH - 1) <= last
+
+    def byte_at(column):
+        return chunk[np.minimum(line_starts + column, last)]
+
+    def number(*columns):
+        nonlocal valid
+        value = np.zeros(len(line_starts), dtype=np.int64)
+        for column in columns:
+            digit = byte_at(column) - np.uint8(48) # Non-digits wrap around past 9
+            valid &= digit <= 9
+            value = value * 10 + digit
+        return value
+
+    for column, separator in ((4, '-'), (7, '-'), (13, ':'), (16, ':')):
+        valid &= byte_at(column) == ord(separator)
+    year = number(0, 1, 2, 3)
+    month = number(5, 6)
+    day = number(8, 9)
+    seconds = number(11, 12) * 3600 + number(14, 15) * 60 + number(17, 18)
+    epoch = _days_from_civil(year, month, day) * 86400 + seconds
+    return epoch.astype(np.float64), valid
+
+def _line_index(line_starts, positions):
+    return np.searchsorted(line_starts, positions, side='right') - 1
+
+def _parse_decimals(chunk, starts, ends):
+    """
+    Parses the decimal numbers at chunk[start:end] (digits with an optional fraction) with array
+    arithmetic over a (numbers x width) byte window instead of one float() call per number.
+    """
+    lengths = ends - starts
+    width = np.arange(int(lengths.max()))
+    window = chunk[np.minimum(starts[:, None] + width, len(chunk) - 1)]
+    in_number = width < lengths[:, None]
+    is_dot = in_number & (window == ord('.'))
+    dot = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), lengths)[:, None]
+    exponent = np.where(width < dot, dot - 1 - width, dot - width)
+    digits = np.where(in_number & ~is_dot, window.astype(np.float64) - 48, 0.0)
+    return (digits * np.power(10.0, exponent)).sum(axis=1)
+
+def _parse_chunk(data):
+    """
+    Parses one newline-aligned chunk of log bytes into columnar arrays.
+    Only the regex scans for rare tokens (errors, latencies) run match-by-match, collecting
+    offsets; timestamps and latency values are parsed with array arithmetic over the raw bytes.
+    """
+    chunk = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(chunk == 10)
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(chunk)]
+    if len(line_starts) == 0:
+        return None
+
+    timestamps, valid = _parse_timestamps(chunk, line_starts)
+
+    is_error = np.zeros(len(line_starts), dtype=bool)
+    error_positions = np.fromiter((m.start() for m in _ERROR_PATTERN.finditer(data)), dtype=np.int64)
+    is_error[_line_index(line_starts, error_positions)] = True
+
+    is_warn = np.zeros(len(line_starts), dtype=bool)
+    warn_positions = np.fromiter((m.start() for m in _WARN_PATTERN.finditer(data)), dtype=np.int64)
+    is_warn[_line_index(line_starts, warn_positions)] = True
+
+    latency_ms = np.full(len(line_starts), np.nan, dtype=np.float32)
+    lowered = chunk.copy()
+    lowered[chunk - np.uint8(ord('A')) <= 25] += 32
+    spans = np.fromiter((offset for m in _LATENCY_PATTERN.finditer(lowered.data) for offset in (*m.span(1), m.start(2))),
+                        dtype=np.int64).reshape(-1, 3)
+    del lowered
+    if len(spans):
+        values = _parse_decimals(chunk, spans[:, 0], spans[:, 1])
+        seconds = chunk[spans[:, 2]] | 0x20 != ord('m') # Unit is "ms" or "s"
+        latency_ms[_line_index(line_starts, spans[:, 0])] = np.where(seconds, values * 1000.0, values)
+
+    # Continuation lines (stack traces) carry their error flag over to the entry they belong to
+    entry = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+    has_entry = entry >= 0
+    np.logical_or.at(is_error, entry[has_entry & ~valid], is_error[has_entry & ~valid])
+
+    return {
+        'timestamp': timestamps[valid],
+        'is_error': is_error[valid],
+        'is_warn': is_warn[valid],
+        'latency_ms': latency_ms[valid],
+    }
+
+def read_log_columns(path, start_offset=0, chunk_bytes=CHUNK_BYTES, at_eof=False):
+    """
+    Reads a log file through a read-only memory map, `chunk_bytes` at a time, and returns
+    (columns, end_offset). Pass the returned offset back in to tail a growing file: only
+    complete lines appended since the last call are parsed. Pass at_eof=True for a finished
+    file, so a last line without a trailing newline is parsed too.
+    """
+    parts = []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= start_offset:
+            return _concat_columns(parts), start_offset
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = start_offset
+            while position < size:
+                end = min(position + chunk_bytes, size)
+                if end < size:
+                    newline = mm.rfind(b"\n", position, end)
+                    end = newline + 1 if newline >= position else end
+                else:
+                    newline = mm.rfind(b"\n", position, end)
+                    if newline < position and not at_eof:
+                        break # Trailing partial line; leave it for the next tail
+                    end = end if at_eof else newline + 1
+                parsed = _parse_chunk(mm[position:end])
+                if parsed is not None:
+                    parts.append(parsed)
+                position = end
+    return _concat_columns(parts), position
+
+def _concat_columns(parts):
+    if not parts:
+        return {'timestamp': np.empty(0), 'is_error': np.empty(0, dtype=bool),
+                'is_warn': np.empty(0, dtype=bool), 'latency_ms': np.empty(0, dtype=np.float32)}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+# --- Anomaly Detection ---
+def _trailing_baseline(series, windows):
+    """
+    Mean and standard deviation of the previous `windows` buckets for every bucket,
+    computed with cumulative sums instead of a rolling loop.
+    """
+    csum = np.concatenate(([0.0], np.cumsum(series)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(series * series)))
+    index = np.arange(len(series))
+    start = np.maximum(index - windows, 0)
+    count = index - start
+    safe_count = np.maximum(count, 1)
+    mean = (csum[index] - csum[start]) / safe_count
+    variance = np.maximum((csum_sq[index] - csum_sq[start]) / safe_count - mean * mean, 0.0)
+    return mean, np.sqrt(variance), count
+
+def _bucket_percentile(bins, values, q, n_bins):
+    """
+    Per-bucket percentile of `values` using one lexsort over (bucket, value).
+    """
+    result = np.full(n_bins, np.nan)
+    if len(values) == 0:
+        return result
+    order = np.lexsort((values, bins))
+    sorted_bins, sorted_values = bins[order], values[order]
+    counts = np.bincount(sorted_bins, minlength=n_bins)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    picks = starts[present] + np.floor(q / 100.0 * (counts[present] - 1)).astype(np.int64)
+    result[present] = sorted_values[picks]
+    return result
+
+def detect_anomalies(columns, window_seconds=WINDOW_SECONDS, baseline_windows=BASELINE_WINDOWS):
+    """
+    Runs rate-spike, error-burst and latency detection over sliding windows.
+    Returns a compact report dict; only this report (never the raw log) is sent to the LLM.
+    """
+    timestamps = columns['timestamp']
+    report = {'lines': int(len(timestamps)), 'rate_spikes': [], 'error_bursts': [], 'latency_spikes': []}
+    if len(timestamps) == 0:
+        return report
+
+    t0 = timestamps.min()
+    bins = ((timestamps - t0) // window_seconds).astype(np.int64)
+    n_bins = int(bins.max()) + 1
+    counts = np.bincount(bins, minlength=n_bins).astype(np.float64)
+    errors = np.bincount(bins, weights=columns['is_error'], minlength=n_bins)
+    window_start = t0 + np.arange(n_bins) * window_seconds
+
+    report.update({
+        'start': float(t0),
+        'end': float(timestamps.max()),
+        'window_seconds': window_seconds,
+        'error_lines': int(columns['is_error'].sum()),
+        'warn_lines': int(columns['is_warn'].sum()),
+        'peak_lines_per_window': int(counts.max()),
+    })
+
+    # Rate spikes: bucket volume far above its trailing baseline
+    mean, std, history = _trailing_baseline(counts, baseline_windows)
+    z = (counts - mean) / np.maximum(std, 1.0)
+    spikes = np.flatnonzero((history >= 3) & (z >= SPIKE_Z_SCORE) & (counts >= MIN_SPIKE_LINES))
+    for i in spikes[np.argsort(-z[spikes])][:MAX_FINDINGS]:
+        report['rate_spikes'].append({'window_start': float(window_start[i]), 'lines': int(counts[i]),
+                                      'baseline': round(float(mean[i]), 1), 'z_score': round(float(z[i]), 1)})
+
+    # Error bursts: share of error lines well above both the floor and the trailing error rate
+    error_rate = errors / np.maximum(counts, 1.0)
+    rate_mean, _, _ = _trailing_baseline(error_rate, baseline_windows)
+    bursts = np.flatnonzero((errors >= MIN_BURST_ERRORS) & (error_rate >= np.maximum(ERROR_BURST_RATE, 3 * rate_mean)))
+    for i in bursts[np.argsort(-errors[bursts])][:MAX_FINDINGS]:
+        report['error_bursts'].append({'window_start': float(window_start[i]), 'errors': int(errors[i]),
+                                       'error_rate': round(float(error_rate[i]), 3)})
+
+    # Latency percentiles overall and per bucket
+    latency = columns['latency_ms']
+    has_latency = ~np.isnan(latency)
+    if has_latency.any():
+        values = latency[has_latency].astype(np.float64)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        report['latency_ms'] = {'samples': int(len(values)), 'p50': round(float(p50), 1),
+                                'p95': round(float(p95), 1), 'p99': round(float(p99), 1)}
+        bucket_p95 = _bucket_percentile(bins[has_latency], values, 95, n_bins)
+        slow = np.flatnonzero(bucket_p95 > LATENCY_SPIKE_FACTOR * p95)
+        for i in slow[np.argsort(-bucket_p95[slow])][:MAX_FINDINGS]:
+            report['latency_spikes'].append({'window_start': float(window_start[i]), 'p95_ms': round(float(bucket_p95[i]), 1)})
+    return report
+
+def analyze_log_file(path, window_seconds=WINDOW_SECONDS):
+    """
+    Parses and analyzes a log file, reusing the cached report when the file is unchanged.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, window_seconds)
+    if key not in _report_cache:
+        columns, _ = read_log_columns(path, at_eof=True)
+        _report_cache[key] = detect_anomalies(columns, window_seconds=window_seconds)
+    return _report_cache[key]
+
+def format_anomaly_summary(report):
+    """
+    Condenses an anomaly report into a few lines suitable for the RCA prompt.
+    """
+    def fmt(epoch):
+        return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+    if not report['lines']:
+        return "Log analysis: no timestamped log lines found."
+    lines = [f"Log analysis of {report['lines']} lines from {fmt(report['start'])} to {fmt(report['end'])} UTC "
+             f"({report['error_lines']} errors, {report['warn_lines']} warnings, {report['window_seconds']}s windows)."]
+    if 'latency_ms' in report:
+        latency = report['latency_ms']
+        lines.append(f"Latency: p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms over {latency['samples']} samples.")
+    for spike in report['rate_spikes']:
+        lines.append(f"Rate spike at {fmt(spike['window_start'])}: {spike['lines']} lines vs baseline {spike['baseline']} (z={spike['z_score']}).")
+    for burst in report['error_bursts']:
+        lines.append(f"Error burst at {fmt(burst['window_start'])}: {burst['errors']} errors ({burst['error_rate']:.1%} of lines).")
+    for spike in report['latency_spikes']:
+        lines.append(f"Latency spike at {fmt(spike['window_start'])}: p95 {spike['p95_ms']} ms.")
+    if len(lines) == 1 + ('latency_ms' in report):
+        lines.append("No rate spikes, error bursts or latency anomalies detected.")
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import chain
+
+from agent_bus import STATE_DIR
+from evaluator_engine import PASS_THRESHOLD, run_checks
+from structured_outputs import structured_output # Parsed once here, then read from the cache by every later consumer
+
+# --- Routing Settings ---
+MODEL_TIERS = ['gemini-2.0-flash-lite', 'gemini-2.0-flash', 'gemini-2.5-pro'] # Fastest and cheapest first
+# Features whose outputs need more than the smallest model even when prompts are short
+FEATURE_MIN_TIER = {
+    'code_generation': 1,
+    'arch_pattern_suggestion': 1,
+    'test_case_generation': 1,
+    'rca_assistant': 1,
+}
+LONG_PROMPT_TOKENS = 1500 # Prompts above this start one tier up
+CONFIDENCE_FLOOR = PASS_THRESHOLD # Responses scoring below this are retried one tier up
+MIN_QUALITY_SAMPLES = 3 # Scores needed before a model's history influences routing
+QUALITY_SMOOTHING = 0.3 # Weight of the newest score in the moving quality average
+ROUTING_LOG_PATH = os.path.join(STATE_DIR, 'routing_decisions.jsonl')
+ROUTING_LOG_MAX_BYTES = 8 * 1024 * 1024 # The log is rotated to <path>.1 (replacing the previous one) past this size
+REPLAYED_LOG_LINES = 5000 # Most recent log entries replayed into the quality history on start
+MAX_TRACKED_OUTPUTS = 10000 # (run, agent) outputs whose model is remembered for later Evaluator scores
+
+class ModelRouter:
+    """
+    Picks the cheapest model tier likely to produce a passing answer for a request, based on its
+    llm_feature, prompt length and the Evaluator scores each model has earned for that feature.
+    Responses are scored with the Evaluator's deterministic checks as they arrive; a low-confidence
+    answer is retried one tier up, but only while the Evaluator has not found the larger model to
+    do no better. These heuristic confidences only gate the retry of their own response and are
+    logged with it; the quality history is built from Evaluator scores alone. Every decision is
+    appended to a JSON-lines log, which is also replayed to restore the history.
+    """
+
+    def __init__(self, log_path=ROUTING_LOG_PATH):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._quality = {} # (feature, model) -> (moving average Evaluator score, samples)
+        self._last_model = OrderedDict() # (run_id, agent name) -> model that produced the latest output, least recent first
+        self._replay_log()
+
+    def _replay_log(self):
+        paths = [path for path in (f"{self.log_path}.1", self.log_path) if os.path.exists(path)]
+        files = [open(path, encoding='utf-8') for path in paths]
+        try:
+            for line in deque(chain(*files), maxlen=REPLAYED_LOG_LINES):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # A line cut short by a crash
+                if entry.get('type') == 'evaluation':
+                    for model, score in entry['scores']:
+                        self._update_quality(entry['feature'], model, score)
+        finally:
+            for f in files:
+                f.close()
+
+    def _append_log(self, entry):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+                size = f.tell()
+            if size >= ROUTING_LOG_MAX_BYTES:
+                os.replace(self.log_path, f"{self.log_path}.1")
+
+    def _update_quality(self, feature, model, score):
+        average, samples = self._quality.get((feature, model), (score, 0))
+        self._quality[(feature, model)] = (average + QUALITY_SMOOTHING * (score - average), samples + 1)
+
+    def quality(self, feature, model):
+        """
+        Moving average Evaluator score of `model` for `feature`, or None without enough samples.
+        """
+        with self._lock:
+            average, samples = self._quality.get((feature, model), (None, 0))
+        return average if samples >= MIN_QUALITY_SAMPLES else None
+
+    def _worth_escalating(self, feature, tier):
+        if tier + 1 >= len(MODEL_TIERS):
+            return False
+        current, larger = self.quality(feature, MODEL_TIERS[tier]), self.quality(feature, MODEL_TIERS[tier + 1])
+        return larger is None or current is None or larger > current
+
+    def choose(self, feature, prompt_tokens):
+        """
+        Returns (tier, reasons) for a new request.
+        """
+        tier = FEATURE_MIN_TIER.get(feature, 0)
+        reasons = [f"feature {feature} starts at {MODEL_TIERS[tier]}"]
+        if prompt_tokens > LONG_PROMPT_TOKENS and tier + 1 < len(MODEL_TIERS):
+            tier += 1
+            reasons.append(f"prompt of {prompt_tokens} tokens")
+        while True:
+            quality = self.quality(feature, MODEL_TIERS[tier])
+            if quality is None or quality >= CONFIDENCE_FLOOR or not self._worth_escalating(feature, tier):
+                break
+            tier += 1
+            reasons.append(f"{MODEL_TIERS[tier - 1]} averages {quality:.1f} for {feature}")
+        return tier, reasons
+
+    def route(self, prompt, prompt_tokens, feature, generate, run_id=None, agent_name=None, may_escalate=None):
+        """
+        Answers `prompt` by calling `generate(prompt, model)` on the chosen tier and escalating
+        low-confidence responses while `may_escalate()` (e.g. a budget check) allows another call.
+        Returns (response, attempts) where attempts lists {'model', 'confidence', 'latency_ms'}
+        in call order; the last attempt's response is returned.
+        """
+        tier, reasons = self.choose(feature, prompt_tokens)
+        attempts = []
+        while True:
+            model = MODEL_TIERS[tier]
+            started = time.perf_counter()
+            response = generate(prompt, model)
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            confidence = run_checks((None, agent_name, feature, response, structured_output(feature, response), None))['score']
+            attempts.append({'model': model, 'confidence': confidence, 'latency_ms': latency_ms})
+            if confidence >= CONFIDENCE_FLOOR or not self._worth_escalating(feature, tier):
+                break
+            if may_escalate is not None and not may_escalate():
+                reasons.append(f"kept {model} (confidence {confidence}): escalation not allowed")
+                break
+            tier += 1
+            reasons.append(f"{model} answered with confidence {confidence}")
+        if agent_name:
+            with self._lock:
+                self._last_model[(run_id, agent_name)] = model
+                self._last_model.move_to_end((run_id, agent_name))
+                if len(self._last_model) > MAX_TRACKED_OUTPUTS:
+                    self._last_model.popitem(last=False)
+        self._append_log({'type': 'route', 'time': time.time(), 'run_id': run_id, 'agent': agent_name,
+                          'feature': feature, 'prompt_tokens': prompt_tokens, 'model': model, 'reasons': reasons,
+                          'attempts': attempts})
+        return response, attempts
+
+    def record_evaluation(self, run_id, results):
+        """
+        Feeds Evaluator batch results ({'agent', 'llm_feature', 'score'}) back into the quality
+        history of the model that produced each output in this run.
+        """
+        scores = []
+        with self._lock:
+            for result in results:
+                model = self._last_model.get((run_id, result['agent']))
+                if model:
+                    self._update_quality(result['llm_feature'], model, result['score'])
+                    scores.append((result['llm_feature'], model, result['score']))
+        for feature, model, score in scores:
+            self._append_log({'type': 'evaluation', 'time': time.time(), 'run_id': run_id,
+                              'feature': feature, 'scores': [(model, score)]})
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_model_router():
+    """
+    One router per process, shared by UI sessions and background workers.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -0,0 +1,208 @@
+import difflib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from agent_bus import STATE_DIR
+
+# --- Versioning Settings ---
+OUTPUT_VERSIONS_DB_PATH = os.path.join(STATE_DIR, 'output_versions.db')
+KEYFRAME_INTERVAL = 10 # A full copy every N versions bounds how many deltas a materialization replays
+MAX_DELTA_RATIO = 0.5 # A delta larger than this share of the compressed full text is stored as a full copy instead
+KEEP_VERSIONS = 20 # Versions kept per agent output; older ones are garbage collected
+MATERIALIZED_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_connection = None
+_materialized = OrderedDict() # (run_id, agent_id, version) -> text, LRU
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(OUTPUT_VERSIONS_DB_PATH), exist_ok=True)
+        _connection = sqlite3.connect(OUTPUT_VERSIONS_DB_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        # 'base' rows hold the compressed text, 'delta' rows compressed line edits against the previous version
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS output_versions (
+                run_id TEXT NOT NULL,
+                agent_id INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                chars INTEGER NOT NULL,
+                stored_bytes INTEGER NOT NULL,
+                source TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_id, agent_id, version)
+            )""")
+        _connection.commit()
+    return _connection
+
+# --- Deltas ---
+def compute_delta(old_text, new_text):
+    """
+    Line edits turning old_text into new_text: [start, end] copies old lines, a list of strings inserts new ones.
+    """
+    old_lines, new_lines = old_text.splitlines(keepends=True), new_text.splitlines(keepends=True)
+    delta = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j2 > j1:
+            delta.append(new_lines[j1:j2])
+    return delta
+
+def apply_delta(old_text, delta):
+    old_lines = old_text.splitlines(keepends=True)
+    parts = []
+    for edit in delta:
+        if len(edit) == 2 and isinstance(edit[0], int):
+            parts.extend(old_lines[edit[0]:edit[1]])
+        else:
+            parts.extend(edit)
+    return "".join(parts)
+
+def _compress(value):
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'), 6)
+
+def _decompress(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+# --- Store ---
+def _cache_text(key, text):
+    _materialized[key] = text
+    _materialized.move_to_end(key)
+    if len(_materialized) > MATERIALIZED_CACHE_SIZE:
+        _materialized.popitem(last=False)
+
+def _materialize(connection, run_id, agent_id, version):
+    """
+    Rebuilds a version from the nearest full copy at or below it plus the deltas after that.
+    Caller holds _lock.
+    """
+    key = (run_id, agent_id, version)
+    if key in _materialized:
+        _materialized.move_to_end(key)
+        return _materialized[key]
+    base_version = connection.execute(
+        "SELECT MAX(version) FROM output_versions WHERE run_id = ? AND agent_id = ? AND version <= ? AND kind = 'base'",
+        (run_id, agent_id, version)).fetchone()[0]
+    if base_version is None:
+        raise KeyError(f"No version {version} of agent {agent_id} output in run {run_id}")
+    text = None
+    for row_version, kind, payload in connection.execute(
+            "SELECT version, kind, payload FROM output_versions WHERE run_id = ? AND agent_id = ? AND version BETWEEN ? AND ? "
+            "ORDER BY version", (run_id, agent_id, base_version, version)):
+        text = _decompress(payload) if kind == 'base' else apply_delta(text, _decompress(payload))
+        _cache_text((run_id, agent_id, row_version), text)
+    return text
+
+def record_output_version(run_id, agent_id, text, source='ui'):
+    """
+    Appends `text` as the newest version of an agent's output in a run and returns its version
+    number; an output identical to the latest version is not stored again. Old versions beyond
+    KEEP_VERSIONS are collected as new ones arrive.
+    """
+    if not isinstance(text, str):
+        return None
+    with _lock:
+        connection = _get_connection()
+        latest, base_version = connection.execute(
+            "SELECT MAX(version), MAX(CASE WHEN kind = 'base' THEN version END) FROM output_versions "
+            "WHERE run_id = ? AND agent_id = ?", (run_id, agent_id)).fetchone()
+        previous = _materialize(connection, run_id, agent_id, latest) if latest is not None else None
+        if previous == text:
+            return latest
+        version = (latest or 0) + 1
+        full = _compress(text)
+        kind, payload = 'base', full
+        if previous is not None and version - base_version < KEYFRAME_INTERVAL:
+            delta = _compress(compute_delta(previous, text))
+            if len(delta) <= len(full) * MAX_DELTA_RATIO:
+                kind, payload = 'delta', delta
+        connection.execute(
+            "INSERT INTO output_versions (run_id, agent_id, version, kind, payload, chars, stored_bytes, source, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, agent_id, version, kind, payload, len(text), len(payload), source, time.time()))
+        _cache_text((run_id, agent_id, version), text)
+        if version - KEEP_VERSIONS >= 1:
+            _collect(connection, run_id, agent_id, version - KEEP_VERSIONS + 1)
+        connection.commit()
+    return version
+
+def get_output_version(run_id, agent_id, version):
+    with _lock:
+        return _materialize(_get_connection(), run_id, agent_id, version)
+
+def list_output_versions(run_id, agent_id):
+    """
+    Versions of an agent's output in a run, newest first: [{'version', 'kind', 'chars', 'stored_bytes', 'source', 'created_at'}].
+    """
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT version, kind, chars, stored_bytes, source, created_at FROM output_versions "
+            "WHERE run_id = ? AND agent_id = ? ORDER BY version DESC", (run_id, agent_id)).fetchall()
+    return [{'version': version, 'kind': kind, 'chars': chars, 'stored_bytes': stored_bytes, 'source': source, 'created_at': created_at}
+            for version, kind, chars, stored_bytes, source, created_at in rows]
+
+def unified_output_diff(old_text, new_text, old_label, new_label):
+    return "\n".join(difflib.unified_diff(old_text.splitlines(), new_text.splitlines(),
+                                          fromfile=old_label, tofile=new_label, lineterm=""))
+
+# --- Garbage Collection ---
+def _collect(connection, run_id, agent_id, oldest_kept):
+    """
+    Deletes versions below `oldest_kept`, first rewriting it as a full copy if it is a delta.
+    Caller holds _lock and commits.
+    """
+    kind = connection.execute("SELECT kind FROM output_versions WHERE run_id = ? AND agent_id = ? AND version = ?",
+                              (run_id, agent_id, oldest_kept)).fetchone()
+    if kind is None:
+        return 0
+    if kind[0] == 'delta':
+        payload = _compress(_materialize(connection, run_id, agent_id, oldest_kept))
+        connection.execute("UPDATE output_versions SET kind = 'base', payload = ?, stored_bytes = ? "
+                           "WHERE run_id = ? AND agent_id = ? AND version = ?",
+                           (payload, len(payload), run_id, agent_id, oldest_kept))
+    deleted = connection.execute("DELETE FROM output_versions WHERE run_id = ? AND agent_id = ? AND version < ?",
+                                 (run_id, agent_id, oldest_kept)).rowcount
+    for key in [key for key in _materialized if key[:2] == (run_id, agent_id) and key[2] < oldest_kept]:
+        del _materialized[key]
+    return deleted
+
+def collect_output_versions(keep=KEEP_VERSIONS, max_age_days=None):
+    """
+    Keeps the newest `keep` versions of every output (and, with max_age_days, drops older versions
+    except each output's latest). Returns the number of versions deleted.
+    """
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+    deleted = 0
+    with _lock:
+        connection = _get_connection()
+        for run_id, agent_id, latest in connection.execute(
+                "SELECT run_id, agent_id, MAX(version) FROM output_versions GROUP BY run_id, agent_id").fetchall():
+            oldest_kept = latest - keep + 1
+            if cutoff is not None:
+                recent = connection.execute("SELECT MIN(version) FROM output_versions WHERE run_id = ? AND agent_id = ? "
+                                            "AND created_at >= ?", (run_id, agent_id, cutoff)).fetchone()[0]
+                oldest_kept = max(oldest_kept, recent if recent is not None else latest)
+            if oldest_kept > 1:
+                deleted += _collect(connection, run_id, agent_id, oldest_kept)
+        connection.commit()
+    return deleted
+
+def output_version_stats():
+    """
+    Stored versions, their compressed size, and the size the same versions would take as uncompressed full copies.
+    """
+    with _lock:
+        versions, stored_bytes, full_copy_chars, deltas = _get_connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored_bytes), 0), COALESCE(SUM(chars), 0), "
+            "COALESCE(SUM(kind = 'delta'), 0) FROM output_versions").fetchone()
+    return {'versions': versions, 'deltas': deltas, 'stored_bytes': stored_bytes, 'full_copy_chars': full_copy_chars}
@@ -0,0 +1,76 @@
+"""
+Offline load benchmark for the SDLC prototype, driven by recorded LLM traffic.
+
+  record - runs the full agent DAG against the live backend and saves every LLM call to a cassette
+  replay - runs --runs concurrent DAG runs from the cassette (no network) and reports makespans,
+           failures, injected faults and cassette misses
+
+Usage:
+  python replay_benchmark.py record cassette.jsonl.gz
+  python replay_benchmark.py replay cassette.jsonl.gz [--runs N] [--workers N] [--latency original|distribution|none]
+                                                      [--latency-scale X] [--faults timeout=0.02,rate_limit=0.05] [--seed N]
+"""
+import argparse
+import logging
+import statistics
+import time
+import uuid
+
+import llm_client
+from dag_scheduler import DagScheduler
+from llm_cassette import LATENCY_MODES, RecordingTransport, ReplayTransport, parse_faults
+from sdlc_core.llm import run_agent_headless
+from sdlc_core.registry import current_plan
+
+def run_dags(runs, workers):
+    """
+    Submits `runs` full-graph runs to one scheduler at once and waits for all of them.
+    """
+    scheduler = DagScheduler(max_workers=workers)
+    agents = current_plan()['agents']
+    run_ids = [scheduler.submit_run(f"bench-{uuid.uuid4().hex[:8]}", agents, run_agent_headless) for _ in range(runs)]
+    for run_id in run_ids:
+        scheduler.wait(run_id)
+    statuses = [scheduler.status(run_id) for run_id in run_ids]
+    scheduler.close()
+    return statuses
+
+def record(path):
+    transport = RecordingTransport(llm_client.simulate_llm_response, path)
+    llm_client.set_transport(transport)
+    statuses = run_dags(1, workers=4)
+    transport.save()
+    print(f"Recorded {sum(len(status['outputs']) for status in statuses)} agent outputs to {path}")
+
+def replay(path, runs, workers, latency, latency_scale, faults, seed):
+    transport = ReplayTransport(path, latency=latency, latency_scale=latency_scale, faults=faults, seed=seed)
+    logging.getLogger('dag_scheduler').setLevel(logging.CRITICAL) # Injected failures are counted below, not logged
+    llm_client.set_transport(transport)
+    started = time.perf_counter()
+    statuses = run_dags(runs, workers)
+    wall = time.perf_counter() - started
+    makespans = sorted(status['makespan'] for status in statuses)
+    failed = sum(len(status['failed']) for status in statuses)
+    print(f"runs            {runs} on {workers} workers in {wall:.2f}s")
+    print(f"makespan p50    {statistics.median(makespans):.2f}s")
+    print(f"makespan p95    {makespans[min(len(makespans) - 1, int(0.95 * len(makespans)))]:.2f}s")
+    print(f"failed agents   {failed} of {sum(status['total'] for status in statuses)}")
+    print(f"injected faults {transport.injector.counts}")
+    print(f"cassette        {transport.stats['hits']} hits, {transport.stats['model_substitutions']} other-model hits, "
+          f"{transport.stats['misses']} misses")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record LLM traffic, or replay it to benchmark the agent DAG offline.")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('cassette')
+    parser.add_argument('--runs', type=int, default=10, help="concurrent DAG runs to replay")
+    parser.add_argument('--workers', type=int, default=4, help="DAG scheduler worker threads")
+    parser.add_argument('--latency', choices=LATENCY_MODES, default='original')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--faults', default="", help="e.g. timeout=0.02,rate_limit=0.05,slow_tail=0.1,slow_tail_factor=5")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.mode == 'record':
+        record(args.cassette)
+    else:
+        replay(args.cassette, args.runs, args.workers, args.latency, args.latency_scale, parse_faults(args.faults), args.seed)
@@ -0,0 +1,127 @@
+import json
+import time
+from urllib.parse import quote
+
+from shared_state import MAX_UPDATE_RETRIES, VersionConflictError, get_state_backend, state_key # Every replica lists the same runs
+
+# --- Run Index Settings ---
+# Each run is one record under run/<run_id>. Listings page newest-first over order keys
+# run_order/all/<rank>/<run_id> and run_order/owner/<owner>/<rank>/<run_id>, where rank sorts
+# the most recently updated run first; the record is the source of truth and stale order keys
+# left by racing writers are skipped and removed when a listing meets them.
+RUN_NAMESPACE = 'run'
+RUN_ORDER_NAMESPACE = 'run_order'
+RANK_EPOCH = 10_000_000_000 # Seconds; ranks count down from here so newer runs sort first
+DEFAULT_PAGE_SIZE = 25
+
+def _rank(updated_at):
+    return f"{RANK_EPOCH - updated_at:020.6f}"
+
+def _order_prefix(owner=None):
+    if owner:
+        return state_key(RUN_ORDER_NAMESPACE, 'owner', quote(owner, safe='')) + "/"
+    return state_key(RUN_ORDER_NAMESPACE, 'all') + "/"
+
+def _order_keys(run):
+    keys = [f"{_order_prefix()}{_rank(run['updated_at'])}/{run['run_id']}"]
+    if run['owner']:
+        keys.append(f"{_order_prefix(run['owner'])}{_rank(run['updated_at'])}/{run['run_id']}")
+    return keys
+
+def _write_run(run_id, change):
+    """
+    Optimistically applies change(current run or None) to a run record and moves its order keys.
+    `change` returns the new record, or None to leave the run as it is. Returns the stored run.
+    """
+    backend = get_state_backend()
+    key = state_key(RUN_NAMESPACE, run_id)
+    for _ in range(MAX_UPDATE_RETRIES):
+        value, version = backend.get(key)
+        previous = json.loads(value) if value is not None else None
+        run = change(previous)
+        if run is None:
+            return previous
+        try:
+            backend.put(key, json.dumps(run).encode('utf-8'), expected_version=version)
+        except VersionConflictError:
+            continue
+        new_keys = _order_keys(run)
+        for order_key in new_keys: # Add before removing, so the run never drops out of a listing
+            backend.put(order_key, b"")
+        for order_key in set(_order_keys(previous) if previous else ()) - set(new_keys):
+            backend.delete(order_key)
+        return run
+    raise VersionConflictError(f"Gave up updating run {run_id} after {MAX_UPDATE_RETRIES} conflicting writes")
+
+def _new_run(run_id, name, owner, now):
+    return {'run_id': run_id, 'name': name, 'owner': owner, 'created_at': now, 'updated_at': now,
+            'current_phase_index': 0, 'completed_phases': 0}
+
+# --- Runs ---
+def register_run(run_id, name, owner=None):
+    """
+    Adds a named run to the index (or renames an existing one).
+    """
+    now = time.time()
+    _write_run(run_id, lambda run: dict(run, name=name) if run else _new_run(run_id, name, owner, now))
+
+def update_run_progress(run_id, current_phase_index, completed_phases, owner=None):
+    """
+    Records a run's phase progress. Unregistered runs are added under a default name.
+    Skips the write when the progress is unchanged, so calling this on every rerun is cheap.
+    """
+    def change(run):
+        if run is None:
+            run = _new_run(run_id, f"Run {run_id[:8]}", owner, time.time())
+        elif (run['current_phase_index'], run['completed_phases']) == (current_phase_index, completed_phases):
+            return None
+        return dict(run, current_phase_index=current_phase_index, completed_phases=completed_phases, updated_at=time.time())
+    _write_run(run_id, change)
+
+def get_run(run_id):
+    value, _ = get_state_backend().get(state_key(RUN_NAMESPACE, run_id))
+    return json.loads(value) if value is not None else None
+
+def list_runs(owner=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of runs, most recently updated first. `cursor` is the `next_cursor` of the previous
+    page; paging seeks on the order keys instead of skipping rows, so deep pages stay as fast as
+    the first. Returns (runs, next_cursor), with next_cursor None on the last page.
+    """
+    backend = get_state_backend()
+    prefix = _order_prefix(owner)
+    runs, order_keys = [], []
+    while len(runs) <= limit:
+        wanted = limit + 1 - len(runs) # One past the page tells whether another page follows
+        batch = backend.scan(prefix, start_after=cursor, limit=wanted)
+        for order_key, _, _ in batch:
+            rank, run_id = order_key[len(prefix):].split('/')
+            run = get_run(run_id)
+            if run is None or _rank(run['updated_at']) != rank:
+                backend.delete(order_key) # Left behind by a concurrent update or delete
+                continue
+            runs.append(run)
+            order_keys.append(order_key)
+        if len(batch) < wanted:
+            break
+        cursor = batch[-1][0]
+    next_cursor = order_keys[limit - 1] if len(runs) > limit else None
+    return runs[:limit], next_cursor
+
+def count_runs(owner=None):
+    """
+    Number of runs (of `owner`); a concurrent update may briefly count a run twice.
+    """
+    backend = get_state_backend()
+    if owner is None:
+        return backend.stats(state_key(RUN_NAMESPACE) + "/")['keys']
+    return backend.stats(_order_prefix(owner))['keys']
+
+def delete_run(run_id):
+    run = get_run(run_id)
+    if run is None:
+        return
+    backend = get_state_backend()
+    backend.delete(state_key(RUN_NAMESPACE, run_id))
+    for order_key in _order_keys(run):
+        backend.delete(order_key)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from structured_outputs import structured_output
+
+# --- Sandbox Limits ---
+DEFAULT_LIMITS = {
+    'cpu_seconds': 5, # RLIMIT_CPU for the child interpreter
+    'memory_mb': 256, # RLIMIT_AS for the child interpreter
+    'wall_seconds': 10, # Hard timeout enforced by the parent
+}
+MAX_PARALLEL_UNITS = min(8, os.cpu_count() or 1)
+MAX_CAPTURED_OUTPUT = 4000 # Characters of stdout/stderr kept per unit
+
+_RESULT_MARKER = "__SANDBOX_RESULT__"
+
+# Harness executed inside the child interpreter. It applies the CPU and memory limits passed on
+# its command line (a preexec_fn is not safe while the parent runs threads), imports the generated
+# code as `solution`, runs every `test_*` function from the tests file and prints a single JSON result line.
+_HARNESS = r'''
+import json, os, sys, time, traceback
+try:
+    import resource # POSIX only; limits are skipped where it is unavailable
+except ImportError:
+    resource = None
+if resource is not None:
+    cpu_seconds, memory_bytes = int(sys.argv[1]), int(sys.argv[2])
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+sys.path.insert(0, os.getcwd()) # -I drops the script directory from sys.path
+results = []
+start = time.perf_counter()
+try:
+    import solution
+    results.append({"name": "import_solution", "status": "passed", "duration_ms": round((time.perf_counter() - start) * 1000, 2), "message": ""})
+except BaseException as e:
+    results.append({"name": "import_solution", "status": "error", "duration_ms": round((time.perf_counter() - start) * 1000, 2), "message": traceback.format_exc(limit=3)})
+    solution = None
+if solution is not None:
+    namespace = {k: v for k, v in vars(solution).items() if not k.startswith("__")}
+    namespace["__name__"] = "sandbox_tests"
+    with open("test_solution.py") as f:
+        test_source = f.read()
+    start = time.perf_counter()
+    try:
+        exec(compile(test_source, "test_solution.py", "exec"), namespace)
+        module_status, module_message = "passed", ""
+    except AssertionError as e:
+        module_status, module_message = "failed", traceback.format_exc(limit=3)
+    except BaseException as e:
+        module_status, module_message = "error", traceback.format_exc(limit=3)
+    tests = [(name, obj) for name, obj in namespace.items() if name.startswith("test_") and callable(obj)]
+    if test_source.strip() and (module_status != "passed" or not tests):
+        results.append({"name": "test_module", "status": module_status, "duration_ms": round((time.perf_counter() - start) * 1000, 2), "message": module_message})
+    for name, test in tests:
+        start = time.perf_counter()
+        try:
+            test()
+            status, message = "passed", ""
+        except AssertionError:
+            status, message = "failed", traceback.format_exc(limit=3)
+        except BaseException:
+            status, message = "error", traceback.format_exc(limit=3)
+        results.append({"name": name, "status": status, "duration_ms": round((time.perf_counter() - start) * 1000, 2), "message": message})
+sys.stdout.flush()
+print("__SANDBOX_RESULT__" + json.dumps(results))
+'''
+
+# --- Result Cache ---
+# Results keyed by a hash of code, tests and limits, so re-validating an unchanged unit is free.
+_RESULT_CACHE_SIZE = 1024
+_result_cache = OrderedDict()
+
+def code_hash(code, tests="", limits=None):
+    """
+    Returns the cache key for a unit of generated code and its tests.
+    """
+    payload = json.dumps([code, tests, limits or DEFAULT_LIMITS], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def extract_python_code(text, feature='code_generation'):
+    """
+    Returns the Python source from an agent output: the Python code blocks of its parsed form
+    if any, otherwise the text itself.
+    """
+    blocks = [code for lang, code in structured_output(feature, text)['fields']['code_blocks'] if lang in ('python', 'py')]
+    return "\n\n".join(blocks) if blocks else text
+
+# --- Execution ---
+def _run_unit(code, tests, limits):
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="sdlc_sandbox_") as workdir:
+        for filename, content in (("solution.py", code), ("test_solution.py", tests), ("harness.py", _HARNESS)):
+            with open(os.path.join(workdir, filename), "w") as f:
+                f.write(content)
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-I", "harness.py", str(limits['cpu_seconds']), str(limits['memory_mb'] * 1024 * 1024)], # -I: isolated mode, ignores env vars and user site-packages
+                cwd=workdir, capture_output=True, text=True, timeout=limits['wall_seconds'],
+                env={'PATH': os.environ.get('PATH', ''), 'PYTHONDONTWRITEBYTECODE': '1'},
+            )
+        except subprocess.TimeoutExpired as e:
+            return {'status': 'timeout', 'tests': [], 'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                    'stdout': (e.stdout or "")[:MAX_CAPTURED_OUTPUT] if isinstance(e.stdout, str) else "",
+                    'stderr': f"Exceeded wall-clock limit of {limits['wall_seconds']}s"}
+
+    tests_run = []
+    stdout_lines = []
+    for line in completed.stdout.splitlines():
+        if line.startswith(_RESULT_MARKER):
+            tests_run = json.loads(line[len(_RESULT_MARKER):])
+        else:
+            stdout_lines.append(line)
+
+    stderr = completed.stderr[:MAX_CAPTURED_OUTPUT]
+    if not tests_run:
+        status = 'error' # Harness never reported: killed by a resource limit or crashed
+        if completed.returncode < 0:
+            stderr += f"\nKilled by signal {-completed.returncode} (CPU limit {limits['cpu_seconds']}s / memory limit {limits['memory_mb']}MB)"
+    elif all(test['status'] == 'passed' for test in tests_run):
+        status = 'passed'
+    elif any(test['status'] == 'error' for test in tests_run):
+        status = 'error'
+    else:
+        status = 'failed'
+    return {
+        'status': status,
+        'tests': tests_run,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'returncode': completed.returncode,
+        'stdout': "\n".join(stdout_lines)[:MAX_CAPTURED_OUTPUT],
+        'stderr': stderr,
+    }
+
+def run_in_sandbox(code, tests="", limits=None, use_cache=True):
+    """
+    Runs generated `code` and its `tests` in an isolated child interpreter with CPU, memory
+    and wall-clock limits. Returns a structured pass/fail/timing result dict.
+    """
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    key = code_hash(code, tests, limits)
+    if use_cache and key in _result_cache:
+        _result_cache.move_to_end(key)
+        return dict(_result_cache[key], cached=True)
+
+    result = _run_unit(code, tests, limits)
+    result['code_hash'] = key
+    if result['status'] != 'timeout': # A timeout may be load-related, so do not pin it in the cache
+        _result_cache[key] = result
+        if len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return dict(result, cached=False)
+
+def run_units(units, limits=None, max_workers=MAX_PARALLEL_UNITS):
+    """
+    Runs many (code, tests) units in parallel, each in its own sandboxed process.
+    Threads only wait on the child processes, so concurrency is bounded by `max_workers`.
+    Returns results in the same order as `units`.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda unit: run_in_sandbox(unit[0], unit[1], limits), units))
+
+def summarize_results(results):
+    """
+    Aggregates unit results into pass/fail counts and total timings for the workflow.
+    """
+    tests = [test for result in results for test in result['tests']]
+    return {
+        'units': len(results),
+        'units_passed': sum(1 for result in results if result['status'] == 'passed'),
+        'tests': len(tests),
+        'tests_passed': sum(1 for test in tests if test['status'] == 'passed'),
+        'cached': sum(1 for result in results if result.get('cached')),
+        'total_ms': round(sum(result['duration_ms'] for result in results), 2),
+    }
@@ -0,0 +1,9 @@
+"""
+Core shared by both SDLC front ends (app.py and new.py):
+
+- registry: agents, phases and roles loaded from the versioned graph config (sdlc_graph.json)
+- llm: LLM calls from the UI and from background workers
+- engine: process-wide event bus pipeline and DAG scheduler
+- auth: user store, session secret and role permissions
+- state: session state, navigation, checkpoints and runs
+"""
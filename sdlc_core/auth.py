@@ -0,0 +1,32 @@
+import streamlit as st
+
+from auth_backend import SQLiteAuthBackend, load_session_secret, mask_allows # Hashed credentials
+from sdlc_core.registry import current_plan
+
+# --- Demo Users (seeded into the hashed user store on first start) ---
+USER_CREDENTIALS = {
+    "admin": "adminpass",
+    "ba_user": "bapass",
+    "architect_user": "archpass",
+    "planner_user": "planpass",
+    "dev_user": "devpass",
+    "qa_user": "qapass",
+    "devops_user": "devopspass",
+    "ops_user": "opspass",
+}
+
+def can_access_agent(role, agent_id):
+    return mask_allows(current_plan()['role_agent_masks'].get(role, 0), agent_id) # Bitsets precomputed with the plan
+
+@st.cache_resource
+def get_auth_backend():
+    """
+    One user store per server process; demo users are added on first start.
+    """
+    backend = SQLiteAuthBackend()
+    backend.seed_users({username: (password, username) for username, password in USER_CREDENTIALS.items()}) # Username doubles as role in this prototype
+    return backend
+
+@st.cache_resource
+def get_session_secret():
+    return load_session_secret()
@@ -0,0 +1,195 @@
+import os
+
+import streamlit as st
+
+from agent_bus import AgentPipeline, BrokerBus, InMemoryBroker, LocalEventBus # Event-driven agent handoffs
+from backlog_processor import BULK_SPRINT_PROMPT, BULK_TRD_PROMPT, BacklogProcessor # Bulk BA/Planner backlog runs
+from context_budget import build_agent_context, collect_upstream_outputs, compose_prompt # Token-budgeted upstream context
+from dag_scheduler import DagScheduler # Critical-path scheduling of agent DAGs across runs
+from llm_jobs import LLMJobRunner # Cancellable background LLM calls with progress
+from output_versions import record_output_version # Delta-compressed output history
+from cost_ledger import check_budget # Per-role LLM budgets
+from speculative_prefetch import SpeculativePrefetcher # Background generation of the likely next LLM calls
+from sdlc_core.auth import can_access_agent
+from sdlc_core.llm import BudgetExceededError, metered_llm_call, run_agent_headless
+from sdlc_core.registry import current_plan, llm_output_key
+
+# 'local' keeps a durable per-topic event log under .sdlc_state; 'memory' runs the broker adapter
+# over the in-process stand-in broker, whose history does not survive a restart
+AGENT_BUS = os.environ.get('SDLC_AGENT_BUS', 'local')
+
+# --- Shared Worker Pools ---
+@st.cache_resource
+def _agent_pipeline():
+    plan = current_plan()
+    bus = BrokerBus(InMemoryBroker()) if AGENT_BUS == 'memory' else LocalEventBus()
+    return AgentPipeline(bus, plan['agents'], run_agent_headless, phases=plan['phases'])
+
+def get_agent_pipeline():
+    """
+    One bus and subscriber pipeline per server process, shared by all sessions. A reloaded plan
+    is swapped into it, so runs in flight keep their status and the bus log has a single writer.
+    """
+    plan = current_plan()
+    pipeline = _agent_pipeline()
+    if pipeline.agent_data is not plan['agents']:
+        pipeline.set_plan(plan['agents'], plan['phases'])
+    return pipeline
+
+@st.cache_resource
+def get_dag_scheduler():
+    """
+    One worker pool per server process; runs from all sessions share it, prioritized by critical path.
+    """
+    return DagScheduler()
+
+@st.cache_resource
+def get_llm_prefetcher():
+    """
+    One low-priority speculation worker per server process, shared by all sessions.
+    """
+    return SpeculativePrefetcher(metered_llm_call)
+
+@st.cache_resource
+def get_llm_job_runner():
+    """
+    One bounded pool of interactive LLM workers per server process, shared by all sessions.
+    """
+    return LLMJobRunner()
+
+@st.cache_resource
+def get_backlog_processor():
+    """
+    One bounded bulk worker pool per server process; backlogs from all sessions share it.
+    """
+    return BacklogProcessor(bulk_trd_prompt, bulk_sprint_prompt)
+
+# --- Session Outputs ---
+def completed_agent_outputs():
+    """
+    Returns {agent_id: output} for every agent whose LLM step has produced output in this session.
+    """
+    outputs = {}
+    for agent_id, agent in current_plan()['agents'].items():
+        output = st.session_state.get(llm_output_key(agent))
+        if output is not None:
+            outputs[agent_id] = output
+    return outputs
+
+def store_agent_output(agent, output, source='ui'):
+    """
+    Sets an agent's LLM output for this session (and for phase completion) and appends it to the
+    run's version history, so regenerating an output no longer loses the previous one.
+    """
+    st.session_state[llm_output_key(agent)] = output
+    st.session_state.last_agent_output_for_phase_completion = output
+    record_output_version(st.session_state.run_id, agent['id'], output, source=source)
+
+def sync_agent_outputs(outputs):
+    """
+    Copies outputs produced by background workers ({agent name: output}) into this session's
+    phase outputs and agent LLM output slots, so agents open with their output already generated.
+    """
+    plan = current_plan()
+    for agent in plan['agents'].values():
+        output = outputs.get(agent['name'])
+        if output is None:
+            continue
+        if st.session_state.get(llm_output_key(agent)) is None:
+            st.session_state[llm_output_key(agent)] = output
+        for phase in plan['phases']:
+            if phase['primary_agent_id'] == agent['id'] and phase['phase_id'] not in st.session_state.completed_phases_outputs:
+                st.session_state.completed_phases_outputs[phase['phase_id']] = output
+
+def publish_agent_completion(agent):
+    """
+    Announces an agent's finalized output once per run on the event bus, and starts prefetching
+    the LLM steps of the agents likely to be opened next.
+    """
+    output = st.session_state.get(llm_output_key(agent))
+    completion_key = (st.session_state.run_id, agent['id'])
+    if completion_key not in st.session_state.published_completions and output is not None:
+        get_agent_pipeline().publish_completion(st.session_state.run_id, agent, output)
+        st.session_state.published_completions.add(completion_key)
+        prefetch_next_agents(agent, output)
+
+# --- Background LLM Jobs ---
+def submit_llm_job(agent, prompt):
+    """
+    Starts an agent's LLM step in the background for this session's run and role, cancelling
+    the job it still has in flight, if any. The job id is kept in st.session_state.llm_jobs.
+    """
+    runner = get_llm_job_runner()
+    previous_job_id = st.session_state.llm_jobs.get(agent['id'])
+    if previous_job_id:
+        runner.cancel(previous_job_id, reason="Superseded by a new run")
+    st.session_state.llm_jobs[agent['id']] = runner.submit(agent['name'], metered_llm_call, prompt, agent=agent,
+                                                           run_id=st.session_state.run_id,
+                                                           role=st.session_state.logged_in_user_role, json_mode=True)
+
+# --- Speculative Prefetch ---
+def agent_prompt(agent, phase_outputs, user_input):
+    """
+    The prompt an agent's LLM step sends: its compacted upstream phase outputs plus the user's input.
+    Returns (prompt, upstream_context).
+    """
+    plan = current_plan()
+    upstream_context = build_agent_context(agent, collect_upstream_outputs(agent, plan['agents'], plan['phases'], phase_outputs))
+    return compose_prompt(upstream_context, user_input), upstream_context
+
+def prefetch_next_agents(agent, output):
+    """
+    Speculatively generates the default-input LLM step of the agents most likely to run after
+    `agent` (the ones it activates and the next phase's primary agent) that this user may open.
+    Their upstream includes `output`, as it will once the agent's phase is completed.
+    """
+    role = st.session_state.logged_in_user_role
+    if check_budget(role)[0] != 'ok':
+        return # Speculation is optional spend; stop once the role is past its soft budget
+    plan = current_plan()
+    phase_outputs = dict(st.session_state.completed_phases_outputs)
+    if agent['name'] in plan['phase_id_by_agent_name']:
+        phase_outputs[plan['phase_id_by_agent_name'][agent['name']]] = output
+    prefetcher = get_llm_prefetcher()
+    for next_agent_id in plan['likely_next_agent_ids'].get(agent['id'], []):
+        next_agent = plan['agents'][next_agent_id]
+        if not can_access_agent(role, next_agent_id) or st.session_state.get(llm_output_key(next_agent)):
+            continue
+        prompt, _ = agent_prompt(next_agent, phase_outputs, plan['default_inputs'].get(next_agent['llm_feature'], ""))
+        prefetcher.speculate(st.session_state.run_id, next_agent_id, prompt, call_kwargs={
+            'agent': next_agent, 'run_id': st.session_state.run_id, 'role': role, 'source': 'prefetch', 'json_mode': True})
+
+def prefetched_llm_response(prompt):
+    """
+    Returns the speculated response for this exact prompt, or None if it was not prefetched.
+    """
+    with st.spinner("Finishing the prefetched response..."): # Only shown if the speculation is still running
+        return get_llm_prefetcher().take(prompt)
+
+# --- Bulk Backlog Processing ---
+def _agent_for_feature(llm_feature):
+    return next(agent for agent in current_plan()['agents'].values() if agent['llm_feature'] == llm_feature)
+
+def bulk_trd_prompt(item):
+    return BULK_TRD_PROMPT.format(requirement=item['text'])
+
+def bulk_sprint_prompt(items, trds):
+    """
+    The Planner Agent prompt for one sprint: its items' TRDs, compacted to the Planner's token budget, as context.
+    """
+    upstream_context = build_agent_context(_agent_for_feature('sprint_summary'),
+                                           {_agent_for_feature('trd_generation')['name']: "\n\n".join(trds)})
+    return compose_prompt(upstream_context, BULK_SPRINT_PROMPT.format(items="; ".join(item['title'] for item in items)))
+
+def submit_backlog(items=None):
+    """
+    Starts or resumes this session's bulk backlog run, metered against its run and role.
+    The job pauses (and can be resumed later) once the role's daily budget is used up.
+    """
+    agents = {'trd': _agent_for_feature('trd_generation'), 'sprint': _agent_for_feature('sprint_summary')}
+    run_id, role = st.session_state.run_id, st.session_state.logged_in_user_role
+
+    def call_llm(stage, prompt):
+        return metered_llm_call(prompt, agent=agents[stage], run_id=run_id, role=role, source='bulk')
+
+    return get_backlog_processor().submit(run_id, call_llm, items=items, stop_errors=(BudgetExceededError,))
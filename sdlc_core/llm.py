@@ -0,0 +1,77 @@
+import time
+
+import streamlit as st
+
+from context_budget import build_agent_context, compose_prompt, count_tokens # Token-budgeted upstream context
+from cost_ledger import check_budget, record_llm_call # Per-call token and cost accounting
+from llm_client import generate_llm_response # Simulated Gemini call, usable outside the UI thread
+from model_router import get_model_router # Cheapest adequate model per request
+from artifact_store import intern_artifact # Content-addressed artifacts shared across runs
+from llm_jobs import check_cancelled, report_progress # Progress and cancellation of the calling background job
+from structured_outputs import readable_output, structured_output, with_json_mode # Schema-defined outputs per llm_feature
+from sdlc_core.registry import current_plan
+
+class BudgetExceededError(Exception):
+    """
+    Raised instead of calling the LLM when a role has reached its hard daily budget.
+    """
+
+# --- Metered LLM Calls ---
+def metered_llm_call(prompt, agent=None, run_id=None, role=None, source='ui', json_mode=False):
+    """
+    Calls the LLM on the model the router picks and appends each model call's tokens, model,
+    latency and cost to the ledger, attributed to the agent (and its phase), run and role.
+    The role's hard budget is checked before the first call and before every escalation.
+    With json_mode the agent's output schema is requested as JSON; either way the response is
+    parsed into that schema once here and cached for downstream readers. Safe to call from worker threads.
+    """
+    status, spent, budget = check_budget(role)
+    if status == 'hard':
+        raise BudgetExceededError(f"Daily LLM budget of ${budget['hard']:.2f} for role '{role}' is used up (${spent:.4f} spent).")
+    agent_name = agent['name'] if agent else None
+    feature = agent['llm_feature'] if agent else None
+    if json_mode:
+        prompt = with_json_mode(prompt, feature)
+    phase = current_plan()['phase_id_by_agent_name'].get(agent_name)
+    prompt_tokens = count_tokens(prompt)
+
+    def generate(prompt, model):
+        check_cancelled() # Do not escalate to another model for a job nobody is waiting on
+        report_progress(f"Calling {model}")
+        started = time.perf_counter()
+        response = intern_artifact(generate_llm_response(prompt, model))
+        record_llm_call(prompt_tokens, count_tokens(response), int((time.perf_counter() - started) * 1000),
+                        model=model, run_id=run_id, agent=agent_name, phase=phase, role=role, source=source)
+        return response
+
+    response, _ = get_model_router().route(prompt, prompt_tokens, feature, generate, run_id=run_id, agent_name=agent_name,
+                                           may_escalate=lambda: check_budget(role)[0] != 'hard')
+    structured_output(feature, response)
+    return response
+
+# --- LLM Call Simulation Function (Synchronous) ---
+def call_llm_api(prompt, agent=None):
+    """
+    Calls the LLM with a spinner in the UI, metered against this session's run and role.
+    The simulated Gemini call itself lives in llm_client so background workers can use it
+    without a Streamlit context.
+    """
+    try:
+        with st.spinner("Thinking... (Simulating LLM call)"): # Using spinner here
+            return metered_llm_call(prompt, agent=agent, run_id=st.session_state.run_id,
+                                    role=st.session_state.logged_in_user_role)
+    except Exception as e:
+        st.error(f"Error calling LLM: {e}")
+        return f"Error calling LLM: {e}"
+
+def run_agent_headless(agent, upstream_outputs):
+    """
+    Runs an agent's LLM step in JSON mode with its default input and compacted upstream context.
+    Called by event bus subscribers and the DAG scheduler on worker threads, so it must not touch the UI.
+    """
+    plan = current_plan()
+    upstream_outputs = {name: readable_output(plan['agents'][plan['agent_id_by_name'][name]]['llm_feature'], str(output))
+                        for name, output in upstream_outputs.items()} # Upstream agents answered in JSON mode
+    upstream_context = build_agent_context(agent, upstream_outputs)
+    prompt = compose_prompt(upstream_context, plan['default_inputs'].get(agent['llm_feature'], ""))
+    return metered_llm_call(prompt, agent=agent, source='headless', json_mode=True)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+from agent_bus import STATE_DIR
+from agent_catalog import build_search_index # Indexed agent catalog search
+from auth_backend import build_access_masks, mask_allows
+
+logger = logging.getLogger(__name__)
+
+# --- Graph Config ---
+# SDLC_GRAPH_CONFIG selects a workflow variant (.json, .yaml or .yml); the default is the repo's graph
+GRAPH_CONFIG_PATH = os.environ.get('SDLC_GRAPH_CONFIG') or \
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sdlc_graph.json')
+SUPPORTED_GRAPH_VERSIONS = (1,)
+REQUIRED_GRAPH_KEYS = ('agents', 'phases', 'display_order', 'default_inputs', 'prompt_instructions', 'role_agent_access')
+ALL_AGENTS = "*" # role_agent_access value granting every agent
+PLAN_CACHE_DIR = os.path.join(STATE_DIR, 'graph_plans')
+PLAN_FORMAT = 3 # Bump when compile_graph changes shape, so stale cached plans are not reused
+GRAPH_RELOAD_INTERVAL = 2.0 # Seconds between checks of the config file for edits
+
+def parse_graph_file(raw, path):
+    """
+    Parses config bytes as YAML for .yaml/.yml files, otherwise as JSON. Raises ValueError.
+    """
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml # Optional; only needed for YAML workflow files
+        except ImportError:
+            raise ValueError(f"PyYAML is required to load {path}")
+        try:
+            return yaml.safe_load(raw)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {path}: {e}")
+    return json.loads(raw)
+
+def validate_graph(config):
+    """
+    Checks that every reference in the graph resolves. Raises ValueError naming the first problem.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Graph config must be a mapping")
+    if config.get('version') not in SUPPORTED_GRAPH_VERSIONS:
+        raise ValueError(f"Unsupported graph config version {config.get('version')!r}; expected one of {SUPPORTED_GRAPH_VERSIONS}")
+    missing = [key for key in REQUIRED_GRAPH_KEYS if key not in config]
+    if missing:
+        raise ValueError(f"Graph config is missing {', '.join(missing)}")
+    ids = [agent['id'] for agent in config['agents']]
+    if len(ids) != len(set(ids)):
+        raise ValueError("Graph config has duplicate agent ids")
+    names = {agent['name'] for agent in config['agents']}
+    for agent in config['agents']:
+        for name in agent['receives_input_from'] + agent['activates_agents']:
+            if name not in names:
+                raise ValueError(f"Agent '{agent['name']}' references unknown agent '{name}'")
+        if not 0 <= agent['llm_step_index'] < len(agent['workflow_steps']):
+            raise ValueError(f"Agent '{agent['name']}' has llm_step_index outside its workflow steps")
+    for phase in config['phases']:
+        if phase['primary_agent_id'] not in ids:
+            raise ValueError(f"Phase '{phase['phase_id']}' has unknown primary agent {phase['primary_agent_id']}")
+    for agent_id in config['display_order']:
+        if agent_id not in ids:
+            raise ValueError(f"display_order lists unknown agent {agent_id}")
+    for role, agent_ids in config['role_agent_access'].items():
+        if agent_ids != ALL_AGENTS and any(agent_id not in ids for agent_id in agent_ids):
+            raise ValueError(f"Role '{role}' is granted an unknown agent")
+
+def compile_graph(config, source_hash=None):
+    """
+    Turns a validated config into the plan the app runs on: 'agents' keyed by id, '*' role grants
+    expanded, and the lookups the UI and engine need precomputed instead of scanned on every rerun.
+    """
+    agents = {agent['id']: agent for agent in config['agents']}
+    role_agent_access = {role: list(agents) if agent_ids == ALL_AGENTS else agent_ids
+                         for role, agent_ids in config['role_agent_access'].items()}
+    role_agent_masks = build_access_masks(role_agent_access)
+    agent_id_by_name = {agent['name']: agent_id for agent_id, agent in agents.items()}
+    phase_id_by_agent_name = {}
+    for phase in config['phases']:
+        phase_id_by_agent_name.setdefault(agents[phase['primary_agent_id']]['name'], phase['phase_id'])
+    activated_agent_ids = {agent_id: [agent_id_by_name[name] for name in agent['activates_agents']]
+                           for agent_id, agent in agents.items()}
+    likely_next_agent_ids = {agent_id: list(targets) for agent_id, targets in activated_agent_ids.items()}
+    for phase, next_phase in zip(config['phases'], config['phases'][1:]):
+        targets = likely_next_agent_ids[phase['primary_agent_id']]
+        if next_phase['primary_agent_id'] not in targets:
+            targets.append(next_phase['primary_agent_id'])
+    return {
+        'version': config['version'],
+        'source_hash': source_hash,
+        'agents': agents,
+        'phases': config['phases'],
+        'display_order': config['display_order'], # Order for sidebar and agent cards
+        'default_inputs': config['default_inputs'], # Default LLM input per feature (also used by headless runs)
+        'prompt_instructions': config['prompt_instructions'],
+        'role_agent_access': role_agent_access,
+        'role_agent_masks': role_agent_masks, # Bitsets for O(1) permission checks
+        'role_display_order': {role: [agent_id for agent_id in config['display_order'] if mask_allows(mask, agent_id)]
+                               for role, mask in role_agent_masks.items()}, # Each role's catalog before search
+        'agent_search_index': build_search_index(agents, config['display_order']),
+        'agent_id_by_name': agent_id_by_name,
+        'phase_id_by_agent_name': phase_id_by_agent_name, # Phase whose output is an agent's deliverable
+        'activated_agent_ids': activated_agent_ids,
+        'likely_next_agent_ids': likely_next_agent_ids, # Activated agents plus the next phase's primary agent
+    }
+
+def _plan_cache_path(source_hash):
+    return os.path.join(PLAN_CACHE_DIR, f"{source_hash}-v{PLAN_FORMAT}.pickle")
+
+def load_plan(path=GRAPH_CONFIG_PATH):
+    """
+    Returns the compiled plan for a config file. Plans are cached by content hash, so an unchanged
+    file is never re-parsed, re-validated or re-compiled, across restarts and replicas alike.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    cache_path = _plan_cache_path(source_hash)
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    config = parse_graph_file(raw, path)
+    validate_graph(config)
+    plan = compile_graph(config, source_hash)
+    os.makedirs(PLAN_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path) # Concurrent writers produce identical files; readers never see a partial one
+    return plan
+
+# --- Registry ---
+_plan_lock = threading.Lock()
+_plan = None
+_plan_signature = None
+_plan_checked_at = 0.0
+
+def current_plan():
+    """
+    The active workflow plan. The config file is re-checked at most every GRAPH_RELOAD_INTERVAL
+    seconds; an edited file is compiled and swapped in as one reference, so a caller holding a plan
+    always sees a consistent graph. An invalid edit is logged and the previous plan kept.
+    """
+    global _plan, _plan_signature, _plan_checked_at
+    if _plan is not None and time.monotonic() - _plan_checked_at < GRAPH_RELOAD_INTERVAL:
+        return _plan
+    with _plan_lock:
+        if _plan is None or time.monotonic() - _plan_checked_at >= GRAPH_RELOAD_INTERVAL:
+            try:
+                stat = os.stat(GRAPH_CONFIG_PATH)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if signature != _plan_signature:
+                    _plan_signature = signature # A broken edit is reported once, not on every check
+                    _plan = load_plan(GRAPH_CONFIG_PATH)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if _plan is None:
+                    _plan_signature = None
+                    raise
+                logger.warning("Keeping the current workflow plan; could not reload %s: %s", GRAPH_CONFIG_PATH, e)
+            _plan_checked_at = time.monotonic()
+    return _plan
+
+def llm_output_key(agent):
+    """
+    Session state key holding an agent's LLM step output.
+    """
+    return f"llm_output_agent_{agent['id']}_step_{agent.get('llm_step_index')}"
@@ -0,0 +1,178 @@
+import time
+import uuid
+from collections import OrderedDict # To maintain order of agents in workflow
+
+import streamlit as st
+
+from auth_backend import SESSION_TICKET_TTL_SECONDS, discard_session_ticket, issue_session_ticket, redeem_session_ticket, revoke_session_token, verify_session_token # Signed, revocable session tokens
+from checkpoint_store import load_checkpoint, restore_session_state, save_checkpoint, snapshot_session_state # Resumable runs
+from run_registry import register_run, update_run_progress # Indexed multi-run listing
+from sdlc_core.auth import get_auth_backend, get_session_secret
+from sdlc_core.engine import get_agent_pipeline
+from sdlc_core.registry import current_plan, llm_output_key
+
+# --- Streamlit Session State Initialization ---
+def initialize_session_state(user_role=None, username=None):
+    """
+    Resets the session to a fresh run. Front ends without a login pass the role they run as
+    and no username, so their runs have no owner and cannot be resumed from them.
+    """
+    st.session_state.current_phase_index = 0
+    st.session_state.completed_phases_outputs = OrderedDict()
+    st.session_state.agent_detailed_view = None
+    st.session_state.current_agent_step_index = 0
+    st.session_state.last_agent_output_for_phase_completion = None
+    st.session_state.batch_evaluation_results = None
+    st.session_state.sandbox_runs = {} # agent_id -> {'units': [...], 'summary': {...}} of the last sandbox run
+    st.session_state.llm_jobs = {} # agent_id -> id of its background LLM job; jobs left behind are reaped as abandoned
+    st.session_state.log_anomaly_summary = None
+    st.session_state.finops_analysis = None
+    st.session_state.started = False
+    st.session_state.is_authenticated = user_role is not None
+    st.session_state.logged_in_user_role = user_role
+    st.session_state.logged_in_username = username # Owner of the runs this session starts
+    st.session_state.session_token = None # Signed token of a logged-in user, re-checked on every rerun; never put in the URL
+    st.session_state.session_ticket = None # One-time ticket in the URL that lets a reconnecting browser skip the login page
+    st.session_state.session_ticket_issued_at = 0.0
+    st.session_state.current_view = 'agent_overview' # 'agent_overview', 'agent_detail', 'dashboard' or 'runs_admin'
+    st.session_state.run_id = uuid.uuid4().hex # Identifies this SDLC run on the agent event bus and in checkpoints
+    st.session_state.published_completions = set()
+    st.session_state.scheduled_run_id = None
+    st.session_state.agent_step_positions = {} # agent_id -> last internal step reached, kept across navigation
+    st.session_state.pending_resume_run_id = None
+    st.session_state.runs_admin_cursors = [None] # Keyset cursor of each visited page in the admin run list
+
+def reset_workflow_state():
+    """
+    Starts a fresh run while keeping the current user logged in.
+    """
+    initialize_session_state(st.session_state.logged_in_user_role, st.session_state.logged_in_username)
+
+def ensure_session_state(user_role=None):
+    """
+    Initializes a new browser session once. On the login front end a run ID in the URL is queued
+    for resuming once the user is known, and a session ticket in the URL is exchanged for the
+    session token, so a reconnecting browser skips the login page.
+    """
+    if 'current_phase_index' in st.session_state:
+        return
+    initialize_session_state(user_role)
+    if user_role is None:
+        st.session_state.pending_resume_run_id = st.query_params.get('run')
+        session_token = redeem_session_ticket(st.query_params.get('ticket'))
+        session_user = verify_session_token(session_token, get_session_secret()) if session_token else None
+        if session_user and log_in(session_user['username'], session_token):
+            publish_session_ticket()
+        elif 'ticket' in st.query_params:
+            del st.query_params['ticket']
+
+def log_in(username, session_token):
+    """
+    Logs this session in as `username` with its current role from the user store.
+    Returns False if the user no longer exists.
+    """
+    user = get_auth_backend().get_user(username)
+    if user is None:
+        return False
+    st.session_state.is_authenticated = True
+    st.session_state.logged_in_user_role = user['role']
+    st.session_state.logged_in_username = username
+    st.session_state.session_token = session_token
+    return True
+
+def publish_session_ticket():
+    """
+    Puts a fresh one-time ticket for this session's token in the URL, replacing the previous one.
+    """
+    if st.session_state.session_ticket:
+        discard_session_ticket(st.session_state.session_ticket)
+    st.session_state.session_ticket = issue_session_ticket(st.session_state.session_token)
+    st.session_state.session_ticket_issued_at = time.time()
+    st.query_params['ticket'] = st.session_state.session_ticket
+
+def refresh_login():
+    """
+    Re-checks a logged-in session on every rerun: a revoked or expired token, or a user removed
+    from the user store, logs it out, and role changes in the store apply immediately. The URL's
+    ticket is renewed halfway through its lifetime, so a browser reconnecting within
+    SESSION_TICKET_TTL_SECONDS of its last activity stays logged in.
+    """
+    if not st.session_state.is_authenticated or st.session_state.session_token is None:
+        return
+    session_user = verify_session_token(st.session_state.session_token, get_session_secret())
+    if session_user is None or not log_in(session_user['username'], st.session_state.session_token):
+        log_out()
+        return
+    if time.time() - st.session_state.session_ticket_issued_at > SESSION_TICKET_TTL_SECONDS / 2:
+        publish_session_ticket()
+
+def log_out():
+    """
+    Revokes this session's token on every replica and resets the session to the login page.
+    """
+    if st.session_state.session_ticket:
+        discard_session_ticket(st.session_state.session_ticket)
+    if st.session_state.session_token:
+        revoke_session_token(st.session_state.session_token, get_session_secret())
+    initialize_session_state()
+    st.query_params.clear() # Drop the session ticket and run ID from the URL
+
+# --- Checkpoint & Resume ---
+def resume_run(run_id):
+    """
+    Restores a checkpointed run into this session. Logged-in users can resume the runs they own;
+    admins can resume any run. Returns an error message, or None on success.
+    """
+    username = st.session_state.logged_in_username
+    if username is None:
+        return "Log in to resume a run."
+    checkpoint = load_checkpoint(run_id)
+    if checkpoint is None:
+        return f"No checkpoint found for run '{run_id}'."
+    if checkpoint['owner'] != username and st.session_state.logged_in_user_role != 'admin':
+        return f"Run '{run_id}' belongs to another user."
+    restore_session_state(st.session_state, checkpoint)
+    get_agent_pipeline().restore(run_id) # Completions published before a restart are replayed from the bus
+    st.query_params['run'] = run_id
+    return None
+
+def apply_pending_resume():
+    """
+    Resumes the run queued by ensure_session_state. Returns an error message, or None.
+    """
+    run_id = st.session_state.pending_resume_run_id
+    st.session_state.pending_resume_run_id = None
+    return resume_run(run_id) if run_id else None
+
+def start_new_run(name):
+    """
+    Starts a fresh, named run for the logged-in user. The previous run stays checkpointed.
+    """
+    reset_workflow_state()
+    register_run(st.session_state.run_id, name, owner=st.session_state.logged_in_username)
+    st.query_params['run'] = st.session_state.run_id
+
+def checkpoint_run():
+    """
+    Checkpoints the workflow after every interaction so it survives logout, new sessions and
+    restarts, and keeps the run index and (for logged-in users) the run ID in the URL up to date.
+    """
+    owner = st.session_state.logged_in_username
+    save_checkpoint(st.session_state.run_id, snapshot_session_state(st.session_state), owner=owner)
+    update_run_progress(st.session_state.run_id, st.session_state.current_phase_index,
+                        len(st.session_state.completed_phases_outputs), owner=owner)
+    if owner is not None and st.query_params.get('run') != st.session_state.run_id:
+        st.query_params['run'] = st.session_state.run_id
+
+# --- Navigation ---
+def open_agent_detail(agent_id):
+    """
+    Opens an agent's detail view at the step it was last left on, instead of restarting it.
+    """
+    agent = current_plan()['agents'][agent_id]
+    st.session_state.agent_detailed_view = agent_id
+    st.session_state.current_agent_step_index = st.session_state.agent_step_positions.get(agent_id, 0)
+    llm_output = st.session_state.get(llm_output_key(agent))
+    st.session_state.last_agent_output_for_phase_completion = \
+        llm_output if st.session_state.current_agent_step_index > agent.get('llm_step_index', 0) else None
+    st.session_state.current_view = 'agent_detail'
@@ -0,0 +1,381 @@
+import argparse
+import base64
+import hmac
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agent_bus import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+# --- Shared State Settings ---
+# State every replica must agree on (session signing secret and revoked sessions, run checkpoints,
+# artifacts and the run index, LLM cost totals behind the role budgets, the bulk prompt cache) lives
+# behind SharedStateBackend: versioned keys with optimistic concurrency. User accounts, output
+# history and bulk backlog progress are still per-host SQLite files, and LLM and backlog jobs run
+# on the replica that started them: there is no shared job queue.
+# SDLC_STATE_BACKEND selects SQLite (unset) or a networked store (http://host:port);
+# `python shared_state.py serve` runs a local stand-in for the networked one, and
+# `python shared_state.py check` exercises the HTTP client against it. The networked store
+# only answers requests carrying SDLC_STATE_TOKEN, a secret shared by the replicas and the store.
+SHARED_STATE_DB_PATH = os.path.join(STATE_DIR, 'shared_state.db')
+MAX_UPDATE_RETRIES = 10 # Optimistic read-modify-write attempts before giving up
+HTTP_TIMEOUT_SECONDS = 5.0
+
+class VersionConflictError(Exception):
+    """Raised when a write's expected version does not match the stored one."""
+
+def state_key(namespace, *parts):
+    """
+    The one key format every replica uses: 'namespace/part/part'. Parts may not contain '/'.
+    """
+    for part in (namespace,) + parts:
+        if not str(part) or '/' in str(part):
+            raise ValueError(f"Invalid shared state key part {part!r}")
+    return "/".join(str(part) for part in (namespace,) + parts)
+
+# --- Backend Interface ---
+class SharedStateBackend:
+    """
+    Interface every shared state backend provides. Values are bytes; version 0 means absent.
+    `put` with expected_version=None overwrites, 0 creates only, N replaces only version N.
+    """
+    networked = False # True when the state lives outside this host's filesystem
+
+    def get(self, key):
+        """Returns (value, version), or (None, 0) for a missing or expired key."""
+        raise NotImplementedError
+
+    def put(self, key, value, expected_version=None, ttl=None):
+        """Writes a value and returns its new version; raises VersionConflictError on a mismatch."""
+        raise NotImplementedError
+
+    def delete(self, key, expected_version=None):
+        raise NotImplementedError
+
+    def stats(self, prefix):
+        """Returns {'keys', 'bytes'} for live keys starting with `prefix`."""
+        raise NotImplementedError
+
+    def scan(self, prefix, start_after=None, limit=None):
+        """Returns [(key, value, version)] for live keys starting with `prefix`, in key order after `start_after`."""
+        raise NotImplementedError
+
+    def update(self, key, fn, ttl=None, retries=MAX_UPDATE_RETRIES):
+        """
+        Optimistic read-modify-write: stores fn(current value or None), retrying on conflicts.
+        Returns (new value, new version).
+        """
+        for _ in range(retries):
+            value, version = self.get(key)
+            new_value = fn(value)
+            try:
+                return new_value, self.put(key, new_value, expected_version=version, ttl=ttl)
+            except VersionConflictError:
+                continue
+        raise VersionConflictError(f"Gave up updating {key} after {retries} conflicting writes")
+
+    def close(self):
+        pass
+
+class SQLiteStateBackend(SharedStateBackend):
+    """
+    Shared state in one SQLite file. Every operation is a single transaction, so concurrent
+    processes on the same file see consistent versions.
+    """
+
+    def __init__(self, path=SHARED_STATE_DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL
+            )""")
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._connection, time.time())
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _current(connection, key, now):
+        row = connection.execute("SELECT value, version, expires_at FROM state WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[2] is not None and row[2] <= now):
+            return None, 0
+        return row[0], row[1]
+
+    def get(self, key):
+        with self._lock:
+            value, version = self._current(self._connection, key, time.time())
+        return (bytes(value) if value is not None else None), version
+
+    def put(self, key, value, expected_version=None, ttl=None):
+        def write(connection, now):
+            _, version = self._current(connection, key, now)
+            if expected_version is not None and expected_version != version:
+                raise VersionConflictError(f"{key} is at version {version}, not {expected_version}")
+            connection.execute(
+                "INSERT INTO state (key, value, version, updated_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = excluded.version, "
+                "updated_at = excluded.updated_at, expires_at = excluded.expires_at",
+                (key, value, version + 1, now, now + ttl if ttl else None))
+            return version + 1
+        return self._transaction(write)
+
+    def delete(self, key, expected_version=None):
+        def remove(connection, now):
+            _, version = self._current(connection, key, now)
+            if expected_version is not None and expected_version != version:
+                raise VersionConflictError(f"{key} is at version {version}, not {expected_version}")
+            connection.execute("DELETE FROM state WHERE key = ?", (key,))
+        self._transaction(remove)
+
+    def stats(self, prefix):
+        with self._lock:
+            keys, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM state WHERE key >= ? AND key < ? "
+                "AND (expires_at IS NULL OR expires_at > ?)", (prefix, prefix + "\uffff", time.time())).fetchone()
+        return {'keys': keys, 'bytes': size}
+
+    def scan(self, prefix, start_after=None, limit=None):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, value, version FROM state WHERE key >= ? AND key > ? AND key < ? "
+                "AND (expires_at IS NULL OR expires_at > ?) ORDER BY key LIMIT ?",
+                (prefix, start_after or "", prefix + "\uffff", time.time(), -1 if limit is None else limit)).fetchall()
+        return [(key, bytes(value), version) for key, value, version in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+# --- Networked Backend ---
+def _encode_bytes(value):
+    return base64.b64encode(value).decode('ascii') if value is not None else None
+
+def _decode_bytes(value):
+    return base64.b64decode(value) if value is not None else None
+
+class HTTPStateBackend(SharedStateBackend):
+    """
+    Client for a shared state service speaking JSON over HTTP (POST /<operation>), authenticated
+    with a bearer token; a 409 response is a version conflict. Compatible with the stand-in from
+    `serve_state_backend`.
+    """
+    networked = True
+
+    def __init__(self, base_url, token, timeout=HTTP_TIMEOUT_SECONDS):
+        if not token:
+            raise ValueError("A networked shared state store needs an access token (SDLC_STATE_TOKEN)")
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+
+    def _call(self, operation, **body):
+        request = urllib.request.Request(f"{self.base_url}/{operation}", data=json.dumps(body).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json', 'Authorization': f"Bearer {self.token}"},
+                                         method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 409:
+                raise VersionConflictError(json.loads(e.read()).get('error', 'version conflict'))
+            raise
+
+    def get(self, key):
+        result = self._call('get', key=key)
+        return _decode_bytes(result['value']), result['version']
+
+    def put(self, key, value, expected_version=None, ttl=None):
+        return self._call('put', key=key, value=_encode_bytes(value), expected_version=expected_version, ttl=ttl)['version']
+
+    def delete(self, key, expected_version=None):
+        self._call('delete', key=key, expected_version=expected_version)
+
+    def stats(self, prefix):
+        return self._call('stats', prefix=prefix)
+
+    def scan(self, prefix, start_after=None, limit=None):
+        return [(key, _decode_bytes(value), version)
+                for key, value, version in self._call('scan', prefix=prefix, start_after=start_after, limit=limit)['items']]
+
+def _dispatch(backend, operation, body):
+    if operation == 'get':
+        value, version = backend.get(body['key'])
+        return {'value': _encode_bytes(value), 'version': version}
+    if operation == 'put':
+        return {'version': backend.put(body['key'], _decode_bytes(body['value']), body.get('expected_version'), body.get('ttl'))}
+    if operation == 'delete':
+        backend.delete(body['key'], body.get('expected_version'))
+        return {}
+    if operation == 'stats':
+        return backend.stats(body['prefix'])
+    if operation == 'scan':
+        return {'items': [(key, _encode_bytes(value), version)
+                          for key, value, version in backend.scan(body['prefix'], body.get('start_after'), body.get('limit'))]}
+    raise KeyError(operation)
+
+def serve_state_backend(backend, token, host='127.0.0.1', port=0):
+    """
+    Serves `backend` over HTTP on a daemon thread and returns the server; its URL is
+    f"http://{host}:{server.server_address[1]}". A local stand-in for a networked store.
+    Requests without `token` as their bearer token are refused.
+    """
+    if not token:
+        raise ValueError("The shared state server needs an access token (SDLC_STATE_TOKEN)")
+    expected_authorization = f"Bearer {token}".encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not hmac.compare_digest(self.headers.get('Authorization', '').encode('utf-8'), expected_authorization):
+                self._respond(401, {'error': "Missing or invalid access token"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+                status, result = 200, _dispatch(backend, self.path.strip('/'), body)
+            except VersionConflictError as e:
+                status, result = 409, {'error': str(e)}
+            except KeyError as e:
+                status, result = 404, {'error': f"Unknown operation or field {e}"}
+            except (ValueError, TypeError, AttributeError) as e: # Malformed JSON, fields or base64
+                status, result = 400, {'error': f"Malformed request: {e}"}
+            except Exception as e:
+                logger.exception("Shared state request %s failed", self.path)
+                status, result = 500, {'error': f"Backend error: {e}"}
+            self._respond(status, result)
+
+        def _respond(self, status, result):
+            payload = json.dumps(result).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass # Request logging would dominate the output of a load test
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="shared-state-server", daemon=True).start()
+    return server
+
+# --- Active Backend ---
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_state_backend():
+    """
+    The process-wide backend selected by SDLC_STATE_BACKEND.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = os.environ.get('SDLC_STATE_BACKEND', '')
+            if url.startswith(('http://', 'https://')):
+                _backend = HTTPStateBackend(url, os.environ.get('SDLC_STATE_TOKEN', ''))
+            else:
+                _backend = SQLiteStateBackend()
+        return _backend
+
+def set_state_backend(backend):
+    """
+    Replaces the process-wide backend (None re-reads SDLC_STATE_BACKEND on next use).
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+# --- Stand-in Check ---
+def check_http_backend(db_path):
+    """
+    Drives HTTPStateBackend through every operation against a stand-in server on `db_path`, as a
+    second replica would. Raises AssertionError on the first mismatch; returns the checks passed.
+    """
+    token = secrets.token_urlsafe(16)
+    server = serve_state_backend(SQLiteStateBackend(db_path), token)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    replica_a, replica_b = HTTPStateBackend(url, token), HTTPStateBackend(url, token)
+    checks = []
+    try:
+        key = state_key('check', 'counter')
+        assert replica_a.get(key) == (None, 0)
+        assert replica_a.put(key, b"1", expected_version=0) == 1
+        assert replica_b.get(key) == (b"1", 1)
+        checks.append("put on one replica is read by another")
+        try:
+            replica_b.put(key, b"2", expected_version=0)
+            raise AssertionError("create-only put overwrote an existing key")
+        except VersionConflictError:
+            checks.append("conflicting write raises VersionConflictError")
+        threads = [threading.Thread(target=replica.update, args=(key, lambda value: str(int(value) + 1).encode()))
+                   for replica in (replica_a, replica_b) * 5]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert replica_a.get(key)[0] == b"11"
+        checks.append("concurrent updates from two replicas lose nothing")
+        for part in ('a', 'b', 'c'):
+            replica_a.put(state_key('check', 'scan', part), part.encode())
+        assert [item[0] for item in replica_b.scan('check/scan/', start_after='check/scan/a')] == ['check/scan/b', 'check/scan/c']
+        assert replica_b.stats('check/scan/')['keys'] == 3
+        checks.append("scan and stats see every key")
+        replica_a.put(state_key('check', 'ttl'), b"x", ttl=0.2)
+        time.sleep(0.3)
+        assert replica_b.get(state_key('check', 'ttl')) == (None, 0)
+        checks.append("expired keys disappear")
+        replica_b.delete(key)
+        assert replica_a.get(key) == (None, 0)
+        checks.append("delete")
+        try:
+            HTTPStateBackend(url, token + "x").get(key)
+            raise AssertionError("a wrong token was accepted")
+        except urllib.error.HTTPError as e:
+            assert e.code == 401
+        checks.append("wrong token is refused")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return checks
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the shared state stand-in server for multi-replica testing, "
+                                                 "or check the HTTP client against it.")
+    parser.add_argument('mode', choices=['serve', 'check'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default=SHARED_STATE_DB_PATH)
+    parser.add_argument('--token', default=os.environ.get('SDLC_STATE_TOKEN', ''), help="Access token (default: SDLC_STATE_TOKEN)")
+    args = parser.parse_args()
+    if args.mode == 'check':
+        with tempfile.TemporaryDirectory() as check_dir:
+            for check in check_http_backend(os.path.join(check_dir, 'check.db')):
+                print(f"ok  {check}")
+    else:
+        state_server = serve_state_backend(SQLiteStateBackend(args.db), args.token, args.host, args.port)
+        print(f"Shared state stand-in serving {args.db} on http://{args.host}:{state_server.server_address[1]}")
+        threading.Event().wait()
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_WORKERS = 1 # Speculation never takes more than one thread away from real work
+DEFAULT_RUN_BUDGET = 6 # Speculative LLM calls allowed per run; unused guesses still cost tokens
+DEFAULT_CACHE_SIZE = 64 # Speculated responses kept, least recently used evicted first
+MAX_TRACKED_RUNS = 256
+
+def prompt_key(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+class SpeculativePrefetcher:
+    """
+    Generates the likely next LLM calls in the background before anyone asks for them.
+    Responses are keyed by the exact prompt, so a speculation is only ever used when the real
+    call would have sent the same prompt. Speculating again for the same (run, agent) with a
+    different prompt means its inputs changed, and the stale speculation is cancelled.
+    """
+
+    def __init__(self, generate, max_workers=DEFAULT_PREFETCH_WORKERS, run_budget=DEFAULT_RUN_BUDGET,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        self._generate = generate
+        self.run_budget = run_budget
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-prefetch")
+        self._lock = threading.Lock()
+        self._futures = OrderedDict() # prompt key -> Future
+        self._slots = {} # (run_id, agent_id) -> prompt key speculated for it
+        self._spent = OrderedDict() # run_id -> speculative calls submitted
+        self.stats = {'submitted': 0, 'hits': 0, 'cancelled': 0, 'over_budget': 0}
+
+    def _generate_logged(self, prompt, call_kwargs):
+        try:
+            return self._generate(prompt, **call_kwargs)
+        except Exception:
+            logger.exception("Speculative LLM call failed")
+            raise
+
+    def _drop_locked(self, key):
+        future = self._futures.pop(key, None)
+        if future is not None and future.cancel():
+            self.stats['cancelled'] += 1
+
+    def speculate(self, run_id, agent_id, prompt, call_kwargs=None):
+        """
+        Queues `generate(prompt, **call_kwargs)` for `agent_id` in `run_id` unless it is already
+        cached or the run's speculation budget is spent. Returns True if a new call was queued.
+        """
+        key = prompt_key(prompt)
+        with self._lock:
+            previous = self._slots.get((run_id, agent_id))
+            if previous is not None and previous != key:
+                self._drop_locked(previous) # Inputs changed; a queued call is cancelled, a running one discarded
+            self._slots[(run_id, agent_id)] = key
+            if key in self._futures:
+                self._futures.move_to_end(key)
+                return False
+            if self._spent.get(run_id, 0) >= self.run_budget:
+                self.stats['over_budget'] += 1
+                return False
+            self._spent[run_id] = self._spent.get(run_id, 0) + 1
+            self._spent.move_to_end(run_id)
+            if len(self._spent) > MAX_TRACKED_RUNS:
+                stale_run_id, _ = self._spent.popitem(last=False)
+                self._slots = {slot: k for slot, k in self._slots.items() if slot[0] != stale_run_id}
+            self._futures[key] = self._executor.submit(self._generate_logged, prompt, call_kwargs or {})
+            self.stats['submitted'] += 1
+            while len(self._futures) > self.cache_size:
+                self._drop_locked(next(iter(self._futures)))
+        return True
+
+    def take(self, prompt, timeout=None):
+        """
+        Returns the speculated response for exactly this prompt, waiting up to `timeout` seconds
+        if it is still being generated. A speculation still waiting in the queue is cancelled instead.
+        Returns None when there is no usable speculation.
+        """
+        key = prompt_key(prompt)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and future.cancel(): # Still queued: calling directly is faster than waiting
+                del self._futures[key]
+                self.stats['cancelled'] += 1
+                return None
+        if future is None:
+            return None
+        try:
+            response = future.result(timeout)
+        except Exception: # Cancelled, timed out or failed: the caller makes the call itself
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return response
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
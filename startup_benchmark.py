@@ -0,0 +1,77 @@
+"""
+Startup import benchmark for the SDLC prototype.
+
+Imports every module in a fresh interpreter (as a new container would) and reports:
+  cold        - seconds to import the module with nothing preloaded
+  incremental - seconds on top of what a cold start of new.py already loads (BASELINE_MODULES)
+
+Usage: python startup_benchmark.py [--repeat N] [module ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What new.py imports before the first view is rendered
+BASELINE_MODULES = ['streamlit', 'sdlc_core.state', 'sdlc_core.engine', 'views']
+
+DEFAULT_MODULES = [
+    'streamlit',
+    'sdlc_core.registry',
+    'sdlc_core.state',
+    'sdlc_core.engine',
+    'views.login',
+    'views.agent_overview',
+    'views.agent_detail',
+    'views.dashboard',
+    'views.runs_admin',
+    'log_analysis',
+    'finops_engine',
+    'numpy',
+    'pandas',
+]
+
+_CHILD = """
+import importlib, sys, time
+for name in sys.argv[2:]:
+    importlib.import_module(name)
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - started)
+"""
+
+def time_import(module, preload=(), repeat=3):
+    """
+    Median seconds to import `module` in a fresh interpreter after importing `preload`.
+    """
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', _CHILD, module, *preload], cwd=APP_DIR,
+                                capture_output=True, text=True, check=True)
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def run_benchmark(modules=DEFAULT_MODULES, repeat=3):
+    rows = []
+    for module in modules:
+        cold = time_import(module, repeat=repeat)
+        incremental = 0.0 if module in BASELINE_MODULES else time_import(module, BASELINE_MODULES, repeat=repeat)
+        rows.append({'module': module, 'cold': cold, 'incremental': incremental})
+    return rows
+
+def format_report(rows):
+    width = max(len(row['module']) for row in rows)
+    lines = [f"{'module'.ljust(width)}  {'cold (s)':>9}  {'incremental (s)':>15}"]
+    for row in rows:
+        lines.append(f"{row['module'].ljust(width)}  {row['cold']:9.3f}  {row['incremental']:15.3f}")
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report import time per module of the SDLC prototype.")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters per measurement (median is reported)")
+    args = parser.parse_args()
+    print(format_report(run_benchmark(args.modules, args.repeat)))
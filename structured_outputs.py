@@ -0,0 +1,306 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from artifact_store import ARTIFACT_MIN_CHARS, artifact_digest # Parsed forms are keyed by the raw text's digest
+from shared_state import get_state_backend, state_key # Parsed forms cached next to the raw artifacts
+
+# --- Output Schemas ---
+# Fields each llm_feature's output is parsed into: field -> (kind, labels, required). 'text' fields
+# hold one string, 'list' fields a list of strings, 'code' fields a list of [language, code] pairs.
+# Labels are the headings that introduce the field in the free-text form of an output.
+OUTPUT_SCHEMAS = {
+    'trd_generation': {
+        'system_requirements': ('list', ('System Requirement',), True),
+        'functional_requirements': ('list', ('Functional Requirement',), True),
+        'process_flow': ('list', ('Process Flow', 'Flow'), True),
+    },
+    'sprint_summary': {
+        'sprint_goal': ('text', ('Sprint Goal', 'Goal'), True),
+        'key_deliverables': ('list', ('Key Deliverables', 'Deliverables', 'Tasks'), True),
+    },
+    'arch_pattern_suggestion': {
+        'pattern': ('text', ('Architectural Pattern', 'Pattern'), True),
+        'pros': ('list', ('Pros',), True),
+        'cons': ('list', ('Cons',), True),
+    },
+    'code_generation': {
+        'code_blocks': ('code', (), True),
+    },
+    'test_case_generation': {
+        'test_cases': ('list', ('Test Cases', 'Test Case'), True),
+        'code_blocks': ('code', (), False), # Executable tests, when the tester wrote any
+    },
+    'deployment_suggestion': {
+        'strategy': ('text', ('Deployment Strategy', 'Strategy'), True),
+        'pros': ('list', ('Pros',), True),
+        'cons': ('list', ('Cons',), True),
+    },
+    'rca_assistant': {
+        'root_causes': ('list', ('Root Causes', 'Root Cause'), True),
+        'diagnostic_steps': ('list', ('Diagnostic Steps', 'Diagnostic'), True),
+    },
+    'eval_rationale': {
+        'rationale': ('text', ('Rationale',), True),
+    },
+    'simulated_retrieval': {
+        'retrieval': ('text', ('Memory Agent Retrieval', 'Retrieval'), True),
+    },
+    'finops_rationale': {
+        'rationale': ('text', ('Rationale',), True),
+    },
+}
+SCHEMA_VERSION = 1 # Bump when schemas or the parser change, so cached parses are not reused
+JSON_MODE_MARKER = "Respond only with a JSON object"
+PARSED_CACHE_SIZE = 1024
+
+_CODE_FENCE = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*\n(.*?)\n?```\s*$", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+")
+_INLINE_SEPARATOR = re.compile(r"\s*,\s*(?:and\s+)?")
+_EMPHASIS = "*_ \t"
+
+def _label_pattern(labels):
+    # A heading line: optional emphasis/prefix words, the label, an optional qualifier, then a colon
+    alternatives = "|".join(re.escape(label) for label in sorted(labels, key=len, reverse=True))
+    return re.compile(rf"^[^\w\n]*(?:[\w'-]+\s+)*?(?:{alternatives})s?\b[^:\n]{{0,60}}:[*_\s]*(.*)$", re.IGNORECASE)
+
+# One compiled heading pattern per (feature, field), built once at import
+_LABEL_PATTERNS = {feature: [(field, _label_pattern(labels)) for field, (kind, labels, _) in schema.items() if labels]
+                   for feature, schema in OUTPUT_SCHEMAS.items()}
+
+def extract_code_blocks(text):
+    """
+    Returns a list of (language, code) tuples for every fenced code block in `text`.
+    """
+    return [(lang.lower() or 'python', code) for lang, code in _CODE_FENCE.findall(text)]
+
+# --- JSON Mode ---
+def json_mode_instruction(feature):
+    """
+    The instruction asking the model for the feature's schema as a JSON object, or "" without a schema.
+    """
+    schema = OUTPUT_SCHEMAS.get(feature)
+    if not schema:
+        return ""
+    kinds = {'text': "string", 'list': "array of strings", 'code': 'array of {"language", "code"} objects'}
+    keys = ", ".join(f'"{field}" ({kinds[kind]})' for field, (kind, _, _) in schema.items())
+    return f"{JSON_MODE_MARKER} with these keys: {keys}. Do not add any other text."
+
+def with_json_mode(prompt, feature):
+    instruction = json_mode_instruction(feature)
+    return f"{prompt}\n\n{instruction}" if instruction else prompt
+
+def simulate_json_mode(prompt, text):
+    """
+    Answers a JSON-mode prompt the way a model honouring it would: the schema's fields as JSON.
+    Text the schema finds nothing in (an echo, an error) is returned unchanged.
+    """
+    if JSON_MODE_MARKER not in prompt:
+        return text
+    feature = next((feature for feature in OUTPUT_SCHEMAS if json_mode_instruction(feature) in prompt), None)
+    if feature is None:
+        return text
+    parsed = parse_structured_output(feature, text)
+    if not parsed['filled']:
+        return text
+    fields = dict(parsed['fields'])
+    for field, (kind, _, _) in OUTPUT_SCHEMAS[feature].items():
+        if kind == 'code':
+            fields[field] = [{'language': language, 'code': code} for language, code in fields[field]]
+    return json.dumps(fields, ensure_ascii=False)
+
+# --- Tolerant Parser ---
+def _load_json_object(text):
+    """
+    The JSON object in `text` (optionally fenced, trailing commas allowed), or None.
+    """
+    candidate = text.strip()
+    fenced = _JSON_FENCE.match(candidate)
+    if fenced:
+        candidate = fenced.group(1).strip()
+    if not candidate.startswith('{'):
+        return None
+    candidate = candidate[:candidate.rfind('}') + 1]
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            value = json.loads(attempt)
+        except ValueError:
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+def _split_inline(text):
+    text = text.strip().strip(_EMPHASIS)
+    if "->" in text:
+        parts = text.split("->")
+    elif ";" in text:
+        parts = text.split(";")
+    else:
+        parts = _INLINE_SEPARATOR.split(text)
+    return [part.strip().rstrip('.').strip() for part in parts if part.strip().rstrip('.').strip()]
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return _split_inline(value) if value.strip() else []
+    if isinstance(value, dict):
+        return [f"{key}: {item}" for key, item in value.items()]
+    return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in value]
+
+def _as_code(value):
+    if isinstance(value, str):
+        return [list(block) for block in extract_code_blocks(value)] or ([['python', value]] if value.strip() else [])
+    blocks = []
+    for block in value or []:
+        if isinstance(block, dict):
+            blocks.append([str(block.get('language') or 'python').lower(), str(block.get('code', ""))])
+        elif isinstance(block, str):
+            blocks.extend(_as_code(block))
+    return blocks
+
+def _normalize_key(key):
+    return re.sub(r"[^a-z0-9]+", "_", str(key).lower()).strip('_')
+
+def _fields_from_json(feature, data):
+    schema = OUTPUT_SCHEMAS[feature]
+    aliases = {}
+    for field, (_, labels, _) in schema.items():
+        for alias in (field,) + labels:
+            aliases[_normalize_key(alias)] = field
+    values = {}
+    for key, value in data.items():
+        field = aliases.get(_normalize_key(key)) or aliases.get(_normalize_key(key).rstrip('s'))
+        if field is not None and field not in values:
+            values[field] = value
+    fields = {}
+    for field, (kind, _, _) in schema.items():
+        value = values.get(field)
+        if kind == 'code':
+            fields[field] = _as_code(value)
+        elif kind == 'list':
+            fields[field] = _as_list(value)
+        else:
+            fields[field] = "; ".join(map(str, value)) if isinstance(value, list) else str(value or "").strip()
+    return fields
+
+def _fields_from_text(feature, text):
+    """
+    One pass over the lines: a heading line starts its field (with any text after the colon),
+    following lines belong to it until the next heading. Fenced code is taken out first.
+    """
+    schema = OUTPUT_SCHEMAS[feature]
+    collected = {field: [] for field in schema}
+    current = None
+    for line in _CODE_FENCE.sub("", text).splitlines():
+        for field, pattern in _LABEL_PATTERNS[feature]:
+            heading = pattern.match(line)
+            if heading:
+                current = field
+                line = heading.group(1)
+                break
+        line = line.strip().strip(_EMPHASIS)
+        if current is not None and line:
+            collected[current].append(line)
+    fields = {}
+    for field, (kind, _, _) in schema.items():
+        lines = collected[field]
+        if kind == 'code':
+            fields[field] = [list(block) for block in extract_code_blocks(text)]
+        elif kind == 'list':
+            items = [_LIST_MARKER.sub("", line).strip() for line in lines]
+            fields[field] = _split_inline(items[0]) if len(items) == 1 else items
+        else:
+            fields[field] = " ".join(lines)
+    text_fields = [field for field, (kind, _, _) in schema.items() if kind == 'text']
+    if not any(collected.values()) and text_fields and text.strip():
+        fields[text_fields[0]] = text.strip() # Unlabelled prose is the feature's main text field
+    return fields
+
+def parse_structured_output(feature, text):
+    """
+    Parses an output into its feature's schema, from JSON mode if the output is a JSON object and
+    from labelled sections of free text otherwise. Returns {'format', 'fields', 'filled', 'required'},
+    where 'filled' counts required fields that have a value.
+    """
+    data = _load_json_object(text)
+    fields = _fields_from_json(feature, data) if data is not None else _fields_from_text(feature, text)
+    required = [field for field, (_, _, is_required) in OUTPUT_SCHEMAS[feature].items() if is_required]
+    return {'format': 'json' if data is not None else 'text', 'fields': fields,
+            'filled': sum(1 for field in required if fields[field]), 'required': len(required)}
+
+# --- Cache ---
+_lock = threading.Lock()
+_parsed = OrderedDict() # (feature, digest) -> parsed output, LRU
+_stats = {'parses': 0, 'memory_hits': 0, 'store_hits': 0}
+
+def structured_output(feature, text):
+    """
+    The parsed form of an output, parsed once per distinct text: held in memory, and for outputs
+    large enough to be stored as artifacts, in the shared state store next to the raw text so
+    other replicas and later sessions skip the parse too. None for features without a schema.
+    """
+    if feature not in OUTPUT_SCHEMAS or not isinstance(text, str):
+        return None
+    digest = artifact_digest(text)
+    key = (feature, digest)
+    with _lock:
+        parsed = _parsed.get(key)
+        if parsed is not None:
+            _parsed.move_to_end(key)
+            _stats['memory_hits'] += 1
+            return parsed
+    persist = len(text) >= ARTIFACT_MIN_CHARS
+    store_key = state_key('parsed', f"v{SCHEMA_VERSION}", feature, digest)
+    stored = get_state_backend().get(store_key)[0] if persist else None
+    if stored is not None:
+        parsed = json.loads(stored)
+        counter = 'store_hits'
+    else:
+        parsed = parse_structured_output(feature, text)
+        counter = 'parses'
+        if persist:
+            get_state_backend().put(store_key, json.dumps(parsed, separators=(',', ':')).encode('utf-8'))
+    with _lock:
+        _stats[counter] += 1
+        _parsed[key] = parsed
+        if len(_parsed) > PARSED_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return parsed
+
+def structured_output_stats():
+    with _lock:
+        return {'cached': len(_parsed), **_stats}
+
+# --- Rendering ---
+def format_structured_fields(feature, fields):
+    """
+    Readable text for parsed fields: a labelled line or list per field, code as fenced blocks.
+    """
+    lines = []
+    for field, (kind, labels, _) in OUTPUT_SCHEMAS[feature].items():
+        value = fields.get(field)
+        if not value:
+            continue
+        label = labels[0] if labels else field.replace('_', ' ').title()
+        if kind == 'code':
+            lines.extend(f"```{language}\n{code.rstrip()}\n```" for language, code in value)
+        elif kind == 'list':
+            lines.append(f"{label}:")
+            lines.extend(f"{number}. {item}" for number, item in enumerate(value, start=1))
+        else:
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
+
+def readable_output(feature, text):
+    """
+    An output as people (and downstream prompts) should see it: JSON-mode outputs rendered from
+    their parsed fields, free text unchanged.
+    """
+    parsed = structured_output(feature, text)
+    if parsed is None or parsed['format'] != 'json':
+        return text
+    return format_structured_fields(feature, parsed['fields'])
@@ -0,0 +1,114 @@
+import functools
+import hashlib
+import html
+import os
+
+# --- Static Assets ---
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_URL_PREFIX = 'app/static' # Where Streamlit serves STATIC_DIR when server.enableStaticServing is on
+THEME_STYLESHEET = 'sdlc_theme.css'
+
+@functools.lru_cache(maxsize=None)
+def load_stylesheet(name=THEME_STYLESHEET):
+    with open(os.path.join(STATIC_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+@functools.lru_cache(maxsize=None)
+def stylesheet_tag(name=THEME_STYLESHEET, static_serving=True):
+    """
+    Returns the tag that applies a stylesheet, built once per process. With static serving the
+    browser fetches (and caches) the file itself, so each rerun only sends a short <link>;
+    the content hash in the URL busts the browser cache when the stylesheet changes.
+    Without static serving the stylesheet is inlined.
+    """
+    css = load_stylesheet(name)
+    if static_serving:
+        version = hashlib.sha1(css.encode('utf-8')).hexdigest()[:10]
+        return f'<link rel="stylesheet" href="{STATIC_URL_PREFIX}/{name}?v={version}">'
+    return f"<style>\n{css}</style>"
+
+# --- HTML Templates ---
+# Each template is compiled once per distinct input and then served from the LRU cache.
+_STEP_STYLES = {
+    'completed': ('color: #94a3b8; opacity: 0.7;', '&#10004;'),
+    'current': ('color: #0369a1; font-weight: bold;', '&#9679;'),
+    'upcoming': ('color: #cbd5e1;', '&#9675;'),
+}
+
+def step_state(index, current_index):
+    if index < current_index:
+        return 'completed'
+    if index == current_index:
+        return 'current'
+    return 'upcoming'
+
+def _progress_row_html(steps, icon_size):
+    """
+    One flex row of progress markers; `steps` is a sequence of (label, state, tooltip).
+    Rendered as a single element instead of one column and markdown element per step.
+    """
+    cells = []
+    for label, state, tooltip in steps:
+        style, icon = _STEP_STYLES[state]
+        label = html.escape(label)
+        if state == 'completed':
+            label = f"<s>{label}</s>"
+        cells.append(f'<div style="flex: 1; text-align: center; {style}" title="{html.escape(tooltip)}">'
+                     f'<span style="font-size: {icon_size};">{icon}</span><br><small>{label}</small></div>')
+    return f'<div style="display: flex; gap: 1rem; align-items: flex-start;">{"".join(cells)}</div>'
+
+@functools.lru_cache(maxsize=1024)
+def agent_breadcrumbs_html(workflow_steps, current_step_index):
+    """
+    Internal workflow breadcrumbs of an agent; `workflow_steps` must be a tuple.
+    """
+    tooltip_prefix = {'completed': 'Completed', 'current': 'Current Step', 'upcoming': 'Upcoming Step'}
+    steps = []
+    for i, step in enumerate(workflow_steps):
+        state = step_state(i, current_step_index)
+        steps.append((step, state, f"{tooltip_prefix[state]}: {step}"))
+    return _progress_row_html(steps, '1.5em')
+
+@functools.lru_cache(maxsize=1024)
+def phase_breadcrumbs_html(phases, current_phase_index):
+    """
+    SDLC flow breadcrumbs; `phases` is a tuple of (name, description, output_summary).
+    Completed phases show the first line of their output as tooltip.
+    """
+    steps = []
+    for i, (name, description, output_summary) in enumerate(phases):
+        state = step_state(i, current_phase_index)
+        if state == 'completed':
+            tooltip = f"Completed: {output_summary}"
+        elif state == 'current':
+            tooltip = f"Current Phase: {description}"
+        else:
+            tooltip = f"Upcoming Phase: {description}"
+        steps.append((name, state, tooltip))
+    return _progress_row_html(steps, '2em')
+
+@functools.lru_cache(maxsize=256)
+def agent_card_html(icon, name, description, tech, llm_feature):
+    return f"""
+            <div class="agent-card">
+                <div class="agent-icon">{icon}</div>
+                <h3 class="agent-name">{name}</h3>
+                <p class="agent-description">{description}</p>
+                <p class="agent-tech"><b>Tech:</b> {tech}</p>
+                <p class="agent-llm-feature"><b>LLM Feature:</b> {llm_feature.replace('_', ' ').title()}</p>
+            </div>
+            """
+
+@functools.lru_cache(maxsize=64)
+def panel_skeleton_html(title):
+    """
+    Placeholder shown in a dashboard panel's slot until its data is ready.
+    """
+    return f"""
+            <div class="panel-skeleton">
+                <h3>{html.escape(title)}</h3>
+                <div class="panel-skeleton-bar" style="width: 60%;"></div>
+                <div class="panel-skeleton-block"></div>
+                <div class="panel-skeleton-bar" style="width: 85%;"></div>
+            </div>
+            """
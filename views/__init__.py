@@ -0,0 +1,38 @@
+"""
+Per-view modules of the SDLC prototype, imported the first time a view is shown so a cold
+start only loads the login page and the dependencies it needs.
+"""
+import importlib
+import time
+
+import streamlit as st
+
+from ui_templates import stylesheet_tag # Precompiled CSS
+
+# view name -> (module, render function)
+VIEWS = {
+    'landing': ('views.login', 'show_landing_page'),
+    'agent_overview': ('views.agent_overview', 'display_agent_cards_overview'),
+    'agent_detail': ('views.agent_detail', 'display_agent_detail'),
+    'dashboard': ('views.dashboard', 'display_dashboard'),
+    'runs_admin': ('views.runs_admin', 'display_runs_admin'),
+}
+
+VIEW_IMPORT_SECONDS = {} # module -> seconds its first import took in this process
+
+def load_view(name):
+    module_name, function_name = VIEWS[name]
+    if module_name not in VIEW_IMPORT_SECONDS:
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        VIEW_IMPORT_SECONDS[module_name] = time.perf_counter() - started
+    return getattr(importlib.import_module(module_name), function_name)
+
+def render_view(name):
+    load_view(name)()
+
+def inject_stylesheet():
+    """
+    Applies the theme stylesheet. It is served from ./static, so reruns only resend a <link>.
+    """
+    st.markdown(stylesheet_tag(static_serving=st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
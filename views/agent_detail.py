@@ -0,0 +1,412 @@
+import os
+import shutil
+import tempfile
+
+import streamlit as st
+
+from context_budget import collect_upstream_outputs # Token-budgeted upstream context
+from evaluator_engine import build_evaluation_items, evaluate_batch, format_evaluation_report # Evaluator batch scoring
+from backlog_processor import BacklogFormatError, backlog_results, export_backlog_csv, parse_backlog, sprint_summaries # Bulk BA/Planner backlog runs
+from cost_ledger import check_budget # Per-role LLM budgets
+from model_router import get_model_router # Cheapest adequate model per request
+from output_versions import get_output_version, list_output_versions, unified_output_diff # Delta-compressed output history
+from sandbox_executor import extract_python_code, run_units, summarize_results # Isolated execution of generated code
+from structured_outputs import readable_output, structured_output # Outputs parsed once into their feature's schema
+from ui_templates import agent_breadcrumbs_html # Precompiled HTML
+from sdlc_core.engine import agent_prompt, prefetched_llm_response, get_backlog_processor, publish_agent_completion, store_agent_output, submit_backlog, submit_llm_job
+from sdlc_core.llm import call_llm_api
+from sdlc_core.registry import current_plan
+from sdlc_core.state import reset_workflow_state
+from views.pipeline_status import display_backlog_progress, display_llm_job_status
+
+# --- Server-Side Files ---
+def resolve_server_file(base_dir, name):
+    """
+    Returns the real path of `name` inside `base_dir`, refusing absolute paths, '..' and
+    symlinks that lead outside it with ValueError.
+    """
+    base = os.path.realpath(base_dir)
+    path = os.path.realpath(os.path.join(base, name))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"'{name}' is outside {base_dir}")
+    return path
+
+# --- UI Components ---
+
+def display_agent_breadcrumbs(agent_id, current_step_index):
+    agent = current_plan()['agents'][agent_id]
+    if not agent.get('workflow_steps'):
+        return
+
+    st.markdown(f"#### {agent['name']} Internal Workflow")
+    st.markdown(agent_breadcrumbs_html(tuple(agent['workflow_steps']), current_step_index), unsafe_allow_html=True)
+    st.markdown("---")
+
+
+def display_agent_detail():
+    if st.session_state.agent_detailed_view:
+        plan = current_plan() # One plan for the whole render, even if the workflow file is reloaded meanwhile
+        agent_data, workflow_data = plan['agents'], plan['phases']
+        agent_id = st.session_state.agent_detailed_view
+        agent = agent_data.get(agent_id)
+        
+        if agent:
+            st.subheader(f"{agent['icon']} {agent['name']} Details")
+            st.markdown(f"**Role:** {agent['description']}")
+            st.markdown(f"**Technology:** {agent['tech']}")
+            
+            # Remember where this agent's workflow is, so navigating away does not lose it
+            st.session_state.agent_step_positions[agent_id] = st.session_state.current_agent_step_index
+
+            # Agent internal breadcrumbs
+            display_agent_breadcrumbs(agent_id, st.session_state.current_agent_step_index)
+
+            # Initialize llm_output_key_for_agent at the beginning of the function
+            llm_output_key_for_agent = f"llm_output_agent_{agent_id}_step_{agent.get('llm_step_index')}"
+
+
+            if agent['receives_input_from']:
+                st.markdown("#### Input Received (from previous agents in the SDLC flow):")
+                for input_agent_name in agent['receives_input_from']:
+                    input_received_content = "No input (or not applicable for this prototype step)."
+                    
+                    # Phase whose output is the input agent's deliverable (indexed when the plan is compiled)
+                    source_phase_id = plan['phase_id_by_agent_name'].get(input_agent_name)
+
+                    if source_phase_id and source_phase_id in st.session_state.completed_phases_outputs:
+                        input_feature = plan['agents'][plan['agent_id_by_name'][input_agent_name]]['llm_feature']
+                        input_received_content = readable_output(input_feature, str(st.session_state.completed_phases_outputs[source_phase_id]))
+                    
+                    if input_received_content != "No input (or not applicable for this prototype step).":
+                         display_summary_content = input_received_content.splitlines()[0] + "..." if "\n" in input_received_content else input_received_content
+                         
+                         # Make the input content clickable to show full output (if applicable)
+                         with st.expander(f"**From {input_agent_name}:** {display_summary_content}", expanded=False):
+                             st.code(input_received_content, language='markdown') # Display full content in an expander
+
+                    else:
+                         st.markdown(f"<p style='color:#64748b; font-size:0.9em;'>From {input_agent_name}: (No relevant output yet from previous phase simulation)</p>", unsafe_allow_html=True)
+
+            # --- LLM Interaction Section ---
+            # Only show LLM interaction part if current_agent_step_index == agent.get('llm_step_index')
+            if st.session_state.current_agent_step_index == agent.get('llm_step_index'):
+                st.markdown("---")
+                st.markdown(f"#### ✨ LLM Interaction: {agent['llm_feature'].replace('_', ' ').title()}")
+                budget_status, budget_spent, budget = check_budget(st.session_state.logged_in_user_role)
+                if budget_status == 'hard':
+                    st.error(f"Your daily LLM budget of ${budget['hard']:.2f} is used up; LLM calls are paused until tomorrow (UTC).")
+                elif budget_status == 'soft':
+                    st.warning(f"LLM spend today is ${budget_spent:.4f}, past your ${budget['soft']:.2f} soft limit.")
+                
+
+                # Ops Engineer Agent: condense service logs into an anomaly summary for the RCA prompt
+                if agent['llm_feature'] == 'rca_assistant':
+                    from log_analysis import LOG_DIR, analyze_log_file, format_anomaly_summary # Pulls in numpy, so only imported for this agent
+                    with st.expander("Analyze Service Logs", expanded=False):
+                        log_path = st.text_input(f"Log file in {LOG_DIR}:", key=f"log_path_agent_{agent_id}") if LOG_DIR else ""
+                        uploaded_log = st.file_uploader("...or upload a log file:", key=f"log_upload_agent_{agent_id}")
+                        if st.button("Analyze Logs", key=f"analyze_logs_agent_{agent_id}", disabled=not (log_path or uploaded_log)):
+                            try:
+                                if uploaded_log is not None:
+                                    with tempfile.NamedTemporaryFile(suffix=".log") as tmp_log:
+                                        shutil.copyfileobj(uploaded_log, tmp_log)
+                                        tmp_log.flush()
+                                        report = analyze_log_file(tmp_log.name)
+                                else:
+                                    report = analyze_log_file(resolve_server_file(LOG_DIR, log_path))
+                                st.session_state.log_anomaly_summary = format_anomaly_summary(report)
+                            except (OSError, ValueError) as e:
+                                st.error(f"Could not read log file: {e}")
+                        if st.session_state.get('log_anomaly_summary'):
+                            st.code(st.session_state.log_anomaly_summary, language='text')
+                            st.caption("This summary (not the raw log) is added to the RCA prompt.")
+
+                # FinOps Agent: derive recommendations from a billing export instead of a single manual prompt
+                if agent['llm_feature'] == 'finops_rationale':
+                    from finops_engine import BILLING_EXPORT_DIR, analyze_billing_export, format_findings_prompt # Pulls in pandas, so only imported for this agent
+                    with st.expander("Analyze Billing Export (CSV/Parquet)", expanded=False):
+                        billing_path = st.text_input(f"Billing export in {BILLING_EXPORT_DIR}:", key=f"billing_path_agent_{agent_id}") if BILLING_EXPORT_DIR else ""
+                        uploaded_billing = st.file_uploader("...or upload a billing export:", type=['csv', 'parquet'], key=f"billing_upload_agent_{agent_id}")
+                        if st.button("Analyze Billing Export", key=f"analyze_billing_agent_{agent_id}", disabled=not (billing_path or uploaded_billing)):
+                            try:
+                                with st.spinner("Aggregating billing export..."):
+                                    if uploaded_billing is not None:
+                                        suffix = os.path.splitext(uploaded_billing.name)[1]
+                                        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp_billing:
+                                            shutil.copyfileobj(uploaded_billing, tmp_billing)
+                                            tmp_billing.flush()
+                                            st.session_state.finops_analysis = analyze_billing_export(tmp_billing.name)
+                                    else:
+                                        st.session_state.finops_analysis = analyze_billing_export(resolve_server_file(BILLING_EXPORT_DIR, billing_path))
+                            except (OSError, ValueError) as e:
+                                st.error(f"Could not analyze billing export: {e}")
+                        if st.session_state.get('finops_analysis'):
+                            analysis = st.session_state.finops_analysis
+                            st.markdown(f"**{analysis['resources']}** resources, total cost **${analysis['total_cost']:,.2f}**, "
+                                        f"estimated savings **${analysis['total_savings']:,.2f}**.")
+                            st.dataframe(analysis['top_findings'], use_container_width=True)
+                            st.caption("Only these top findings are sent to the LLM for the rationale.")
+
+                # BA / Planner Agents: run a whole backlog through TRD generation and sprint planning
+                if agent['llm_feature'] in ('trd_generation', 'sprint_summary'):
+                    with st.expander("Bulk Backlog Processing (CSV/JSON)", expanded=False):
+                        uploaded_backlog = st.file_uploader("Upload a backlog (CSV with a requirement/description/title column, or a JSON list):",
+                                                            type=['csv', 'json'], key=f"backlog_upload_agent_{agent_id}")
+                        col_bulk_start, col_bulk_resume, col_bulk_stop = st.columns(3)
+                        with col_bulk_start:
+                            if st.button("Process Backlog", key=f"backlog_process_agent_{agent_id}", disabled=uploaded_backlog is None or budget_status == 'hard'):
+                                try:
+                                    backlog_items, duplicates = parse_backlog(uploaded_backlog.getvalue(), uploaded_backlog.name)
+                                    submit_backlog(backlog_items)
+                                    st.session_state.backlog_submitted = True
+                                    st.success(f"Queued {len(backlog_items)} items" + (f" ({duplicates} duplicates skipped)." if duplicates else "."))
+                                except BacklogFormatError as e:
+                                    st.error(str(e))
+                        with col_bulk_resume:
+                            if st.button("Resume", key=f"backlog_resume_agent_{agent_id}", disabled=budget_status == 'hard'):
+                                submit_backlog() # Picks up after the last unit written to the run store
+                                st.session_state.backlog_submitted = True
+                        with col_bulk_stop:
+                            if st.button("Stop", key=f"backlog_stop_agent_{agent_id}"):
+                                get_backlog_processor().stop(st.session_state.run_id) # Finished units stay in the run store
+                        if st.session_state.get('backlog_submitted'):
+                            display_backlog_progress()
+                            backlog_page = st.number_input("Results page", min_value=1, value=1, key=f"backlog_page_agent_{agent_id}")
+                            page_results = backlog_results(st.session_state.run_id, offset=(backlog_page - 1) * 50, limit=50)
+                            st.dataframe([{'Item': r['title'], 'Status': r['status'], 'Cached': r['cached'], 'TRD': r['trd'][:200]}
+                                          for r in page_results], use_container_width=True)
+                            for sprint_number, summary in sprint_summaries(st.session_state.run_id):
+                                st.markdown(f"**Sprint {sprint_number}:** {summary}")
+                            if page_results:
+                                st.download_button("Download TRDs (CSV)", export_backlog_csv(st.session_state.run_id),
+                                                   file_name=f"backlog_{st.session_state.run_id[:8]}.csv", mime='text/csv',
+                                                   key=f"backlog_download_agent_{agent_id}")
+
+                # Use a unique key for the input text area based on agent ID and step
+                current_input = st.text_area(plan['prompt_instructions'].get(agent['llm_feature'], "Enter input:"), 
+                                            plan['default_inputs'].get(agent['llm_feature'], ""), 
+                                            key=f"agent_{agent_id}_step_{st.session_state.current_agent_step_index}_input")
+
+
+                if st.button(f"Run {agent['name']} ({agent['llm_feature'].replace('_', ' ').title()})", 
+                             key=f"run_agent_{agent_id}_step_{st.session_state.current_agent_step_index}", disabled=budget_status == 'hard'):
+                    
+                    if agent['llm_feature'] == 'rca_assistant' and st.session_state.get('log_anomaly_summary'):
+                        current_input = f"{st.session_state.log_anomaly_summary}\n\nIncident description: {current_input}"
+                    if agent['llm_feature'] == 'finops_rationale' and st.session_state.get('finops_analysis'):
+                        current_input = format_findings_prompt(st.session_state.finops_analysis, current_input)
+                    # Compact upstream outputs to this agent's token budget before prompting
+                    prompt, upstream_context = agent_prompt(agent, st.session_state.completed_phases_outputs, current_input)
+                    st.session_state[f"context_stats_agent_{agent_id}"] = upstream_context
+                    # Use the response speculated when the upstream agent finished, if the prompt matches
+                    response_text = prefetched_llm_response(prompt)
+                    if response_text is None:
+                        submit_llm_job(agent, prompt) # Runs in the background; progress is polled below
+                    else:
+                        st.session_state.llm_jobs.pop(agent_id, None)
+                        store_agent_output(agent, response_text, source='prefetch') # Also kept for phase completion and in the version history
+                    st.rerun() # Rerun to display output or job progress
+
+                # Progress of this agent's background LLM job; its output is stored once it finishes
+                if agent_id in st.session_state.llm_jobs:
+                    display_llm_job_status(agent)
+
+                # Evaluator Agent: score every completed phase output in one batch
+                if agent['llm_feature'] == 'eval_rationale':
+                    st.markdown("##### Batch Evaluation of Completed Outputs")
+                    sandbox_summaries = {sandbox_agent_id: run['summary'] for sandbox_agent_id, run in st.session_state.sandbox_runs.items()}
+                    evaluation_items = build_evaluation_items(st.session_state.completed_phases_outputs, agent_data, workflow_data, sandbox_summaries) # Sandbox pass rates cap code scores
+                    if not evaluation_items:
+                        st.info("No completed phase outputs to evaluate yet.")
+                    elif st.button(f"Evaluate All Completed Outputs ({len(evaluation_items)})", key=f"batch_eval_agent_{agent_id}"):
+                        evaluation = evaluate_batch(evaluation_items, rationale_fn=lambda prompt: call_llm_api(prompt, agent=agent)) # LLM only for borderline scores
+                        st.session_state.batch_evaluation_results = evaluation
+                        get_model_router().record_evaluation(st.session_state.run_id, evaluation['results']) # Scores steer future routing
+                        store_agent_output(agent, format_evaluation_report(evaluation), source='batch_evaluation')
+                        st.rerun()
+                    if st.session_state.get('batch_evaluation_results'):
+                        evaluation = st.session_state.batch_evaluation_results
+                        st.dataframe([{'Agent': r['agent'], 'Score': r['score'], 'Passed': r['passed'], 'Borderline': r['borderline'], 'Notes': '; '.join(r['notes'])}
+                                      for r in evaluation['results']], use_container_width=True)
+                        st.caption(f"{evaluation['summary']['llm_calls']} LLM rationale call(s) for {evaluation['summary']['evaluated']} outputs.")
+
+                # Developer / Functional Tester: execute generated code and tests in the sandbox
+                if agent['llm_feature'] in ('code_generation', 'test_case_generation') and st.session_state.get(llm_output_key_for_agent) is not None:
+                    st.markdown("##### Sandbox Execution")
+                    if agent['llm_feature'] == 'code_generation':
+                        sandbox_code = extract_python_code(st.session_state[llm_output_key_for_agent])
+                        sandbox_tests = [st.text_area("Unit tests to run against the generated code (define test_* functions):", "",
+                                                      key=f"sandbox_tests_agent_{agent_id}")]
+                    else:
+                        developer_output = collect_upstream_outputs(agent, agent_data, workflow_data, st.session_state.completed_phases_outputs).get('Developer Agent')
+                        sandbox_code = extract_python_code(developer_output) if developer_output else None
+                        test_blocks = structured_output(agent['llm_feature'], st.session_state[llm_output_key_for_agent])['fields']['code_blocks']
+                        sandbox_tests = [code for lang, code in test_blocks if lang in ('python', 'py')] # Each block is its own unit
+                        if not sandbox_tests:
+                            sandbox_tests = [""]
+                            st.info("The generated test cases contain no executable Python tests; only the import of the Developer Agent code will be checked.")
+                    if sandbox_code is None:
+                        st.info("No Developer Agent code is available yet to run the tests against.")
+                    elif st.button("Run in Sandbox", key=f"sandbox_run_agent_{agent_id}"):
+                        with st.spinner(f"Running {len(sandbox_tests)} unit(s) in parallel sandboxes..."):
+                            unit_results = run_units([(sandbox_code, tests) for tests in sandbox_tests])
+                            st.session_state.sandbox_runs[agent_id] = {'units': unit_results, 'summary': summarize_results(unit_results)}
+                    sandbox_run = st.session_state.sandbox_runs.get(agent_id)
+                    if sandbox_run:
+                        summary = sandbox_run['summary']
+                        st.markdown(f"**Units passed:** {summary['units_passed']}/{summary['units']} · **Tests passed:** "
+                                    f"{summary['tests_passed']}/{summary['tests']} in {summary['total_ms']} ms"
+                                    + (f" ({summary['cached']} cached)" if summary['cached'] else ""))
+                        unit_tests = [{'Unit': unit_number, 'Test': t['name'], 'Status': t['status'], 'Duration (ms)': t['duration_ms'], 'Message': t['message']}
+                                      for unit_number, unit_result in enumerate(sandbox_run['units'], start=1) for t in unit_result['tests']]
+                        if unit_tests:
+                            st.dataframe(unit_tests, use_container_width=True)
+                        for unit_number, unit_result in enumerate(sandbox_run['units'], start=1):
+                            if unit_result['stderr']:
+                                st.code(f"Unit {unit_number} ({unit_result['status']}):\n{unit_result['stderr']}", language='text')
+
+                # Show how much upstream context was sent with the last run
+                last_context = st.session_state.get(f"context_stats_agent_{agent_id}")
+                if last_context and last_context['sections']:
+                    st.caption(f"Upstream context: {last_context['tokens_after']} tokens sent (budget {last_context['budget']}), "
+                               f"{last_context['tokens_saved']} tokens saved by compaction.")
+
+                # Display LLM output if available for the current step
+                if st.session_state.get(llm_output_key_for_agent) is not None:
+                    st.subheader("LLM Output:")
+                    agent_output = readable_output(agent['llm_feature'], st.session_state[llm_output_key_for_agent]) # JSON-mode outputs shown from their parsed fields
+                    if agent['llm_feature'] == 'code_generation':
+                        st.code(agent_output, language='python')
+                    else:
+                        st.info(agent_output)
+
+                # Earlier generations of this output, stored as a full copy plus compressed deltas
+                output_versions = list_output_versions(st.session_state.run_id, agent_id)
+                if len(output_versions) > 1:
+                    with st.expander(f"Output History ({len(output_versions)} versions)", expanded=False):
+                        version_numbers = [version['version'] for version in output_versions] # Newest first
+                        col_old_version, col_new_version = st.columns(2)
+                        with col_old_version:
+                            old_version = st.selectbox("Compare", version_numbers, index=1, format_func=lambda n: f"v{n}",
+                                                       key=f"history_old_agent_{agent_id}")
+                            old_text = get_output_version(st.session_state.run_id, agent_id, old_version)
+                            st.code(old_text, language='markdown')
+                        with col_new_version:
+                            new_version = st.selectbox("with", version_numbers, index=0, format_func=lambda n: f"v{n}",
+                                                       key=f"history_new_agent_{agent_id}")
+                            new_text = get_output_version(st.session_state.run_id, agent_id, new_version)
+                            st.code(new_text, language='markdown')
+                        st.code(unified_output_diff(old_text, new_text, f"v{old_version}", f"v{new_version}") or "No differences.", language='diff')
+                        if st.button(f"Restore v{old_version}", key=f"history_restore_agent_{agent_id}"):
+                            store_agent_output(agent, old_text, source='restore') # Restoring adds a new version; history is never rewritten
+                            st.rerun()
+                        st.caption(f"{sum(version['stored_bytes'] for version in output_versions):,} bytes stored for "
+                                   f"{sum(version['chars'] for version in output_versions):,} characters of history.")
+
+
+            st.markdown("---")
+            # Agent internal navigation buttons
+            col_agent_nav1, col_agent_nav2 = st.columns(2)
+            with col_agent_nav1:
+                if st.session_state.current_agent_step_index > 0:
+                    if st.button("Previous Agent Step", key=f"prev_agent_step_{agent_id}"):
+                        st.session_state.current_agent_step_index -= 1
+                        st.rerun()
+            with col_agent_nav2:
+                # Logic for automatic progression to the next agent/phase
+                if st.session_state.current_agent_step_index < len(agent['workflow_steps']) - 1:
+                    # If it's an LLM step, ensure LLM output is present before enabling next step
+                    is_llm_step_and_output_ready = (st.session_state.current_agent_step_index == agent.get('llm_step_index')) and \
+                                                   st.session_state.get(llm_output_key_for_agent) is not None
+                    
+                    # Enable "Next Agent Step" if not an LLM step, or if it is and output is ready
+                    can_go_next = (st.session_state.current_agent_step_index != agent.get('llm_step_index')) or is_llm_step_and_output_ready
+
+                    if st.button("Next Agent Step", key=f"next_agent_step_{agent_id}", disabled=not can_go_next):
+                        st.session_state.current_agent_step_index += 1
+                        st.rerun()
+                else:
+                    # Logic when the last step of the agent's internal workflow is completed
+                    st.success(f"You have completed {agent['name']}'s workflow!")
+
+                    # Announce the finalized output once on the event bus; subscribed downstream agents react to it
+                    publish_agent_completion(agent)
+                    
+                    st.markdown("#### Output Handoff & Agent Activation:")
+                    st.markdown(f"The primary output of the {agent['name']} is: ")
+                    if st.session_state.last_agent_output_for_phase_completion:
+                        st.code(st.session_state.last_agent_output_for_phase_completion, language='markdown')
+                    else:
+                        st.info("No explicit LLM output was generated in this step, but the agent's tasks are considered complete.")
+
+                    # --- New Logic for Role-Based Progression ---
+                    if st.session_state.logged_in_user_role != 'admin':
+                        st.info(f"Output from {agent['name']} has been saved to a shared memory for subsequent agents to consume.")
+                        if st.button("Return to Agent Overview", key=f"return_overview_from_agent_{agent_id}"):
+                            st.session_state.agent_detailed_view = None
+                            st.session_state.current_agent_step_index = 0
+                            st.session_state.last_agent_output_for_phase_completion = None
+                            st.session_state.current_view = 'agent_overview'
+                            st.rerun()
+                    else: # Admin user retains direct progression capability
+                        if agent['activates_agents']:
+                            st.markdown(f"This output now **activates** the following agents:")
+                            cols_activated = st.columns(len(agent['activates_agents']))
+                            for i, activated_agent_name in enumerate(agent['activates_agents']):
+                                with cols_activated[i]:
+                                    activated_agent_id = plan['agent_id_by_name'].get(activated_agent_name)
+                                    if activated_agent_id:
+                                        if st.button(f"Activate {activated_agent_name}", key=f"activate_{activated_agent_id}"):
+                                            st.session_state.agent_detailed_view = activated_agent_id
+                                            st.session_state.current_agent_step_index = 0
+                                            st.session_state.last_agent_output_for_phase_completion = None
+                                            st.rerun()
+
+                        else:
+                            st.markdown("This agent's output is for informational purposes or triggers downstream processes not directly represented as another agent in this prototype's linear flow.")
+
+                        # Determine next automatic transition for primary phase agents (ONLY FOR ADMIN)
+                        is_current_agent_primary_for_phase = (
+                            st.session_state.current_phase_index < len(workflow_data) and
+                            workflow_data[st.session_state.current_phase_index]['primary_agent_id'] == agent_id
+                        )
+
+                        if is_current_agent_primary_for_phase:
+                            # Save the output for the completed phase
+                            st.session_state.completed_phases_outputs[workflow_data[st.session_state.current_phase_index]['phase_id']] = \
+                                st.session_state.get(llm_output_key_for_agent, "Agent ran but no specific output was generated.")
+
+                            # If there's a next SDLC phase
+                            if st.session_state.current_phase_index < len(workflow_data) - 1:
+                                st.info(f"Automatically advancing to the next SDLC phase...")
+                                st.session_state.current_phase_index += 1
+                                next_primary_agent_id = workflow_data[st.session_state.current_phase_index]['primary_agent_id']
+                                st.session_state.agent_detailed_view = next_primary_agent_id # Automatically open next primary agent
+                                st.session_state.current_agent_step_index = 0 # Reset agent steps
+                                st.session_state.last_agent_output_for_phase_completion = None # Clear output for new phase
+                                st.rerun()
+                            else:
+                                st.success("You have completed the entire SDLC prototype workflow!")
+                                st.balloons() # Add celebratory animation
+                                if st.button("Return to Main View", key=f"return_main_from_agent_{agent_id}"):
+                                    reset_workflow_state() # Start a fresh run
+                                    st.rerun()
+                        else:
+                            # If it's a cross-cutting agent or not the primary for its phase, just return to main phase view
+                            st.info(f"Returning to the main SDLC workflow view.")
+                            if st.button("Return to Main SDLC Workflow", key=f"return_workflow_from_agent_{agent_id}"):
+                                st.session_state.agent_detailed_view = None
+                                st.session_state.current_agent_step_index = 0
+                                st.session_state.last_agent_output_for_phase_completion = None
+                                st.session_state.current_view = 'agent_overview' # Ensure returning to agent overview
+                                st.rerun()
+
+            # Always provide a "Close Details" for manual exit
+            # Only show if not auto-redirected, which means it's either the last phase or a non-primary agent
+            # and the user hasn't chosen to return to the main view already.
+            # This button will now also respect the admin/non-admin flow to avoid confusion
+            if st.session_state.logged_in_user_role == 'admin':
+                if not (st.session_state.current_agent_step_index == len(agent['workflow_steps']) -1 and is_current_agent_primary_for_phase):
+                    st.button("Close Agent Details Manually", on_click=lambda: st.session_state.update(agent_detailed_view=None, current_agent_step_index=0, last_agent_output_for_phase_completion=None, current_view='agent_overview'))
+            else: # For non-admin, always show return to overview
+                 st.button("Close Agent Details Manually", on_click=lambda: st.session_state.update(agent_detailed_view=None, current_agent_step_index=0, last_agent_output_for_phase_completion=None, current_view='agent_overview'))
@@ -0,0 +1,113 @@
+import streamlit as st
+
+from agent_catalog import CARD_PAGE_SIZES, SIDEBAR_PAGE_SIZE, catalog_page, search_agents # Indexed, paginated agent catalog
+from ui_templates import agent_card_html # Precompiled HTML
+from sdlc_core.registry import current_plan
+from sdlc_core.state import open_agent_detail
+
+def display_agent_cards_overview():
+    st.markdown("## Explore Our Intelligent Agents")
+    st.markdown("""
+        <p style='font-size:1.1em; color:#4a5568;'>
+        Dive into the capabilities of each specialized AI agent. Select an agent from the sidebar on the left,
+        or click on any card below, to view its detailed workflow and interactive LLM features.
+        </p>
+    """, unsafe_allow_html=True)
+    
+    display_agent_catalog()
+
+def _shift_page(page_key, delta):
+    st.session_state[page_key] += delta
+
+def _reset_catalog_page():
+    st.session_state.agent_catalog_page = 1
+
+@st.fragment
+def display_agent_catalog():
+    """
+    Searching and paging rerun only this fragment, and only the visible page of cards is rendered.
+    """
+    plan = current_plan()
+    col_search, col_page_size = st.columns([3, 1])
+    with col_search:
+        query = st.text_input("Search agents", key="agent_catalog_query", on_change=_reset_catalog_page,
+                              placeholder="Name, description, tech or LLM feature")
+    with col_page_size:
+        page_size = st.selectbox("Cards per page", CARD_PAGE_SIZES, key="agent_catalog_page_size", on_change=_reset_catalog_page)
+    # Indexed search over the agents this role may use, in display order
+    matching_agent_ids = search_agents(plan, st.session_state.logged_in_user_role, query)
+    if not matching_agent_ids:
+        st.info("No agents match your search.")
+        return
+    page_agent_ids, st.session_state.agent_catalog_page, page_count = catalog_page(
+        matching_agent_ids, st.session_state.get('agent_catalog_page', 1), page_size)
+
+    # Display agent cards in a grid for the current page only
+    cols = st.columns(3)
+    for idx, agent_id in enumerate(page_agent_ids):
+        agent = plan['agents'][agent_id]
+        with cols[idx % 3]:
+            # Using custom HTML for agent cards with a nested Streamlit button for functionality
+            st.markdown(agent_card_html(agent['icon'], agent['name'], agent['description'], agent['tech'], agent['llm_feature']),
+                        unsafe_allow_html=True)
+            # This Streamlit button is placed right after the custom HTML for the card
+            if st.button(f"Explore {agent['name']} 👉", key=f"explore_agent_btn_{agent_id}", use_container_width=True):
+                open_agent_detail(agent_id) # Switch to agent_detail view when selecting an agent
+                st.rerun()
+
+    if page_count > 1:
+        col_prev, col_status, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("← Previous", key="agent_catalog_prev", disabled=st.session_state.agent_catalog_page == 1, on_click=_shift_page, args=('agent_catalog_page', -1))
+        with col_status:
+            st.caption(f"Page {st.session_state.agent_catalog_page} of {page_count} · {len(matching_agent_ids)} agents")
+        with col_next:
+            st.button("Next →", key="agent_catalog_next", disabled=st.session_state.agent_catalog_page == page_count, on_click=_shift_page, args=('agent_catalog_page', 1))
+
+def _reset_sidebar_page():
+    st.session_state.agent_sidebar_page = 1
+
+@st.fragment
+def display_agent_sidebar():
+    """
+    The sidebar agent list: searchable and paged like the catalog, so each rerun renders at most
+    SIDEBAR_PAGE_SIZE buttons however many agents the role can use.
+    """
+    plan = current_plan()
+    query = st.text_input("Find an agent", key="agent_sidebar_query", on_change=_reset_sidebar_page, label_visibility="collapsed",
+                          placeholder="🔎 Find an agent")
+    matching_agent_ids = search_agents(plan, st.session_state.logged_in_user_role, query)
+    page_agent_ids, st.session_state.agent_sidebar_page, page_count = catalog_page(
+        matching_agent_ids, st.session_state.get('agent_sidebar_page', 1), SIDEBAR_PAGE_SIZE)
+    if not matching_agent_ids:
+        st.caption("No agents match.")
+
+    for agent_id in page_agent_ids:
+        agent = plan['agents'][agent_id]
+        # Highlight if the detailed view of this agent is active AND we are in 'agent_detail' view
+        is_current_agent_view = (st.session_state.agent_detailed_view == agent_id) and (st.session_state.current_view == 'agent_detail')
+        button_label = f"{agent['name']}"
+
+        # Use a div with a class to apply conditional styling for the selected button
+        if is_current_agent_view:
+            st.markdown(f"""
+            <div class="stButtonSelectedInSidebar">
+                <button style="display: block; width: 100%; text-align: left; padding: 10px 15px; border-radius: 8px; border: none; cursor: default;">
+                    👉 {button_label}
+                </button>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            # Regular Streamlit button for non-selected agents, which will pick up the general sidebar button styling
+            if st.button(button_label, key=f"agent_sidebar_{agent_id}", help=agent['description']):
+                open_agent_detail(agent_id) # Switch to agent_detail view when selecting an agent from sidebar
+                st.rerun()
+
+    if page_count > 1:
+        col_prev, col_status, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("←", key="agent_sidebar_prev", disabled=st.session_state.agent_sidebar_page == 1, on_click=_shift_page, args=('agent_sidebar_page', -1))
+        with col_status:
+            st.caption(f"{st.session_state.agent_sidebar_page}/{page_count} · {len(matching_agent_ids)} agents")
+        with col_next:
+            st.button("→", key="agent_sidebar_next", disabled=st.session_state.agent_sidebar_page == page_count, on_click=_shift_page, args=('agent_sidebar_page', 1))
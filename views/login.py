@@ -0,0 +1,63 @@
+import streamlit as st
+
+from auth_backend import issue_session_token # Signed session tokens
+from sdlc_core.auth import get_auth_backend, get_session_secret
+from sdlc_core.state import log_in, publish_session_ticket
+from views import inject_stylesheet
+
+# --- Login Logic ---
+def login_page():
+    st.title("Login to Agentic AI SDLC Prototype")
+    st.markdown("---")
+
+    username = st.text_input("Username", key="login_username")
+    password = st.text_input("Password", type="password", key="login_password")
+
+    if st.button("Login", key="perform_login_btn"):
+        user = get_auth_backend().authenticate(username, password)
+        if user:
+            session_token = issue_session_token(user, get_session_secret())
+            log_in(user['username'], session_token)
+            publish_session_ticket() # Only a one-time ticket goes in the URL, never the token
+            st.rerun()
+        else:
+            st.error("Invalid username or password")
+    
+    st.markdown("---")
+    st.markdown("#### Demo Users:")
+    st.markdown("- **Admin:** `admin` / `adminpass`")
+    st.markdown("- **BA:** `ba_user` / `bapass`")
+    st.markdown("- **Architect:** `architect_user` / `archpass`")
+    st.markdown("- **Planner:** `planner_user` / `planpass`")
+    st.markdown("- **Developer:** `dev_user` / `devpass`")
+    st.markdown("- **QA:** `qa_user` / `qapass`")
+    st.markdown("- **DevOps:** `devops_user` / `devopspass`")
+    st.markdown("- **Ops Engineer:** `ops_user` / `opspass`")
+
+
+# --- Landing Page Logic ---
+def show_landing_page():
+    st.set_page_config(layout="wide", page_title="Agentic AI SDLC Prototype", initial_sidebar_state="collapsed")
+
+    inject_stylesheet() # Custom CSS for a more professional look
+
+    # Logo at the top of the landing page
+    st.image("https://www.valuemomentum.com/wp-content/uploads/2024/01/ValueMomentum-Logo-1.png", width=200)
+    
+    st.markdown("<div class='main-header'>Welcome to Agentic AI SDLC Automation Prototype</div>", unsafe_allow_html=True)
+    st.markdown("<div class='subheader'>Accelerate your SDLC with AI-powered agents</div>", unsafe_allow_html=True)
+    st.markdown("""
+        <div class='description-text'>
+            Explore a revolutionary approach to software development where specialized AI agents collaborate seamlessly across
+            the entire Software Development Lifecycle. From requirements analysis to deployment and operations,
+            witness how intelligent automation can enhance efficiency, reduce errors, and foster innovation.
+            This prototype offers a hands-on experience to understand the power of agentic AI workflows.
+        </div>
+    """, unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Replaced "Start Exploring" with a call to the login page
+    login_page()
+            
+    # Centered and "locked" footer using a container div
+    st.markdown("<div class='footer-container'>© 2025 ValueMomentum. All rights reserved.</div>", unsafe_allow_html=True)
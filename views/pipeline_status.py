@@ -0,0 +1,74 @@
+import streamlit as st
+
+from backlog_processor import backlog_progress # Persisted bulk backlog progress
+from llm_jobs import JOB_POLL_INTERVAL # Bounded UI refresh while a job runs
+from sdlc_core.engine import get_agent_pipeline, get_backlog_processor, get_dag_scheduler, get_llm_job_runner, store_agent_output, sync_agent_outputs
+from sdlc_core.registry import current_plan
+
+@st.fragment(run_every="2s")
+def display_event_pipeline_status():
+    status = get_agent_pipeline().status(st.session_state.run_id)
+    sync_agent_outputs(status['outputs'])
+    st.caption(f"Completed: {len(status['outputs'])}/{len(current_plan()['agents'])} agents")
+    if status['running']:
+        st.caption("Running: " + ", ".join(status['running']))
+    for agent_name, error in status['failed'].items():
+        st.caption(f"Failed: {agent_name} ({error})")
+
+@st.fragment(run_every="2s")
+def display_scheduled_run_status():
+    status = get_dag_scheduler().status(st.session_state.scheduled_run_id)
+    if status is None: # Submitted to a scheduler that is gone, e.g. before a server restart
+        st.session_state.scheduled_run_id = None
+        return
+    sync_agent_outputs(status['outputs'])
+    st.progress(len(status['outputs']) / status['total'], text=f"{len(status['outputs'])}/{status['total']} agents completed")
+    if status['running']:
+        st.caption("Running: " + ", ".join(status['running']))
+    for agent_name, error in status['failed'].items():
+        st.caption(f"Failed: {agent_name} ({error})")
+    if status['done']:
+        st.caption(f"Makespan: {status['makespan']}s (critical path estimate {status['critical_path_estimate']}s)")
+
+@st.fragment(run_every="2s")
+def display_backlog_progress():
+    progress = backlog_progress(st.session_state.run_id)
+    job = get_backlog_processor().job_state(st.session_state.run_id)
+    trds_done, sprints_done = progress['trd'].get('done', 0), progress['sprint'].get('done', 0)
+    st.progress(trds_done / max(progress['items'], 1), text=f"{trds_done}/{progress['items']} TRDs generated")
+    st.caption(f"Sprint summaries: {sprints_done}/{progress['sprints']} · reused from cache: {progress['cached']}"
+               + (f" · failed: {progress['trd'].get('failed', 0) + progress['sprint'].get('failed', 0)}"
+                  if progress['trd'].get('failed') or progress['sprint'].get('failed') else ""))
+    if job:
+        st.caption(f"Job {job['state']}" + (f": {job['error']}" if job['error'] else ""))
+
+def _cancel_llm_job(job_id):
+    get_llm_job_runner().cancel(job_id, reason="Cancelled by user")
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def display_llm_job_status(agent):
+    """
+    Polls an agent's background LLM job. A finished job's output is stored like a synchronous
+    call's would be and the page reruns to show it; a failed or cancelled job stays listed until rerun.
+    """
+    job_id = st.session_state.llm_jobs.get(agent['id'])
+    job = get_llm_job_runner().poll(job_id) if job_id else None
+    if job is None:
+        st.session_state.llm_jobs.pop(agent['id'], None) # Expired from the runner
+        return
+    if job['state'] == 'done':
+        st.session_state.llm_jobs.pop(agent['id'], None)
+        store_agent_output(agent, job['result']) # Also kept for phase completion and in the version history
+        st.rerun()
+    if job['state'] == 'failed':
+        st.error(f"Error calling LLM: {job['error']}")
+    elif job['state'] == 'cancelled':
+        st.warning(f"LLM call cancelled after {job['elapsed']}s.")
+    else:
+        col_status, col_cancel = st.columns([3, 1])
+        with col_status:
+            st.caption(f"LLM job **{job['state']}** · {job['elapsed']}s · " + " → ".join(message for _, message in job['events'][-3:]))
+        with col_cancel:
+            st.button("Cancel", key=f"cancel_llm_job_{job_id}", on_click=_cancel_llm_job, args=(job_id,))
+        if job['partial']:
+            st.info(job['partial'] + " ▌")
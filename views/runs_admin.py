@@ -0,0 +1,60 @@
+import streamlit as st
+import pandas as pd
+
+from run_registry import count_runs, list_runs # Indexed multi-run listing
+from artifact_store import artifact_stats # Content-addressed artifacts shared across runs
+from output_versions import collect_output_versions, output_version_stats # Delta-compressed output history
+from sdlc_core.registry import current_plan
+from sdlc_core.state import resume_run
+
+def display_runs_admin():
+    """
+    Admin list of every run on this deployment, paged through the run index.
+    """
+    st.markdown("## SDLC Runs")
+    stats = artifact_stats()
+    version_stats = output_version_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Runs", count_runs())
+    col2.metric("Stored Artifacts", stats['artifacts'])
+    col3.metric("Artifact Storage", f"{stats['stored_bytes'] / 1024:,.1f} KB", help=f"{stats['dedup_hits']} duplicate artifacts shared instead of stored")
+    col4.metric("Output History", f"{version_stats['stored_bytes'] / 1024:,.1f} KB",
+                help=f"{version_stats['versions']} output versions ({version_stats['deltas']} stored as deltas); "
+                     f"{version_stats['full_copy_chars'] / 1024:,.1f} KB as full copies")
+    if st.button("Collect Output Versions Older Than 30 Days", key="runs_admin_collect_versions"):
+        st.success(f"Deleted {collect_output_versions(max_age_days=30)} old output versions.")
+
+    page_size = st.selectbox("Runs per page", [10, 25, 50, 100], index=1, key="runs_admin_page_size")
+    cursors = st.session_state.runs_admin_cursors
+    runs, next_cursor = list_runs(cursor=cursors[-1], limit=page_size)
+    workflow_data = current_plan()['phases']
+    if runs:
+        st.dataframe(pd.DataFrame([{
+            'Run': run['name'],
+            'Run ID': run['run_id'],
+            'Owner': run['owner'],
+            'Phase': workflow_data[min(run['current_phase_index'], len(workflow_data) - 1)]['name'],
+            'Completed Phases': f"{run['completed_phases']}/{len(workflow_data)}",
+            'Updated': pd.to_datetime(run['updated_at'], unit='s').strftime('%Y-%m-%d %H:%M'),
+        } for run in runs]), hide_index=True, use_container_width=True)
+    else:
+        st.info("No runs recorded yet.")
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("⬅️ Previous", key="runs_admin_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    col_page.caption(f"Page {len(cursors)}")
+    if col_next.button("Next ➡️", key="runs_admin_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+    open_run_id = st.selectbox("Open a run:", [""] + [run['run_id'] for run in runs], key="runs_admin_open",
+                               format_func=lambda run_id: next((f"{run['name']} ({run['owner']})" for run in runs if run['run_id'] == run_id), run_id))
+    if st.button("Open Run", key="runs_admin_open_btn", disabled=not open_run_id):
+        resume_error = resume_run(open_run_id)
+        if resume_error:
+            st.error(resume_error)
+        else:
+            st.session_state.current_view = 'agent_overview'
+            st.rerun()